@@ -1,7 +1,7 @@
 ##############################################################################################################################
 # coding=utf-8
 #
-# battingLeaders.py -- print leaders for a batting stat for a specified time period using Retrosheet data
+# battingLeaders.py -- print leaders for one or more batting stats for a specified time period using Retrosheet data
 #
 # The data processed by this software was obtained free of charge from and is copyrighted by Retrosheet.
 # Interested parties may contact Retrosheet at 20 Sunset Rd., Newark, DE 19711.
@@ -14,26 +14,31 @@
 __author__       = "Mark Sattolo"
 __author_email__ = "epistemik@gmail.com"
 __created__ = "2021-08-22"
-__updated__ = "2021-10-06"
+__updated__ = "2026-10-18"
 
-import copy
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 sys.path.append("/home/marksa/git/Python/utils")
 from mhsUtils import dt, now_dt, get_filename, get_current_time
 from mhsLogging import MhsLogger
-from cwLibWrappers import cwlib
 from cwTools import *
+from cwAggregate import StatTable, sum_by_player, calc_rate_stats, PLAYER_ID_DTYPE
+from cwRanking import select_top, select_bottom, competition_ranks
+from cwStore import RetrosheetStore, STORE_PATH
 
 MIN_LIMIT = 10
 MAX_LIMIT = 120
 DEFAULT_LIMIT = 30
 STD_MIN_PA = 502 # one season
 DEFAULT_YEAR  = 2010
-PROGRAM_DESC  = "Print leaders for a batting stat from Retrosheet data for the specified year(s)."
+PROGRAM_DESC  = "Print leaders for one or more batting stats from Retrosheet data for the specified year(s)."
 PROGRAM_NAME  = get_filename(__file__)
 BAT_RND_PRECISION = 3
+RANK_SPACE = 6
 PLAYER_SPACE = 24
 STAT_SPACE = 12
+MAX_JOBS = os.cpu_count() or 1
 
 GM  = 0       # 0
 PA  = GM+1    # 1
@@ -59,33 +64,80 @@ BA  = TB+1    # 20
 OBP = BA+1    # 21
 SLG = OBP+1   # 22
 OPS = SLG+1   # 23
-LAST = OPS+1  # end of batting stats
+ISO   = OPS+1    # 24
+BABIP = ISO+1    # 25
+KPCT  = BABIP+1  # 26
+BBPCT = KPCT+1   # 27
+LAST  = BBPCT+1  # end of batting stats
 # CWBoxBatting: int g, pa, ab, r, h, b2, b3, hr, hrslam, bi, bi2out, gw, bb, ibb, so, gdp, hp, sh, sf, sb, cs, xi;
 # baseball-ref.com: G  PA  AB  R  H  2B  3B  HR  RBI  SB  CS  BB  SO  BA  OBP  SLG  OPS  OPS+  TB  GDP  HBP  SH  SF IBB
 STATS_DICT = { "G ":0, "PA":0, "AB":0, "R ":0, "H ":0, "2B":0, "3B":0, "HR":0, "XBH":0, "RBI":0, "SO":0, "BB":0, "IBB":0,
-               "SB":0, "CS":0, "SH":0, "SF":0, "HBP":0, "GDP":0, "TB":0, "BA":0, "OBP":0, "SLG":0, "OPS":0 }
+               "SB":0, "CS":0, "SH":0, "SF":0, "HBP":0, "GDP":0, "TB":0, "BA":0, "OBP":0, "SLG":0, "OPS":0,
+               "ISO":0, "BABIP":0, "K%":0, "BB%":0 }
 BATTING_HDRS = list( STATS_DICT.keys() )
 DEFAULT_STAT = BATTING_HDRS[OBP]
-RATE_STATS_DICT = { "PA":0, "AB":0, "H ":0, "BB":0, "SF":0, "HBP":0, "TB":0 }
-RATE_STATS = BATTING_HDRS[20:]
+RATE_STATS = BATTING_HDRS[BA:]
+COUNTING_STATS = BATTING_HDRS[:BA]
+ALL_STATS = "all"
+
+
+def get_file_stats(bat_lines:np.ndarray) -> (list, np.ndarray, np.ndarray):
+    """Get the ids of the games in 'bat_lines' and the total of every counting stat for each player."""
+    if len(bat_lines) == 0:
+        return [], np.zeros(0, dtype = PLAYER_ID_DTYPE), np.zeros( (0, len(COUNTING_STATS)), dtype = np.int64 )
+    game_ids = [ gid.decode(UTF8_ENCODING) for gid in np.unique(bat_lines["game_id"]) ]
+    players, sums = sum_by_player(bat_lines, COUNTING_STATS)
+    return game_ids, players, sums
+
+
+# each worker process keeps its own cache handle for all of its tasks
+worker_state = {}
+
+def init_ldr_worker(logger_name:str):
+    """Run once in each worker process: the Chadwick library is already loaded by importing cwLibWrappers."""
+    worker_state["cache"] = BoxLineCache( lg.getLogger(logger_name) )
+
+def get_worker_file_stats(efile:str) -> (list, np.ndarray, np.ndarray):
+    bat_lines, _ = worker_state["cache"].get_lines(efile)
+    return get_file_stats(bat_lines)
 
 
 class PrintBattingLeaders:
-    """Print leaders for a batting stat for a specified time period using Retrosheet data."""
-    def __init__(self, p_stat:str, p_start:int, p_end:int, p_limit:int, p_pa:int, logger:lg.Logger):
+    """
+    Print leaders for one or more batting stats for a specified time period using Retrosheet data:
+        the catalog, the person directory and the cache folder may be given, e.g. those of a test tree,
+        else the default ones are used.
+    """
+    hdrs = BATTING_HDRS
+    rate_stats = RATE_STATS
+
+    def __init__(self, p_stats:list, p_start:int, p_end:int, p_limit:int, p_pa:int, p_jobs:int, logger:lg.Logger,
+                 p_lowest:bool = False, p_threads:bool = False, p_store:str = None,
+                 catalog:RetrosheetCatalog = None, people:PersonDirectory = None, store_folder:str = CACHE_FOLDER):
         self.lgr = logger
         self.lgr.warning(F"Start {self.__class__.__name__}")
         self.event_files = {}
-        self.game_ids = []
+        self.game_ids = set()
         self.start = p_start
         self.end = p_end
-        self.stat = p_stat
-        self.stats = {}
+        self.stat_list = p_stats
+        # totals of every counting stat for every player, collected in ONE pass over the event files
+        self.table = StatTable(COUNTING_STATS)
         self.limit = p_limit
         self.num_files = 0
         self.num_years = p_end - p_start + 1
         self.min_pa = p_pa
-        if self.stat in RATE_STATS:
+        self.jobs = p_jobs
+        self.threads = p_threads
+        self.lowest = p_lowest
+        self.rate_values = {}
+        self.box_cache = BoxLineCache(logger, store_folder)
+        # the batting lines are taken from the events in the SQLite store instead of the event files
+        self.store = RetrosheetStore(logger, p_store) if p_store else None
+        self.people = people if people else PersonDirectory(logger)
+        self.catalog = catalog if catalog else RetrosheetCatalog(logger)
+        self.box_supplement = BoxscoreSupplement(logger, index_folder = store_folder, catalog = self.catalog)
+        if any( stat in self.rate_stats for stat in self.stat_list ):
             myr_notice = ''
             # if no user min_pa, adjust required number of PA depending on the number of years collecting the stat
             if p_pa == 0:
@@ -102,47 +154,42 @@ class PrintBattingLeaders:
         """Get the required event files for the specified year(s)."""
         season = POST_SEASON if post else REG_SEASON
         self.lgr.info(F"get the {season} events for years {self.start}->{self.end}")
-        try:
-            for year in range(self.start, self.end+1):
-                year_events = []
-                # get the team files
-                team_file_name = osp.join(REG_SEASON_FOLDER, "TEAM" + str(year))
-                self.lgr.debug(F"team file name = {team_file_name}")
-                if not osp.exists(team_file_name):
-                    self.lgr.exception(F"CANNOT find team file {team_file_name}!")
-                    continue
-                if not post:
-                    with open(team_file_name, newline = '') as team_csvfile:
-                        team_reader = csv.reader(team_csvfile)
-                        for trow in team_reader:
-                            rteam = trow[0]
-                            self.lgr.debug(F"Found team {rteam}")
-                            # find and store the event file paths for the requested years
-                            rfile = osp.join(REG_SEASON_FOLDER, str(year) + rteam + osp.extsep + "EV" + trow[1])
-                            if not osp.exists(rfile):
-                                raise FileNotFoundError(F"CANNOT find {season} event file {rfile}!")
-                            year_events.append(rfile)
-                            self.num_files += 1
-                if post:
-                    # find and store the event file paths for the requested years
-                    post_files = osp.join(POST_SEASON_FOLDER, str(year) + "*")
-                    for pfile in glob.glob(post_files):
-                        self.lgr.debug(F"{season} file name = {pfile}")
-                        if not osp.exists(pfile):
-                            raise FileNotFoundError(F"CANNOT find {season} event file {pfile}!")
-                        year_events.append(pfile)
-                        self.num_files += 1
-
-                self.event_files[str(year)] = year_events
-
-        except Exception as ex:
-            raise ex
+        self.event_files = self.catalog.get_years_events(self.start, self.end, post)
+        self.num_files = sum( len(year_events) for year_events in self.event_files.values() )
 
     def get_ldr_stats(self, season:str):
-        """Print regular or post-season stats for player 'player_id' in years <yrstart> to <yrend>."""
-        self.lgr.debug(F"print {season} {self.stat} leaders for years {self.start} to {self.end}")
+        """Get regular or post-season stats for all players in years <self.start> to <self.end>."""
+        self.lgr.debug(F"collect {season} stats for {self.stat_list} leaders for years {self.start} to {self.end}")
+        years = range(self.start, self.end + 1)
+        efiles = [ efile for _, efile in iter_event_files(self.event_files, years) ]
+
+        with timer.phase("get_ldr_stats"):
+            if self.store:
+                self.lgr.info(F"collect stats from the events in the store {self.store.path}")
+                self.merge_ldr_stats( season, ( get_file_stats(bat_lines) for _, _, bat_lines
+                                                in self.store.iter_batting_lines(self.event_files, years) ) )
+            elif self.jobs > 1 and len(efiles) > 1 and self.threads:
+                self.lgr.info(F"collect stats from {len(efiles)} event files with {self.jobs} worker threads")
+                # the threads share the box cache and the loaded library, and run in parallel while in the library,
+                # i.e. while the games are parsed and boxed: no worker start-up and NO results to pickle
+                with ThreadPoolExecutor(max_workers = self.jobs) as executor:
+                    self.merge_ldr_stats( season, executor.map(self.get_thread_file_stats, efiles) )
+            elif self.jobs > 1 and len(efiles) > 1:
+                self.lgr.info(F"collect stats from {len(efiles)} event files with {self.jobs} worker processes")
+                with ProcessPoolExecutor( max_workers = self.jobs, initializer = init_ldr_worker,
+                                          initargs = (self.lgr.name,) ) as executor:
+                    # results arrive in submission order so the merge is the same as for the serial run
+                    self.merge_ldr_stats( season, executor.map(get_worker_file_stats, efiles) )
+            else:
+                self.merge_ldr_stats( season, ( get_file_stats(bat_lines) for _, _, bat_lines
+                                                in iter_batting_lines(self.event_files, years, self.box_cache) ) )
+
+    def get_thread_file_stats(self, efile:str) -> (list, np.ndarray, np.ndarray):
+        bat_lines, _ = self.box_cache.get_lines(efile)
+        return get_file_stats(bat_lines)
 
-        # get all the games in the supplied date range
+    def merge_ldr_stats(self, season:str, file_results):
+        """Fold the results for each event file, in year and file order, into the stats for all players."""
         for year in range(self.start, self.end + 1):
             self.lgr.info(F"collect stats for year: {year}")
             self.game_ids.clear()
@@ -151,287 +198,187 @@ class PrintBattingLeaders:
                 continue
             for efile in self.event_files[str_year]:
                 self.lgr.debug(F"found events for year/team = {get_base_filename(efile)}")
-                cwgames = chadwick.games(efile)
-                for game in cwgames:
-                    game_id = game.contents.game_id.decode(encoding = UTF8_ENCODING)
-                    game_date = game_id[3:11]
-                    self.lgr.debug(F" Found game id = {game_id}; date = {game_date}")
-
-                    box = MyCwlib.box_create(game)
-                    self.collect_stats(box, str_year, game_id)
+                game_ids, players, sums = next(file_results)
+                self.game_ids.update(game_ids)
+                with timer.phase("collect_stats"):
+                    self.collect_stats(players, sums, str_year)
 
             if year < RETROSHEET_AVAIL_YEAR and season == REG_SEASON:
-                self.check_boxscores(str_year)
-            
-            self.lgr.info(F"found {len(self.game_ids)} {year} games with {self.stat} stats.")
-
-    def collect_stats(self, p_box:pointer, year:str, game_id:str):
-        stat = self.stat
-        self.lgr.debug(F"search for '{stat}' in year = {year}")
-        slots = [1,1]
-        players = list()
-        players.append( MyCwlib.box_get_starter(p_box,0,1) )
-        players.append( MyCwlib.box_get_starter(p_box,1,1) )
-
-        while slots[0] <= 9 or slots[1] <= 9 :
-            for t in range(2):
-                if slots[t] <= 9:
-                    player = players[t].contents.player_id.decode(UTF8_ENCODING)
-                    self.game_ids.append(game_id)
-                    batting = players[t].contents.batting.contents
-                    game_stat = 0
-                    if stat == BATTING_HDRS[GM]: game_stat = batting.g
-                    elif stat == BATTING_HDRS[PA]: game_stat = batting.pa
-                    elif stat == BATTING_HDRS[AB]: game_stat = batting.ab
-                    elif stat == BATTING_HDRS[RUN]: game_stat = batting.r
-                    elif stat == BATTING_HDRS[HIT]: game_stat = batting.h
-                    elif stat == BATTING_HDRS[B2]: game_stat = batting.b2
-                    elif stat == BATTING_HDRS[B3]: game_stat = batting.b3
-                    elif stat == BATTING_HDRS[HR]: game_stat = batting.hr
-                    elif stat == BATTING_HDRS[XBH]: game_stat = (batting.b2 + batting.b3 + batting.hr)
-                    elif stat == BATTING_HDRS[RBI] and batting.bi > 0:
-                        game_stat = batting.bi
-                    elif stat == BATTING_HDRS[BB]: game_stat = batting.bb
-                    elif stat == BATTING_HDRS[IBB] and batting.ibb > 0:
-                        game_stat = batting.ibb
-                    elif stat == BATTING_HDRS[SO]: game_stat = batting.so
-                    elif stat == BATTING_HDRS[SB]: game_stat = batting.sb
-                    elif stat == BATTING_HDRS[CS]: game_stat = batting.cs
-                    elif stat == BATTING_HDRS[SH]: game_stat = batting.sh
-                    elif stat == BATTING_HDRS[SF]: game_stat = batting.sf
-                    elif stat == BATTING_HDRS[HBP]: game_stat = batting.hp
-                    elif stat == BATTING_HDRS[GDP]: game_stat = batting.gdp
-                    elif stat == BATTING_HDRS[TB]: game_stat = batting.h + batting.b2 + (2 * batting.b3) + (3 * batting.hr)
-                    elif stat in RATE_STATS:
-                        game_stat = copy.copy(RATE_STATS_DICT)
-                        game_stat[BATTING_HDRS[PA]]  = batting.pa
-                        game_stat[BATTING_HDRS[AB]]  = batting.ab
-                        game_stat[BATTING_HDRS[HIT]] = batting.h
-                        game_stat[BATTING_HDRS[BB]]  = batting.bb
-                        game_stat[BATTING_HDRS[SF]]  = batting.sf
-                        game_stat[BATTING_HDRS[HBP]] = batting.hp
-                        game_stat[BATTING_HDRS[TB]]  = batting.h + batting.b2 + (2 * batting.b3) + (3 * batting.hr)
-
-                    if player not in self.stats.keys():
-                        self.stats[player] = game_stat
-                    else:
-                        if stat in RATE_STATS:
-                            self.stats[player][BATTING_HDRS[PA]]  += batting.pa
-                            self.stats[player][BATTING_HDRS[AB]]  += batting.ab
-                            self.stats[player][BATTING_HDRS[HIT]] += batting.h
-                            self.stats[player][BATTING_HDRS[BB]]  += batting.bb
-                            self.stats[player][BATTING_HDRS[SF]]  += batting.sf
-                            self.stats[player][BATTING_HDRS[HBP]] += batting.hp
-                            self.stats[player][BATTING_HDRS[TB]] += batting.h + batting.b2 + (2 * batting.b3) + (3 * batting.hr)
-                        else:
-                            self.stats[player] += game_stat
-                    players[t] = players[t].contents.next
-                    if not players[t]:
-                        while slots[t] <= 9 and not players[t]:
-                            slots[t] += 1
-                            if slots[t] <= 9:
-                                players[t] = cwlib.cw_box_get_starter(p_box, t, slots[t])
+                with timer.phase("check_boxscores"):
+                    self.check_boxscores(str_year)
+
+            self.lgr.info(F"found {len(self.game_ids)} {year} games with batting stats.")
+
+    def collect_stats(self, players:np.ndarray, sums:np.ndarray, year:str):
+        self.lgr.debug(F"add the batting stats for {len(players)} players in year = {year}")
+        self.table.add(players, sums)
 
     def check_boxscores(self, year:str):
         """Check the Retrosheet boxscore files for batting stats missing from the event files."""
         self.lgr.debug(F"check boxscore files for year = {year}")
-        stat = self.stat
-        box_year = osp.join(BOXSCORE_FOLDER, year)
-        boxscore_files = [box_year + osp.extsep + "EBN", box_year + osp.extsep + "EBA"]
-        for bfile in boxscore_files:
-            try:
-                with open(bfile, newline = '') as box_csvfile:
-                    self.lgr.info(F"search boxscore file {bfile}")
-                    box_reader = csv.reader(box_csvfile)
-                    find_results = False
-                    for brow in box_reader:
-                        if brow[0] == "id":
-                            current_id = brow[1]
-                            if current_id in self.game_ids:
-                                self.lgr.debug(F"found duplicate game '{current_id}' in Boxscore file.")
-                                find_results = False
-                                continue
-                            else:
-                                self.lgr.info(F"found NEW game '{current_id}' in Boxscore file.")
-                                # start incorporating the stats found in this boxscore game
-                                find_results = True
-                        if find_results and brow[1] == "bline":
-                            player_id = brow[2]
-                            self.lgr.debug(F"found player '{player_id}' in boxscore game {current_id}")
-                            if player_id in self.stats.keys():
-                                # parse boxscore batting stat line
-                                # key: 'stat','bline',id,side,pos,seq,ab,r,h,2b,3b,hr,rbi,sh,sf,hbp,bb,ibb,k, sb,cs,gidp,int
-                                #       0      1      2  3    4   5   6  7 8 9  10 11 12  13 14 15  16 17  18 19 20  21  22
-                                if stat == BATTING_HDRS[GM]: self.stats[player_id] += 1
-                                pa = int(brow[6]) + int(brow[13]) + int(brow[14]) + int(brow[15]) \
-                                     + int(brow[16]) + int(brow[22])
-                                if stat == BATTING_HDRS[PA] and pa > 0:
-                                    self.stats[player_id] += pa
-                                elif stat == BATTING_HDRS[AB]: self.stats[player_id] += int(brow[6])
-                                elif stat == BATTING_HDRS[RUN]: self.stats[player_id] += int(brow[7])
-                                elif stat == BATTING_HDRS[HIT]: self.stats[player_id] += int(brow[8])
-                                elif stat == BATTING_HDRS[B2]: self.stats[player_id] += int(brow[9])
-                                elif stat == BATTING_HDRS[B3]: self.stats[player_id] += int(brow[10])
-                                elif stat == BATTING_HDRS[HR] and int(brow[11]) > 0:
-                                    self.lgr.info(F"found {brow[11]} extra HRs for {player_id}!")
-                                    self.stats[player_id] += int(brow[11])
-                                elif stat == BATTING_HDRS[XBH]:
-                                    self.stats[player_id] += ( int(brow[9]) + int(brow[10]) + int(brow[11]) )
-                                elif stat == BATTING_HDRS[RBI] and int(brow[12]) > 0:
-                                    self.lgr.info(F"found {brow[12]} extra RBIs for {player_id}!")
-                                    self.stats[player_id] += int(brow[12])
-                                elif stat == BATTING_HDRS[BB]: self.stats[player_id] += int(brow[16])
-                                ibb = int(brow[17])
-                                if stat == BATTING_HDRS[IBB] and ibb > 0:
-                                    self.stats[player_id] += ibb
-                                elif stat == BATTING_HDRS[SO]: self.stats[player_id] += int(brow[18])
-                                elif stat == BATTING_HDRS[SB]: self.stats[player_id] += int(brow[19])
-                                elif stat == BATTING_HDRS[CS]: self.stats[player_id] += int(brow[20])
-                                elif stat == BATTING_HDRS[SH]: self.stats[player_id] += int(brow[13])
-                                elif stat == BATTING_HDRS[SF]: self.stats[player_id] += int(brow[14])
-                                elif stat == BATTING_HDRS[HBP]: self.stats[player_id] += int(brow[15])
-                                elif stat == BATTING_HDRS[GDP]: self.stats[player_id] += int(brow[21])
-                                tb = int(brow[8]) + int(brow[9]) + (2 * int(brow[10])) + (3 * int(brow[11]))
-                                if stat == BATTING_HDRS[TB] and tb > 0:
-                                    self.lgr.info(F"found extra TBs for {player_id}!")
-                                    self.stats[player_id] += tb
-                                elif stat in RATE_STATS:
-                                    self.stats[player_id][BATTING_HDRS[PA]] += pa
-                                    self.stats[player_id][BATTING_HDRS[AB]] += int(brow[6])
-                                    if int(brow[8]) > 0:
-                                        self.lgr.info(F"AB: found {brow[8]} extra hits for {player_id}!")
-                                        self.stats[player_id][BATTING_HDRS[HIT]] += int(brow[8])
-                                    self.stats[player_id][BATTING_HDRS[BB]] += int(brow[16])
-                                    self.stats[player_id][BATTING_HDRS[SF]] += int(brow[14])
-                                    self.stats[player_id][BATTING_HDRS[HBP]] += int(brow[15])
-                                    self.stats[player_id][BATTING_HDRS[TB]] += tb
-            except FileNotFoundError:
-                continue
-
-    def print_ldr_stats(self):
-        print(F"\n{self.stat} leaders for {self.start}{':' if self.end == self.start else F' -> {self.end}:'}")
-        result = copy.copy(self.stats)
-        calc_rate = self.stat in RATE_STATS
-        # calculations for rate stats
-        if calc_rate:
-            for key in result:
-                ab = result[key][BATTING_HDRS[AB]]
-                pa = result[key][BATTING_HDRS[PA]]
-                if pa < self.min_pa:
-                    result[key] = 0.0
-                else:
-                    if self.stat == BATTING_HDRS[BA]:
-                        ba = result[key][BATTING_HDRS[HIT]] / ab if ab > 0 else 0.0
-                        result[key] = round( ba, 3 )
-                    else:
-                        bb_hbp = result[key][BATTING_HDRS[BB]] + result[key][BATTING_HDRS[HBP]]
-                        obp_num = result[key][BATTING_HDRS[HIT]] + bb_hbp
-                        obp_denom = result[key][BATTING_HDRS[AB]] + result[key][BATTING_HDRS[SF]] + bb_hbp
-                        obp = obp_num / obp_denom if obp_denom > 0 else 0.0
-                        slg = result[key][BATTING_HDRS[TB]] / ab if ab > 0 else 0.0
-                        if self.stat == BATTING_HDRS[OBP]:
-                            result[key] = round( obp, 3 )
-                        elif self.stat == BATTING_HDRS[SLG]:
-                            result[key] = round( slg, 3 )
-                        elif self.stat == BATTING_HDRS[OPS]:
-                            result[key] = round( obp + slg, 3 )
-
-        # sort the leaders DESC by the chosen stat
-        vals_sorted = { k:v for k, v in sorted(result.items(), key = lambda x:x[1], reverse = True) }
-        vals = {}
-        ct = val = 0
-        # get up to the specified number of entries, plus ties
-        for key in vals_sorted:
-            if vals_sorted[key] == 0.0:
-                break
-            if ct == self.limit:
-                if vals_sorted[key] < val:
-                    break
-                else:
-                    ct -= 1
-            val = vals_sorted[key]
-            vals[key] = val
-            ct += 1
+        for current_id, brows in self.box_supplement.get_missing_games(year, self.game_ids):
+            self.lgr.info(F"found NEW game '{current_id}' in Boxscore file.")
+            for brow in brows:
+                if brow[1] == "bline":
+                    player_id = brow[2]
+                    self.lgr.debug(F"found player '{player_id}' in boxscore game {current_id}")
+                    bplayer_id = bytes(player_id, UTF8_ENCODING)
+                    if bplayer_id in self.table:
+                        self.add_bline_stats( bplayer_id, self.parse_bline(brow, player_id), year )
+
+    def add_bline_stats(self, player_id:bytes, values:dict, year:str):
+        self.table.add_row(player_id, values)
+
+    def parse_bline(self, brow:list, player_id:str) -> dict:
+        """Get all the counting stats in a boxscore batting stat line."""
+        # key: 'stat','bline',id,side,pos,seq,ab,r,h,2b,3b,hr,rbi,sh,sf,hbp,bb,ibb,k, sb,cs,gidp,int
+        #       0      1      2  3    4   5   6  7 8 9  10 11 12  13 14 15  16 17  18 19 20  21  22
+        ab, hit, b2, b3, hr, rbi = int(brow[6]), int(brow[8]), int(brow[9]), int(brow[10]), int(brow[11]), int(brow[12])
+        pa = ab + int(brow[13]) + int(brow[14]) + int(brow[15]) + int(brow[16]) + int(brow[22])
+        tb = hit + b2 + (2 * b3) + (3 * hr)
+        if hr > 0:
+            self.lgr.info(F"found {hr} extra HRs for {player_id}!")
+        if rbi > 0:
+            self.lgr.info(F"found {rbi} extra RBIs for {player_id}!")
+        return { BATTING_HDRS[GM]:1, BATTING_HDRS[PA]:max(pa, 0), BATTING_HDRS[AB]:ab, BATTING_HDRS[RUN]:int(brow[7]),
+                 BATTING_HDRS[HIT]:hit, BATTING_HDRS[B2]:b2, BATTING_HDRS[B3]:b3, BATTING_HDRS[HR]:max(hr, 0),
+                 BATTING_HDRS[XBH]:b2 + b3 + hr, BATTING_HDRS[RBI]:max(rbi, 0), BATTING_HDRS[SO]:int(brow[18]),
+                 BATTING_HDRS[BB]:int(brow[16]), BATTING_HDRS[IBB]:max(int(brow[17]), 0), BATTING_HDRS[SB]:int(brow[19]),
+                 BATTING_HDRS[CS]:int(brow[20]), BATTING_HDRS[SH]:int(brow[13]), BATTING_HDRS[SF]:int(brow[14]),
+                 BATTING_HDRS[HBP]:int(brow[15]), BATTING_HDRS[GDP]:int(brow[21]), BATTING_HDRS[TB]:max(tb, 0) }
+
+    def calc_rate_values(self, stats:list) -> dict:
+        """The value of each rate stat in 'stats' for every player in the table, all computed on whole columns."""
+        return calc_rate_stats(self.table, stats, self.min_pa)
+
+    def get_stat_array(self, stat:str) -> np.ndarray:
+        """The value of 'stat' for each player in the table, in table order, derived from the counting stats."""
+        if stat in self.rate_stats:
+            if stat not in self.rate_values:
+                # every rate stat requested is computed in one pass
+                self.rate_values.update( self.calc_rate_values([ rstat for rstat in self.stat_list if rstat in self.rate_stats
+                                                                 and rstat not in self.rate_values ]) )
+            return self.rate_values[stat]
+        return self.table.get_column(stat)
+
+    def print_all_ldr_stats(self):
+        for stat in self.stat_list:
+            self.print_ldr_stats(stat)
+
+    def print_ldr_stats(self, stat:str):
+        print(F"\n{'lowest ' if self.lowest else ''}{stat} leaders for {self.start}{':' if self.end == self.start else F' -> {self.end}:'}")
+        with timer.phase("rank"):
+            vals = self.get_leaders(stat)
+            # tied players share the best rank of the tie, leaving a gap after it, i.e. 1,2,2,4
+            ranks = dict( zip( vals, competition_ranks( np.array( list(vals.values()) ) ).tolist() ) )
 
         # get the real names from the roster files
-        vals_named, names = self.get_real_names(vals)
-        vals_sorted = { k:v for k, v in sorted(vals_named.items(), key = lambda x:x[1], reverse = True) }
+        with timer.phase("get_real_names"):
+            vals_named, names = self.get_real_names(vals)
+
+        with timer.phase("print"):
+            self.print_leaders(stat, vals_named, names, ranks)
+
+    def get_leaders(self, stat:str) -> dict:
+        """
+        The top players for 'stat', up to the limit plus ties, best first:
+            the players with a value of zero are left out, but if 'lowest', the bottom players with at least the minimum PA.
+        """
+        values = self.get_stat_array(stat)
+        if self.lowest:
+            qualified = self.table.get_column(BATTING_HDRS[PA]) >= max(self.min_pa, 1)
+            rows = select_bottom(values, self.limit, qualified)
+        else:
+            rows = select_top(values, self.limit, values > 0)
+        players = self.table.get_players()
+        return { players[row].decode(UTF8_ENCODING):values[row].item() for row in rows }
+
+    def print_leaders(self, stat:str, vals_named:dict, names:dict, ranks:dict):
+        """Print the leaders, which are already in rank order, each with its rank by player id."""
+        calc_rate = stat in self.rate_stats
 
         # print the entries
-        print(F"{'Player'.ljust(PLAYER_SPACE)}{self.stat.ljust(STAT_SPACE)}{'PA' if calc_rate else ''}")
-        print(F"{'------'.ljust(PLAYER_SPACE)}{'-----'.ljust(STAT_SPACE)}{'-----' if calc_rate else ''}")
+        print(F"{'Rank'.ljust(RANK_SPACE)}{'Player'.ljust(PLAYER_SPACE)}{stat.ljust(STAT_SPACE)}{'PA' if calc_rate else ''}")
+        print(F"{'----'.ljust(RANK_SPACE)}{'------'.ljust(PLAYER_SPACE)}{'-----'.ljust(STAT_SPACE)}{'-----' if calc_rate else ''}")
         line = 0
-        for key in vals_sorted:
+        for key in vals_named:
             line += 1
             if calc_rate:
-                pstat = F"{vals_sorted[key]:1.{BAT_RND_PRECISION}f}"
-                pa = F"{self.stats[names[key]][BATTING_HDRS[PA]]}"
+                pstat = F"{vals_named[key]:1.{BAT_RND_PRECISION}f}"
+                pa = F"{self.table.get_row( bytes(names[key], UTF8_ENCODING) )[BATTING_HDRS[PA]]}"
             else:
                 pa = ''
-                pstat = F"{vals_sorted[key]}"
-            print(F"{key:{PLAYER_SPACE}}{pstat.ljust(STAT_SPACE)}{pa}")
+                pstat = F"{vals_named[key]}"
+            print(F"{ranks[names[key]]:<{RANK_SPACE}}{key:{PLAYER_SPACE}}{pstat.ljust(STAT_SPACE)}{pa}")
             if line % 10 == 0:
                 print()
 
     def get_real_names(self, vals:dict) -> (dict,dict):
+        """Look up the full name of each player from the person directory."""
         vwnames = {}
         names = {}
-        try:
-            for year in range(self.start, self.end+1):
-                # get the team files
-                team_file_name = osp.join(REG_SEASON_FOLDER, "TEAM" + str(year))
-                self.lgr.debug(F"team file name = {team_file_name}")
-                if not osp.exists(team_file_name):
-                    self.lgr.exception(F"CANNOT find team file {team_file_name}!")
-                    continue
-                with open(team_file_name, newline = '') as team_csvfile:
-                    team_reader = csv.reader(team_csvfile)
-                    for trow in team_reader:
-                        rteam = trow[0]
-                        self.lgr.debug(F"Found team {rteam}")
-                        # search rosters for each player's full name
-                        roster_file = osp.join(ROSTERS_FOLDER, rteam + str(year) + osp.extsep + "ROS")
-                        self.lgr.debug(F"roster file name = {roster_file}")
-                        if not osp.exists(roster_file):
-                            raise FileNotFoundError(F"CANNOT find roster file {roster_file}!")
-                        with open(roster_file, newline = '') as roster_csvfile:
-                            ros_reader = csv.reader(roster_csvfile)
-                            for rrow in ros_reader:
-                                if rrow[0] in vals.keys():
-                                    pers_name = F"{rrow[2]} {rrow[1]}"
-                                    names[pers_name] = rrow[0]
-                                    vwnames[pers_name] = vals[rrow[0]]
-        except Exception as ex:
-            raise ex
+        for pers_id, val in vals.items():
+            pers_name = self.people.get_full_name(pers_id)
+            if pers_name is None:
+                self.lgr.warning(F"CANNOT find player '{pers_id}' in the roster files!")
+                continue
+            names[pers_name] = pers_id
+            vwnames[pers_name] = val
         return vwnames, names
 # END class PrintBattingLeaders
 
 
-def process_bl_args():
+def get_stat_list(p_stats:str, hdrs:list) -> list:
+    """Parse a comma-separated list of stats, or 'all': a stat may be given without the padding in its header."""
+    if p_stats.strip().lower() == ALL_STATS:
+        return list(hdrs)
+    stat_names = { hdr.strip():hdr for hdr in hdrs }
+    stats = []
+    for name in p_stats.split(','):
+        stat = stat_names.get( name.strip().upper() )
+        if stat is None:
+            print(F">>> IMPROPER stat '{name}'! Skipping it.\n")
+        elif stat not in stats:
+            stats.append(stat)
+    return stats
+
+
+def process_bl_args(hdrs:list = BATTING_HDRS, prog:str = PROGRAM_NAME):
     """Use ArgumentParser to specify command line arguments for batting leaders."""
-    arg_parser = ArgumentParser(description = PROGRAM_DESC, prog = "python3 " + PROGRAM_NAME)
+    arg_parser = ArgumentParser(description = PROGRAM_DESC, prog = "python3 " + prog)
     # required arguments
     required = arg_parser.add_argument_group('REQUIRED')
     required.add_argument('-y', '--start_year', required = True, type = int, metavar = "YEAR",
                           help = "(start) year to find stats <yyyy>")
-    required.add_argument('-s', '--stat', required = True, help = F"batting stat to find: {BATTING_HDRS}")
+    # argparse formats the help with %, so escape the % of stats such as K%
+    required.add_argument('-s', '--stat', required = True,
+                          help = F"batting stat(s) to find, separated by commas, or '{ALL_STATS}': {str(hdrs).replace('%', '%%')}")
     # optional arguments
     arg_parser.add_argument('-e', '--end_year', type = int, metavar = "YEAR", help = "end year to find stats <yyyy>")
     arg_parser.add_argument('-l', '--limit', type = int, default = DEFAULT_LIMIT,
                             help = F"# of players to print: default = {DEFAULT_LIMIT}, MIN = {MIN_LIMIT}, MAX = {MAX_LIMIT}")
     arg_parser.add_argument('-a', '--pa', type = int, help = F"for rate stats: number of PA needed to qualify")
+    arg_parser.add_argument('-j', '--jobs', type = int, default = 1,
+                            help = F"number of worker processes to read the event files: default = 1, MAX = {MAX_JOBS}")
+    arg_parser.add_argument('-t', '--threads', action = "store_true",
+                            help = "with -j: use worker threads instead of processes to read the event files")
+    arg_parser.add_argument('-w', '--lowest', action = "store_true",
+                            help = "find the players with the LOWEST values, among those with the minimum PA")
+    arg_parser.add_argument('-d', '--store', metavar = "PATH", nargs = '?', const = STORE_PATH,
+                            help = F"take the {REG_SEASON} stats from the events in the SQLite store at PATH: default = {STORE_PATH}")
     arg_parser.add_argument('-p', '--post', action = "store_true", help = F"find {POST_SEASON} games instead of {REG_SEASON}")
     arg_parser.add_argument('-q', '--quiet', action = "store_true", help = "NO logging")
     arg_parser.add_argument('-c', '--levcon', metavar = "LEVEL", default = lg.getLevelName(DEFAULT_CONSOLE_LEVEL),
                             help = "set LEVEL of console logging output")
     arg_parser.add_argument('-f', '--levfile', metavar = "LEVEL", default = lg.getLevelName(DEFAULT_FILE_LEVEL),
                             help = "set LEVEL of file logging output")
+    arg_parser.add_argument('--timings', metavar = "FILE", nargs = '?', const = TIMINGS_STDOUT, help = TIMINGS_HELP)
     return arg_parser
 
 
-def process_bl_input(argl:list):
+def process_bl_input(argl:list, hdrs:list = BATTING_HDRS, default_stat:str = DEFAULT_STAT, prog:str = PROGRAM_NAME):
     """Process command line input for batting leaders."""
-    argp = process_bl_args().parse_args(argl)
+    argp = process_bl_args(hdrs, prog).parse_args(argl)
 
     con_level = lg.getLevelName(QUIET_LOG_LEVEL) if argp.quiet else argp.levcon.strip().upper()
     try:
@@ -446,11 +393,10 @@ def process_bl_input(argl:list):
         print(F"Problem with file log level: {repr(ae)}")
         file_level = DEFAULT_FILE_LEVEL
 
-    if argp.stat in BATTING_HDRS:
-        stat = argp.stat
-    else:
-        print(F">>> IMPROPER stat '{argp.stat}'! Using default value = {DEFAULT_STAT}.\n")
-        stat = DEFAULT_STAT
+    stats = get_stat_list(argp.stat, hdrs)
+    if not stats:
+        print(F">>> IMPROPER stat '{argp.stat}'! Using default value = {default_stat}.\n")
+        stats = [default_stat]
 
     if MIN_LIMIT <= argp.limit <= MAX_LIMIT:
         limit = argp.limit
@@ -473,25 +419,46 @@ def process_bl_input(argl:list):
 
     minpa = argp.pa if argp.pa and 16000 > argp.pa > 0 else 0
 
-    return stat, start, end, limit, minpa, argp.post, con_level, file_level
+    if 1 <= argp.jobs <= MAX_JOBS:
+        jobs = argp.jobs
+    else:
+        print(F">>> IMPROPER jobs '{argp.jobs}'! Using {MAX_JOBS if argp.jobs > MAX_JOBS else 1}.\n")
+        jobs = MAX_JOBS if argp.jobs > MAX_JOBS else 1
+
+    store = argp.store
+    if store and argp.post:
+        print(F">>> The store has ONLY {REG_SEASON} events! Using the {POST_SEASON} event files.\n")
+        store = None
+    elif store and not osp.exists(store):
+        print(F">>> CANNOT find the store '{store}'! Using the event files.\n")
+        store = None
+
+    return ( stats, start, end, limit, minpa, jobs, argp.threads, argp.lowest, store, argp.post,
+             con_level, file_level, argp.timings )
 
 
 def main_batting_leaders(args:list):
-    stat, start, end, limit, minpa, post, conlevel, filelevel = process_bl_input(args)
+    stats, start, end, limit, minpa, jobs, threads, lowest, store, post, conlevel, filelevel, timings = \
+        process_bl_input(args)
+    if timings:
+        timer.enable()
 
     lg_ctrl = MhsLogger( __file__, con_level = conlevel, file_level = filelevel, folder = osp.join("logs", "leaders") )
     lgr = lg_ctrl.get_logger()
     lgr.info(F"Logging: console level = {repr(conlevel)}; file level = {repr(filelevel)}")
-    lgr.warning(F"stat = {stat}; years: {start} -> {end}; # {limit} (and ties)")
+    lgr.warning(F"stats = {stats}; years: {start} -> {end}; # {limit} (and ties)")
 
-    ldr_stats = PrintBattingLeaders(stat, start, end, limit, minpa, lgr)
+    ldr_stats = PrintBattingLeaders(stats, start, end, limit, minpa, jobs, lgr, lowest, threads, store)
     ldr_stats.get_events(post)
 
     season = POST_SEASON if post else REG_SEASON
     lgr.warning(F"found {ldr_stats.get_num_files()} {season} event files over {len(ldr_stats.event_files)} years.")
 
     ldr_stats.get_ldr_stats(season)
-    ldr_stats.print_ldr_stats()
+    ldr_stats.print_all_ldr_stats()
+    lgr.info(F"peak RSS = {get_peak_rss():.1f} MB")
+    if timings:
+        timer.write_report(timings)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,116 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# benchBoxExtract.py -- compare the per-field and raw struct ways of reading the box score lines from the Chadwick library
+#
+# The data processed by this software was obtained free of charge from and is copyrighted by Retrosheet.
+# Interested parties may contact Retrosheet at 20 Sunset Rd., Newark, DE 19711.
+#
+# Copyright (c) 2021 Mark Sattolo <epistemik@gmail.com>
+
+__author__       = "Mark Sattolo"
+__author_email__ = "epistemik@gmail.com"
+__created__ = "2026-10-18"
+__updated__ = "2026-10-18"
+
+import sys
+import time
+from argparse import ArgumentParser
+sys.path.append("/home/marksa/git/Python/utils")
+from mhsUtils import osp, get_filename, UTF8_ENCODING
+from cwCache import *
+from cwLibWrappers import free_box, free_game
+
+PROGRAM_DESC = "Time the extraction of the batting, pitching and fielding lines from the boxscores of Retrosheet event files."
+PROGRAM_NAME = get_filename(__file__)
+DEFAULT_EVENT_FILE = osp.join(osp.dirname(osp.abspath(__file__)), "corrected-retrosheet" + osp.sep + "1963KC1.EVA")
+DEFAULT_REPEATS = 5
+
+
+def extract_by_field(boxes:list) -> (np.ndarray, np.ndarray, np.ndarray):
+    """The original way: read every field of every struct as a Python attribute."""
+    bat_rows = []
+    pit_rows = []
+    fld_rows = []
+    for p_box, game_id in boxes:
+        bgame_id = bytes(game_id, UTF8_ENCODING)
+        for t in range(2):
+            for slot in range(1, 10):
+                player = MyCwlib.box_get_starter(p_box, t, slot)
+                while player:
+                    batting = player.contents.batting.contents
+                    bat_rows.append( (bgame_id, player.contents.player_id, t, slot)
+                                     + tuple(getattr(batting, fld) for fld in BATTING_FIELDS) )
+                    for pos in range(1, NUM_FIELDING_POSITIONS + 1):
+                        if player.contents.fielding[pos]:
+                            fielding = player.contents.fielding[pos].contents
+                            fld_rows.append( (bgame_id, player.contents.player_id, t, pos)
+                                             + tuple(getattr(fielding, fld) for fld in FIELDING_FIELDS) )
+                    player = player.contents.next
+            seq = 0
+            pitcher = MyCwlib.box_get_starting_pitcher(p_box, t)
+            while pitcher:
+                seq += 1
+                pitching = pitcher.contents.pitching.contents
+                pit_rows.append( (bgame_id, pitcher.contents.player_id, t, seq)
+                                 + tuple(getattr(pitching, fld) for fld in PITCHING_FIELDS) )
+                pitcher = pitcher.contents.next
+    return ( np.array(bat_rows, dtype = BAT_LINE_DTYPE), np.array(pit_rows, dtype = PIT_LINE_DTYPE),
+             np.array(fld_rows, dtype = FLD_LINE_DTYPE) )
+
+
+def extract_raw(boxes:list) -> (np.ndarray, np.ndarray, np.ndarray):
+    """The BoxLineExtractor way: copy each struct from its raw buffer."""
+    extractor = BoxLineExtractor()
+    for p_box, game_id in boxes:
+        extractor.add_box(p_box, game_id)
+    return extractor.get_lines()
+
+
+def time_extract(extract, boxes:list, repeats:int) -> (float, tuple):
+    """Best time of 'repeats' runs, and the result of the last run."""
+    best = None
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = extract(boxes)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main_bench_box_extract(args:list):
+    arg_parser = ArgumentParser(description = PROGRAM_DESC, prog = "python3 " + PROGRAM_NAME)
+    arg_parser.add_argument('efiles', nargs = '*', default = [DEFAULT_EVENT_FILE], help = "Retrosheet event file(s)")
+    arg_parser.add_argument('-r', '--repeats', type = int, default = DEFAULT_REPEATS,
+                            help = F"number of timed runs of each method: default = {DEFAULT_REPEATS}")
+    argp = arg_parser.parse_args(args)
+
+    # create all the boxscores first so only the extraction is timed
+    games = []
+    boxes = []
+    for efile in argp.efiles:
+        for game in read_games(efile, free = False):
+            games.append(game)
+            boxes.append( (MyCwlib.box_create(game), game.contents.game_id.decode(UTF8_ENCODING)) )
+    print(F"{len(boxes)} boxscores from {len(argp.efiles)} event file(s); best of {argp.repeats} runs:")
+
+    field_time, field_lines = time_extract(extract_by_field, boxes, argp.repeats)
+    raw_time, raw_lines = time_extract(extract_raw, boxes, argp.repeats)
+
+    for label, by_field, raw in zip( ("batting", "pitching", "fielding"), field_lines, raw_lines ):
+        if not np.array_equal(by_field, raw):
+            raise ValueError(F"{label} lines are NOT the same with the two methods!")
+        print(F"\t{len(raw):7} {label} lines")
+    print(F"per field  = {field_time:8.4f} seconds")
+    print(F"raw struct = {raw_time:8.4f} seconds")
+    print(F"speed-up   = {field_time / raw_time:8.2f}x")
+
+    for (box, _), game in zip(boxes, games):
+        free_box(box)
+        free_game(game)
+
+
+if __name__ == "__main__":
+    main_bench_box_extract(sys.argv[1:])
+    exit()
@@ -0,0 +1,308 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# benchSuite.py -- time each stage of the tools over a Retrosheet tree built from the bundled corrected-retrosheet files
+#
+# The data processed by this software was obtained free of charge from and is copyrighted by Retrosheet.
+# Interested parties may contact Retrosheet at 20 Sunset Rd., Newark, DE 19711.
+#
+# Copyright (c) 2021 Mark Sattolo <epistemik@gmail.com>
+
+__author__       = "Mark Sattolo"
+__author_email__ = "epistemik@gmail.com"
+__created__ = "2026-10-18"
+__updated__ = "2026-10-18"
+
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+sys.path.append("/home/marksa/git/Python/utils")
+from mhsUtils import lg, osp, get_filename, UTF8_ENCODING
+from cwLibWrappers import MyCwlib, read_games, box_scope, free_game
+from cwCache import BoxLineExtractor, BoxLineCache
+from cwCatalog import RetrosheetCatalog, REGULAR, POST, ROSTERS, BOXSCORES
+from cwPeople import PersonDirectory
+from cwAggregate import StatTable
+from battingLeaders import PrintBattingLeaders, get_file_stats, COUNTING_STATS
+from printPitchingStats import PrintPitchingStats
+from printGameSummary import PrintGameSummary
+from cwTools import REG_SEASON
+
+PROGRAM_DESC = "Time each stage of the Retrosheet tools over copies of the bundled corrected-retrosheet files."
+PROGRAM_NAME = get_filename(__file__)
+FIXTURE_FOLDER = osp.join(osp.dirname(osp.abspath(__file__)), "corrected-retrosheet")
+FIXTURE_EVENTS = osp.join(FIXTURE_FOLDER, "1963KC1.EVA")
+FIXTURE_TEAMS  = osp.join(FIXTURE_FOLDER, "TEAM1985")
+# the games in the fixture event file are home games of KC1 in 1963: each copy becomes the home games of another team
+FIXTURE_HOME = "KC1"
+FIXTURE_YEAR = "1963"
+BENCH_START_YEAR = 1985
+BENCH_STATS = ["HR", "OPS"]
+DEFAULT_SCALE = 1
+DEFAULT_REPEATS = 3
+DEFAULT_THRESHOLD = 0.25
+MS_PER_SEC = 1000
+
+STAGES = ["discover", "parse", "box", "collect_batting", "collect_pitching", "check_boxscores", "rank", "render"]
+
+
+def time_stage(stage, repeats:int) -> (float, int):
+    """Best time, in seconds, of 'repeats' runs of 'stage', and the number of games processed by the stage, if any."""
+    best = None
+    num_games = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        num_games = stage()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, num_games
+
+
+def write_boxscore_file(bfile:str, bat_lines):
+    """
+    A boxscore file with a 'bline' record for each batting line:
+        every game appears twice, under its own id, i.e. a duplicate of the event files, and as a NEW game with number 9.
+    """
+    games = {}
+    for line in bat_lines:
+        games.setdefault( line["game_id"].decode(UTF8_ENCODING), [] ).append(line)
+    with open(bfile, 'w') as fp:
+        for game_id, lines in games.items():
+            for gid in (game_id, game_id[:-1] + "9"):
+                fp.write(F"id,{gid}\n")
+                for ln in lines:
+                    # 'stat','bline',id,side,pos,seq,ab,r,h,2b,3b,hr,rbi,sh,sf,hbp,bb,ibb,k,sb,cs,gidp,int
+                    stats = [ ln[fld] for fld in ("ab","r","h","b2","b3","hr","bi","sh","sf","hp","bb","ibb","so",
+                                                  "sb","cs","gdp","xi") ]
+                    fp.write( F"stat,bline,{ln['player_id'].decode(UTF8_ENCODING)},{ln['team']},{ln['slot']},1,"
+                              + ','.join( str(int(st)) for st in stats ) + "\n" )
+
+
+class BenchSuite:
+    """
+    Build a Retrosheet tree in 'folder' from the bundled fixtures, then time each stage of the tools over it:
+        each season of the tree has an event file for every team in TEAM1985, each a copy of 1963KC1.EVA,
+        and 'scale' is the number of seasons.
+    """
+    def __init__(self, logger:lg.Logger, folder:str, scale:int = DEFAULT_SCALE, repeats:int = DEFAULT_REPEATS):
+        self.lgr = logger
+        self.folder = folder
+        self.years = [ BENCH_START_YEAR + ix for ix in range(scale) ]
+        self.repeats = repeats
+        self.folders = { REGULAR:osp.join(folder, "event", "regular"), POST:osp.join(folder, "event", "post"),
+                         ROSTERS:osp.join(folder, "rosters"), BOXSCORES:osp.join(folder, "boxscores") }
+        self.store_folder = osp.join(folder, "cache")
+        self.catalog = None
+        self.event_files = {}
+        self.num_games = 0
+        self.lines = []
+        self.results = {}
+
+    def build(self):
+        """Write the event, team, roster and boxscore files of the tree."""
+        for subfolder in list( self.folders.values() ) + [self.store_folder]:
+            os.makedirs(subfolder, exist_ok = True)
+        with open(FIXTURE_EVENTS) as fp:
+            events = fp.read()
+        with open(FIXTURE_TEAMS) as fp:
+            teams = [ row.split(',')[:2] for row in fp.read().splitlines() if row ]
+        players = set()
+        for year in self.years:
+            shutil.copy( FIXTURE_TEAMS, osp.join(self.folders[REGULAR], F"TEAM{year}") )
+            for team, league in teams:
+                efile = osp.join(self.folders[REGULAR], F"{year}{team}.EV{league}")
+                with open(efile, 'w') as fp:
+                    fp.write( events.replace("id," + FIXTURE_HOME + FIXTURE_YEAR, F"id,{team}{year}")
+                                    .replace("info,hometeam," + FIXTURE_HOME, F"info,hometeam,{team}") )
+            bat_lines, _ = BoxLineCache(self.lgr, self.store_folder, write = False).get_lines(efile)
+            write_boxscore_file( osp.join(self.folders[BOXSCORES], F"{year}.EBN"), bat_lines )
+            players.update( pid.decode(UTF8_ENCODING) for pid in bat_lines["player_id"] )
+        # one roster with every player, just to give the person directory a name for each of them
+        with open( osp.join(self.folders[ROSTERS], F"{FIXTURE_HOME}{self.years[0]}.ROS"), 'w' ) as fp:
+            for pid in sorted(players):
+                fp.write(F"{pid},{pid[:4].title()},{pid[4].upper()},R,R,{FIXTURE_HOME},X\n")
+
+    def get_people(self) -> PersonDirectory:
+        return PersonDirectory(self.lgr, self.folders[ROSTERS], self.store_folder)
+
+    def get_leaders(self) -> PrintBattingLeaders:
+        """The leaders tool over the tree, built ONCE outside the timed stages: its stats are cleared by each stage."""
+        ldr = PrintBattingLeaders( BENCH_STATS, self.years[0], self.years[-1], 10, 0, 1, self.lgr, catalog = self.catalog,
+                                   people = self.get_people(), store_folder = self.store_folder )
+        ldr.event_files = self.event_files
+        return ldr
+
+    def discover(self):
+        """Catalog the tree from scratch and find the event files of each season."""
+        catalog_path = osp.join(self.store_folder, "catalog.json")
+        if osp.exists(catalog_path):
+            os.remove(catalog_path)
+        self.catalog = RetrosheetCatalog(self.lgr, self.store_folder, self.folders)
+        self.event_files = self.catalog.get_years_events(self.years[0], self.years[-1], False)
+
+    def parse(self) -> int:
+        self.num_games = 0
+        for year_events in self.event_files.values():
+            for efile in year_events:
+                for _ in read_games(efile):
+                    self.num_games += 1
+        return self.num_games
+
+    def run(self) -> dict:
+        """Time every stage: return the best time in ms, and the games per second if it applies, of each stage."""
+        self.time("discover", self.discover)
+        self.time("parse", self.parse)
+
+        # read all the games once, so that only the boxscores are timed
+        games = [ game for year_events in self.event_files.values() for efile in year_events
+                  for game in read_games(efile, free = False) ]
+        try:
+            def box():
+                for game in games:
+                    with box_scope(game):
+                        pass
+                return len(games)
+            self.time("box", box)
+        finally:
+            for game in games:
+                free_game(game)
+
+        # the lines of each event file, extracted once for the collect stages
+        self.lines = []
+        for str_year, year_events in self.event_files.items():
+            for efile in year_events:
+                extractor = BoxLineExtractor()
+                for game in read_games(efile):
+                    with box_scope(game) as box:
+                        extractor.add_box( box, game.contents.game_id.decode(UTF8_ENCODING) )
+                bat_lines, pit_lines, _ = extractor.get_lines()
+                self.lines.append( (str_year, bat_lines, pit_lines) )
+
+        ldr = self.get_leaders()
+        def collect_batting():
+            ldr.table = StatTable(COUNTING_STATS)
+            ldr.game_ids.clear()
+            for str_year, bat_lines, _ in self.lines:
+                game_ids, players, sums = get_file_stats(bat_lines)
+                ldr.game_ids.update(game_ids)
+                ldr.collect_stats(players, sums, str_year)
+            return self.num_games
+        self.time("collect_batting", collect_batting)
+
+        # the stats of every pitcher in the first event file
+        pitchers = sorted( set( pid.decode(UTF8_ENCODING) for pid in self.lines[0][2]["player_id"] ) )
+        pitch_stats = PrintPitchingStats(self.lgr, self.catalog, ldr.people, self.store_folder)
+        def collect_pitching():
+            pitch_stats.player_years.clear()
+            for pit_id in pitchers:
+                for str_year, bat_lines, pit_lines in self.lines:
+                    pitch_stats.use_player_year(pit_id, REG_SEASON, str_year)
+                    pitch_stats.collect_stats(bat_lines, pit_lines, pit_id, str_year)
+            return self.num_games
+        self.time("collect_pitching", collect_pitching)
+
+        def check_boxscores():
+            for str_year in self.event_files:
+                ldr.check_boxscores(str_year)
+        self.time("check_boxscores", check_boxscores)
+
+        def rank():
+            with redirect_stdout( io.StringIO() ):
+                ldr.print_all_ldr_stats()
+        self.time("rank", rank)
+
+        # the summaries of the games in the first event file
+        efile = next( iter(self.event_files.values()) )[0]
+        pgs = PrintGameSummary(FIXTURE_HOME, False, self.lgr)
+        pgs.people = self.get_people()
+        def render():
+            num_render = 0
+            rosters = {}
+            with redirect_stdout( io.StringIO() ):
+                for game in read_games(efile):
+                    home = MyCwlib.game_info_lookup(game, b'hometeam')
+                    visitor = MyCwlib.game_info_lookup(game, b'visteam')
+                    for team in (home, visitor):
+                        if team not in rosters:
+                            rosters[team] = MyCwlib.roster_create(team, self.years[0], "AL", team, team)
+                    with box_scope(game) as box:
+                        pgs.print_summary(game, box, rosters[visitor], rosters[home])
+                    num_render += 1
+            return num_render
+        self.time("render", render)
+        return self.results
+
+    def time(self, name:str, stage):
+        seconds, num_games = time_stage(stage, self.repeats)
+        self.results[name] = { "ms":round(seconds * MS_PER_SEC, 3),
+                               "games_per_sec":round(num_games / seconds, 1) if num_games and seconds else None }
+        self.lgr.info(F"{name} = {self.results[name]}")
+
+# END class BenchSuite
+
+
+def compare_baseline(results:dict, baseline:dict, threshold:float) -> list:
+    """The stages that are slower than in 'baseline' by more than 'threshold', as a fraction of the baseline time."""
+    regressions = []
+    for stage, result in results.items():
+        base = baseline.get(stage)
+        if base and result["ms"] > base["ms"] * (1.0 + threshold):
+            regressions.append(F"{stage}: {result['ms']:.3f} ms vs baseline {base['ms']:.3f} ms")
+    return regressions
+
+
+def main_bench_suite(args:list) -> int:
+    arg_parser = ArgumentParser(description = PROGRAM_DESC, prog = "python3 " + PROGRAM_NAME)
+    arg_parser.add_argument('-s', '--scale', type = int, default = DEFAULT_SCALE,
+                            help = F"number of seasons of {FIXTURE_TEAMS[-8:]} teams in the tree: default = {DEFAULT_SCALE}")
+    arg_parser.add_argument('-r', '--repeats', type = int, default = DEFAULT_REPEATS,
+                            help = F"number of timed runs of each stage: default = {DEFAULT_REPEATS}")
+    arg_parser.add_argument('-b', '--baseline', metavar = "FILE", help = "json file of baseline times to compare with")
+    arg_parser.add_argument('-w', '--write', metavar = "FILE", help = "save the times as a json baseline file")
+    arg_parser.add_argument('-t', '--threshold', type = float, default = DEFAULT_THRESHOLD,
+                            help = F"fail if a stage is slower than its baseline by this fraction: default = {DEFAULT_THRESHOLD}")
+    arg_parser.add_argument('-d', '--folder', help = "build the tree in this folder and keep it, instead of a temporary one")
+    arg_parser.add_argument('-c', '--levcon', metavar = "LEVEL", default = "ERROR", help = "set LEVEL of logging output")
+    argp = arg_parser.parse_args(args)
+
+    lg.basicConfig( level = argp.levcon.strip().upper() )
+    lgr = lg.getLogger(PROGRAM_NAME)
+
+    with tempfile.TemporaryDirectory() as tmp_folder:
+        suite = BenchSuite(lgr, argp.folder if argp.folder else tmp_folder, max(argp.scale, 1), max(argp.repeats, 1))
+        suite.build()
+        results = suite.run()
+
+    print(F"{suite.num_games} games in {len(suite.years)} season(s); best of {suite.repeats} runs:")
+    for stage in STAGES:
+        gps = results[stage]["games_per_sec"]
+        print(F"\t{stage:18}{results[stage]['ms']:12.3f} ms" + (F"{gps:14.1f} games/sec" if gps else ''))
+
+    if argp.write:
+        with open(argp.write, 'w') as fp:
+            json.dump( {"scale":len(suite.years), "repeats":suite.repeats, "stages":results}, fp, indent = 4 )
+        print(F"saved baseline to {argp.write}")
+
+    if argp.baseline:
+        with open(argp.baseline) as fp:
+            baseline = json.load(fp)
+        if baseline.get("scale") != len(suite.years):
+            print(F">>> baseline scale {baseline.get('scale')} is NOT the same as {len(suite.years)}!")
+        regressions = compare_baseline(results, baseline["stages"], argp.threshold)
+        if regressions:
+            print(F"FAILED: {len(regressions)} stage(s) regressed by more than {argp.threshold:.0%}:")
+            for regression in regressions:
+                print(F"\t{regression}")
+            return 1
+        print(F"PASSED: no stage regressed by more than {argp.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit( main_bench_suite(sys.argv[1:]) )
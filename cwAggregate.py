@@ -0,0 +1,155 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# cwAggregate.py -- accumulate the stats of all players in one pass over the box score lines from Retrosheet data
+#
+# The data processed by this software was obtained free of charge from and is copyrighted by Retrosheet.
+# Interested parties may contact Retrosheet at 20 Sunset Rd., Newark, DE 19711.
+#
+# Copyright (c) 2021 Mark Sattolo <epistemik@gmail.com>
+
+__author__       = "Mark Sattolo"
+__author_email__ = "epistemik@gmail.com"
+__created__ = "2026-10-18"
+__updated__ = "2026-10-18"
+
+import numpy as np
+
+START_CAPACITY = 1024
+PLAYER_ID_DTYPE = "S8"
+
+# the CWBoxBatting fields summed for each batting counting stat
+BAT_STAT_FIELDS = { "G ":["g"], "PA":["pa"], "AB":["ab"], "R ":["r"], "H ":["h"], "2B":["b2"], "3B":["b3"], "HR":["hr"],
+                    "XBH":["b2","b3","hr"], "RBI":["bi"], "SO":["so"], "BB":["bb"], "IBB":["ibb"], "SB":["sb"],
+                    "CS":["cs"], "SH":["sh"], "SF":["sf"], "HBP":["hp"], "GDP":["gdp"],
+                    "TB":["h","b2","b3","b3","hr","hr","hr"] }
+# -1 in these fields means the value is unknown
+POSITIVE_STATS = ["RBI", "IBB"]
+RATE_PRECISION = 3
+
+
+def get_stat_column(lines:np.ndarray, stat:str) -> np.ndarray:
+    """The value of batting counting stat 'stat' in each line."""
+    column = np.zeros(len(lines), dtype = np.int64)
+    for field in BAT_STAT_FIELDS[stat]:
+        column += lines[field]
+    if stat in POSITIVE_STATS:
+        np.maximum(column, 0, out = column)
+    return column
+
+
+def get_stat_matrix(lines:np.ndarray, stats:list) -> np.ndarray:
+    """One row per line, one column per stat in 'stats'."""
+    matrix = np.zeros( (len(lines), len(stats)), dtype = np.int64 )
+    for ix, stat in enumerate(stats):
+        matrix[:, ix] = get_stat_column(lines, stat)
+    return matrix
+
+
+def sum_by_player(lines:np.ndarray, stats:list) -> (np.ndarray, np.ndarray):
+    """Totals of each stat for each player found in 'lines': players are returned in sorted order."""
+    players, rows = np.unique(lines["player_id"], return_inverse = True)
+    sums = np.zeros( (len(players), len(stats)), dtype = np.int64 )
+    np.add.at( sums, rows.ravel(), get_stat_matrix(lines, stats) )
+    return players, sums
+
+
+def safe_divide(num:np.ndarray, denom:np.ndarray) -> np.ndarray:
+    """num / denom for each element, or 0.0 where denom is NOT positive."""
+    result = np.zeros(len(num), dtype = np.float64)
+    np.divide(num, denom, out = result, where = denom > 0)
+    return result
+
+
+# each batting rate stat as a function of the counting stat columns, for every player at once
+BAT_RATE_FORMULAS = {
+    "BA"   : lambda col: safe_divide( col("H "), col("AB") ),
+    "OBP"  : lambda col: safe_divide( col("H ") + col("BB") + col("HBP"), col("AB") + col("BB") + col("HBP") + col("SF") ),
+    "SLG"  : lambda col: safe_divide( col("TB"), col("AB") ),
+    "OPS"  : lambda col: BAT_RATE_FORMULAS["OBP"](col) + BAT_RATE_FORMULAS["SLG"](col),
+    "ISO"  : lambda col: safe_divide( col("TB") - col("H "), col("AB") ),
+    "BABIP": lambda col: safe_divide( col("H ") - col("HR"), col("AB") - col("SO") - col("HR") + col("SF") ),
+    "K%"   : lambda col: safe_divide( col("SO"), col("PA") ),
+    "BB%"  : lambda col: safe_divide( col("BB"), col("PA") ),
+}
+
+
+def calc_rate_stats(table, stats:list, min_pa:float = 0) -> dict:
+    """
+    The value of each batting rate stat in 'stats' for every player in StatTable 'table', in table order,
+    rounded to RATE_PRECISION and 0.0 for the players with fewer than 'min_pa' PA.
+    """
+    columns = {}
+    def col(stat:str) -> np.ndarray:
+        if stat not in columns:
+            columns[stat] = table.get_column(stat)
+        return columns[stat]
+    qualified = col("PA") >= min_pa
+    return { stat:np.where( qualified, np.round(BAT_RATE_FORMULAS[stat](col), RATE_PRECISION), 0.0 ) for stat in stats }
+
+
+class StatTable:
+    """Totals of a fixed list of stats for any number of players: one row per player, one column per stat."""
+    def __init__(self, stats:list, capacity:int = START_CAPACITY):
+        self.stats = list(stats)
+        self.columns = { stat:ix for ix, stat in enumerate(self.stats) }
+        self.rows = {}
+        self.player_ids = np.zeros(capacity, dtype = PLAYER_ID_DTYPE)
+        self.data = np.zeros( (capacity, len(self.stats)), dtype = np.int64 )
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, player_id:bytes):
+        return player_id in self.rows
+
+    def get_players(self) -> np.ndarray:
+        return self.player_ids[:self.size]
+
+    def get_column(self, stat:str) -> np.ndarray:
+        return self.data[:self.size, self.columns[stat]]
+
+    def get_row(self, player_id:bytes) -> dict:
+        row = self.data[ self.rows[player_id] ]
+        return { stat:int(row[ix]) for stat, ix in self.columns.items() }
+
+    def get_rows(self, player_ids:np.ndarray) -> np.ndarray:
+        """Row index of each player, adding a row for any player not yet in the table."""
+        rows = np.empty(len(player_ids), dtype = np.int64)
+        for ix, pid in enumerate(player_ids):
+            row = self.rows.get(pid)
+            if row is None:
+                row = self.add_player(pid)
+            rows[ix] = row
+        return rows
+
+    def add_player(self, player_id:bytes) -> int:
+        if self.size == len(self.player_ids):
+            self.player_ids = np.concatenate( (self.player_ids, np.zeros(self.size, dtype = PLAYER_ID_DTYPE)) )
+            self.data = np.concatenate( (self.data, np.zeros_like(self.data)) )
+        row = self.size
+        self.player_ids[row] = player_id
+        self.rows[player_id] = row
+        self.size += 1
+        return row
+
+    def add(self, player_ids:np.ndarray, values:np.ndarray):
+        """Add a matrix of values, one row per player in 'player_ids' and one column per stat, to the table."""
+        if len(player_ids) == 0:
+            return
+        np.add.at( self.data, self.get_rows(player_ids), values )
+
+    def add_row(self, player_id:bytes, values:dict):
+        """Add the stats in 'values' to an existing or new player."""
+        row = self.rows.get(player_id)
+        if row is None:
+            row = self.add_player(player_id)
+        for stat, value in values.items():
+            self.data[row, self.columns[stat]] += value
+
+    def add_lines(self, lines:np.ndarray):
+        players, sums = sum_by_player(lines, self.stats)
+        self.add(players, sums)
+
+# END class StatTable
@@ -0,0 +1,124 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# cwAppearances.py -- persistent index of the players who appear in each Retrosheet event file
+#
+# The data processed by this software was obtained free of charge from and is copyrighted by Retrosheet.
+# Interested parties may contact Retrosheet at 20 Sunset Rd., Newark, DE 19711.
+#
+# Copyright (c) 2021 Mark Sattolo <epistemik@gmail.com>
+
+__author__       = "Mark Sattolo"
+__author_email__ = "epistemik@gmail.com"
+__created__ = "2026-10-18"
+__updated__ = "2026-10-18"
+
+import json
+import os
+import sys
+sys.path.append("/home/marksa/git/Python/utils")
+from mhsUtils import lg, osp, UTF8_ENCODING
+from cwConfig import CACHE_FOLDER
+from cwCatalog import RetrosheetCatalog, REGULAR, POST
+from cwPeople import PersonDirectory
+from cwTiming import timer
+
+APPEAR_VERSION = 1
+APPEAR_PREFIX  = "appear"
+# every player in a boxscore has a start or sub record in the event file
+PLAYER_TAGS = (b"start,", b"sub,")
+
+
+def scan_appearances(efile:str) -> list:
+    """The ids of all the players in the start and sub records of an event file, as plain text, in sorted order."""
+    players = set()
+    with open(efile, "rb") as fp:
+        for line in fp:
+            if line.startswith(PLAYER_TAGS):
+                players.add( line.split(b',', 2)[1].decode(UTF8_ENCODING) )
+    return sorted(players)
+
+
+class AppearanceIndex:
+    """
+    The players who appear in each event file of a season, i.e. each (player id, year, team, season type),
+    saved as json in the cache folder for each season and type of event files:
+        an event file is scanned again ONLY if its size or mtime has changed;
+        the years which have rosters but in which a player is on NONE of them are skipped without reading the index.
+    """
+    def __init__(self, logger:lg.Logger, catalog:RetrosheetCatalog = None, people:PersonDirectory = None,
+                 store_folder:str = CACHE_FOLDER):
+        self.lgr = logger
+        self.catalog = catalog if catalog else RetrosheetCatalog(logger)
+        self.people = people if people else PersonDirectory(logger)
+        self.store_folder = store_folder
+        self.seasons = {}
+
+    def get_path(self, year:int, post:bool) -> str:
+        return osp.join(self.store_folder, F"{APPEAR_PREFIX}{year}{POST if post else REGULAR}.json")
+
+    def get_appearances(self, year:int, post:bool) -> dict:
+        """Event file name -> [size, mtime, player ids] for each event file of the season."""
+        if (year, post) not in self.seasons:
+            with timer.phase("appearances"):
+                self.seasons[(year, post)] = self.load_appearances(year, post)
+        return self.seasons[(year, post)]
+
+    def load_appearances(self, year:int, post:bool) -> dict:
+        index_path = self.get_path(year, post)
+        saved = {}
+        if osp.exists(index_path):
+            with open(index_path) as fp:
+                index = json.load(fp)
+            if index.get("version") == APPEAR_VERSION:
+                saved = index["files"]
+        appearances = {}
+        changed = False
+        for efile in self.catalog.get_event_files(year, post):
+            name = osp.basename(efile)
+            # from the file itself, so a player in games appended in place is found
+            fstat = os.stat(efile)
+            size, mtime = fstat.st_size, fstat.st_mtime_ns
+            entry = saved.get(name)
+            if entry and entry[0] == size and entry[1] == mtime:
+                appearances[name] = entry
+                continue
+            self.lgr.debug(F"index the players who appear in {efile}")
+            appearances[name] = [ size, mtime, scan_appearances(efile) ]
+            changed = True
+        if changed or len(appearances) != len(saved):
+            try:
+                os.makedirs(self.store_folder, exist_ok = True)
+                tmp_path = index_path + ".tmp"
+                with open(tmp_path, 'w') as fp:
+                    json.dump( {"version":APPEAR_VERSION, "files":appearances}, fp, separators = (',', ':') )
+                os.replace(tmp_path, index_path)
+            except OSError as ose:
+                self.lgr.warning(F"CANNOT save the appearance index {index_path}: {repr(ose)}")
+        return appearances
+
+    def on_roster(self, player_ids:list, year:int) -> bool:
+        """False ONLY if there are rosters for 'year', every player is in the person directory and NONE of them is on those rosters."""
+        if not self.people.has_rosters(year):
+            return True
+        return any( pid not in self.people or self.people.get_stints(pid, year) for pid in player_ids )
+
+    def find_event_files(self, player_ids:list, year:int, post:bool) -> list:
+        """Paths of the event files of the season in which ANY of the players in 'player_ids' appears."""
+        if not self.on_roster(player_ids, year):
+            return []
+        appearances = self.get_appearances(year, post)
+        wanted = set(player_ids)
+        return [ efile for efile in self.catalog.get_event_files(year, post)
+                 if not wanted.isdisjoint( appearances[osp.basename(efile)][2] ) ]
+
+    def select_event_files(self, player_ids:list, event_files:dict, post:bool) -> dict:
+        """Keep only the event files, by year as a str, in which ANY of the players in 'player_ids' appears."""
+        selected = { str_year:self.find_event_files( player_ids, int(str_year), post ) for str_year in event_files }
+        num_all = sum( len(efiles) for efiles in event_files.values() )
+        num_selected = sum( len(efiles) for efiles in selected.values() )
+        timer.count("event_files_skipped", num_all - num_selected)
+        self.lgr.info(F"players {player_ids} appear in {num_selected} of {num_all} {POST if post else REGULAR} event files")
+        return selected
+
+# END class AppearanceIndex
@@ -0,0 +1,129 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# cwBoxscores.py -- indexed access to the Retrosheet boxscore files for games missing from the event files
+#
+# The data processed by this software was obtained free of charge from and is copyrighted by Retrosheet.
+# Interested parties may contact Retrosheet at 20 Sunset Rd., Newark, DE 19711.
+#
+# Copyright (c) 2021 Mark Sattolo <epistemik@gmail.com>
+
+__author__       = "Mark Sattolo"
+__author_email__ = "epistemik@gmail.com"
+__created__ = "2026-10-18"
+__updated__ = "2026-10-18"
+
+import csv
+import json
+import os
+import sys
+sys.path.append("/home/marksa/git/Python/utils")
+from mhsUtils import lg, osp, UTF8_ENCODING, BASE_DEV_FOLDER
+from cwConfig import CACHE_FOLDER, get_cache_name
+from cwTiming import timer
+
+BOXSCORE_FOLDER = osp.join(BASE_DEV_FOLDER, "Retrosheet" + osp.sep + "data" + osp.sep + "boxscores")
+BOXSCORE_TYPES  = ["EBN", "EBA"]
+INDEX_VERSION = 1
+INDEX_SUFFIX  = ".idx.json"
+GAME_ID_TAG   = b"id,"
+
+
+def build_game_index(bfile:str) -> dict:
+    """Scan a boxscore or event file once: map each game id to the byte offset and length of its block of records."""
+    index = {}
+    offset = 0
+    current_id = None
+    start = 0
+    with open(bfile, "rb") as fp:
+        for line in fp:
+            if line.startswith(GAME_ID_TAG):
+                if current_id:
+                    index[current_id] = (start, offset - start)
+                current_id = line[len(GAME_ID_TAG):].strip().decode(UTF8_ENCODING)
+                start = offset
+            offset += len(line)
+    if current_id:
+        index[current_id] = (start, offset - start)
+    return index
+
+
+def load_game_index(logger:lg.Logger, bfile:str, index_folder:str = CACHE_FOLDER) -> dict:
+    """Get the game index for a boxscore or event file: the saved index if current, else by scanning the file."""
+    fstat = os.stat(bfile)
+    # keyed by the name AND the absolute path, as files in different folders may have the same name
+    source = osp.abspath(bfile)
+    index_path = osp.join( index_folder, get_cache_name(bfile) + INDEX_SUFFIX )
+    if osp.exists(index_path):
+        with open(index_path) as fp:
+            saved = json.load(fp)
+        if saved.get("version") == INDEX_VERSION and saved.get("source") == source and saved["size"] == fstat.st_size \
+                and saved["mtime"] == fstat.st_mtime_ns:
+            logger.debug(F"read saved game index for {bfile}")
+            return { gid:tuple(span) for gid, span in saved["games"].items() }
+    logger.info(F"index the games of {bfile}")
+    index = build_game_index(bfile)
+    try:
+        os.makedirs(index_folder, exist_ok = True)
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, 'w') as fp:
+            json.dump( {"version":INDEX_VERSION, "source":source, "size":fstat.st_size,
+                        "mtime":fstat.st_mtime_ns, "games":index}, fp )
+        os.replace(tmp_path, index_path)
+    except OSError as ose:
+        logger.warning(F"CANNOT save the game index for {bfile}: {repr(ose)}")
+    return index
+
+
+class BoxscoreSupplement:
+    """
+    Find the games in the Retrosheet boxscore files (YEAR.EBN and YEAR.EBA) that are NOT in the event files:
+        each boxscore file is indexed ONCE into a game id -> (byte offset, length) table which is saved in the cache folder,
+        so only the records of the missing games are ever read and parsed.
+    """
+    def __init__(self, logger:lg.Logger, folder:str = BOXSCORE_FOLDER, index_folder:str = CACHE_FOLDER, catalog = None):
+        self.lgr = logger
+        self.folder = folder
+        self.index_folder = index_folder
+        # a cwCatalog.RetrosheetCatalog, if available, to find the boxscore files without checking the folder
+        self.catalog = catalog
+        self.indexes = {}
+
+    def get_files(self, year:str) -> list:
+        if self.catalog:
+            return self.catalog.get_boxscore_files( int(year) )
+        box_year = osp.join(self.folder, year)
+        return [ box_year + osp.extsep + btype for btype in BOXSCORE_TYPES if osp.exists(box_year + osp.extsep + btype) ]
+
+    def get_index(self, bfile:str) -> dict:
+        """Get the game index for a boxscore file: from memory, else see load_game_index()."""
+        if bfile not in self.indexes:
+            self.indexes[bfile] = load_game_index(self.lgr, bfile, self.index_folder)
+        return self.indexes[bfile]
+
+    def get_missing_games(self, year:str, played:set, player_id:str = None):
+        """
+        Yield the id and the csv records, excluding the id record, of each game in the boxscore files for 'year'
+        that is not in 'played': if 'player_id' is given, skip the games that do not mention that player.
+        """
+        bplayer = bytes(player_id, UTF8_ENCODING) if player_id else None
+        for bfile in self.get_files(year):
+            index = self.get_index(bfile)
+            missing = [ gid for gid in index if gid not in played ]
+            self.lgr.info(F"found {len(missing)} NEW and {len(index) - len(missing)} duplicate games in boxscore file {bfile}")
+            if not missing:
+                continue
+            with open(bfile, "rb") as fp:
+                for game_id in missing:
+                    offset, length = index[game_id]
+                    fp.seek(offset)
+                    block = fp.read(length)
+                    if bplayer and bplayer not in block:
+                        continue
+                    lines = block.decode(UTF8_ENCODING).splitlines()
+                    brows = list( csv.reader(line for line in lines[1:] if line) )
+                    timer.count("boxscore_games")
+                    timer.count( "boxscore_rows", len(brows) )
+                    yield game_id, brows
+
+# END class BoxscoreSupplement
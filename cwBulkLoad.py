@@ -0,0 +1,200 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# cwBulkLoad.py -- bulk load the Retrosheet events, games and subs of a range of years into the SQLite store of cwStore
+#
+# The data processed by this software was obtained free of charge from and is copyrighted by Retrosheet.
+# Interested parties may contact Retrosheet at 20 Sunset Rd., Newark, DE 19711.
+#
+# Copyright (c) 2021 Mark Sattolo <epistemik@gmail.com>
+
+__author__       = "Mark Sattolo"
+__author_email__ = "epistemik@gmail.com"
+__created__ = "2026-10-18"
+__updated__ = "2026-10-18"
+
+import csv
+import sys
+import time
+from argparse import ArgumentParser
+sys.path.append("/home/marksa/git/Python/utils")
+from mhsUtils import dt, now_dt, get_filename, get_current_time
+from mhsLogging import MhsLogger
+from cwTools import *
+from cwExport import EXPORT_FOLDER, EXPORT_TYPES, MAX_JOBS, RetrosheetExporter
+from cwStore import STORE_PATH, BATCH_SIZE, RetrosheetStore
+
+PROGRAM_DESC = "Bulk load the Retrosheet events, games and subs of the specified years into the SQLite store, " \
+               "parsing the years in worker processes."
+PROGRAM_NAME = get_filename(__file__)
+
+# settings of the connection for the load: the WAL journal with NORMAL sync still commits each year atomically,
+# but syncs only at checkpoints, and the large cache and in-memory temp store speed up the index builds
+BULK_PRAGMAS = { "journal_mode":"WAL", "synchronous":"NORMAL", "cache_size":-262144, "temp_store":"MEMORY" }
+
+
+def rows_per_sec(num_rows:int, secs:float) -> int:
+    return round(num_rows / secs) if secs > 0 else 0
+
+
+class BulkLoader:
+    """
+    Reload the events, games and subs of a range of years into the SQLite store as fast as the event files are parsed:
+        worker processes export the csv of each year with cwExport, i.e. do the Chadwick parsing, while this process,
+        the ONLY writer, loads each csv as soon as it is ready, so the load of one year overlaps the parsing of the others;
+        each year replaces its partition in one transaction and the indexes are built once after the load, NOT row by row.
+    """
+    def __init__(self, logger:lg.Logger, store_path:str = STORE_PATH, folder:str = EXPORT_FOLDER, jobs:int = 1,
+                 force:bool = False, keep_indexes:bool = False, batch_size:int = BATCH_SIZE):
+        self.lgr = logger
+        self.store = RetrosheetStore(logger, store_path)
+        self.exporter = RetrosheetExporter(logger, folder, jobs, force)
+        self.keep_indexes = keep_indexes
+        self.batch_size = batch_size
+        # [number of rows, seconds] loaded for each table
+        self.loaded = {}
+
+    def set_pragmas(self):
+        conn = self.store.connect()
+        for name, value in BULK_PRAGMAS.items():
+            conn.execute(F"PRAGMA {name} = {value}")
+
+    def load_csv(self, table:str, year:int, csv_path:str):
+        """Replace the rows of 'year' in 'table' with those of the csv at 'csv_path'."""
+        start = time.perf_counter()
+        with timer.phase(F"store_{table}"), open(csv_path, newline = '', encoding = UTF8_ENCODING) as csv_fp:
+            num_rows = self.store.replace_year( table, year, csv.reader(csv_fp), self.batch_size )
+        secs = time.perf_counter() - start
+        totals = self.loaded.setdefault(table, [0, 0.0])
+        totals[0] += num_rows
+        totals[1] += secs
+        timer.count(F"{table}_rows", num_rows)
+        self.lgr.info(F"loaded {num_rows} {table} rows of {year} in {secs:.3f} seconds = {rows_per_sec(num_rows, secs)} rows/sec")
+
+    def run(self, tables:list, start:int, end:int) -> int:
+        """Load 'tables' for each year from 'start' to 'end': return the number of exports that failed."""
+        self.store.create(indexes = self.keep_indexes)
+        self.set_pragmas()
+        if not self.keep_indexes:
+            self.store.drop_indexes(tables)
+        start_time = time.perf_counter()
+        try:
+            failures = self.exporter.run(tables, start, end, self.load_csv)
+        finally:
+            load_secs = time.perf_counter() - start_time
+            index_start = time.perf_counter()
+            self.store.create_indexes()
+            self.store.analyze()
+            self.lgr.warning(F"built the indexes and statistics in {time.perf_counter() - index_start:.3f} seconds")
+            self.store.close()
+        self.report(load_secs)
+        return failures
+
+    def report(self, load_secs:float):
+        """Log the rows/sec of the writes of each table and of the whole load, parsing included."""
+        total_rows = 0
+        for table, (num_rows, secs) in self.loaded.items():
+            total_rows += num_rows
+            self.lgr.warning(F"{table}: {num_rows} rows written in {secs:.3f} seconds = {rows_per_sec(num_rows, secs)} rows/sec")
+        self.lgr.warning(F"loaded {total_rows} rows in {load_secs:.3f} seconds = {rows_per_sec(total_rows, load_secs)} rows/sec")
+
+# END class BulkLoader
+
+
+def process_bulk_input(argl:list) -> (list, int, int, int, str, str, bool, bool, int, str, str, str):
+    """Process command line input for the bulk load."""
+    arg_parser = ArgumentParser(description = PROGRAM_DESC, prog = "python3 " + PROGRAM_NAME)
+    # required arguments
+    required = arg_parser.add_argument_group('REQUIRED')
+    required.add_argument('-y', '--start_year', required = True, type = int, metavar = "YEAR", help = "(start) year to load <yyyy>")
+    # optional arguments
+    arg_parser.add_argument('-e', '--end_year', type = int, metavar = "YEAR", help = "end year to load <yyyy>")
+    arg_parser.add_argument('-t', '--types', default = ','.join(EXPORT_TYPES),
+                            help = F"tables to load, separated by commas: default = all of {EXPORT_TYPES}")
+    arg_parser.add_argument('-j', '--jobs', type = int, default = MAX_JOBS,
+                            help = F"number of worker processes to parse the years: default = MAX = {MAX_JOBS}")
+    arg_parser.add_argument('-d', '--store', default = STORE_PATH, help = F"path of the SQLite store: default = {STORE_PATH}")
+    arg_parser.add_argument('-o', '--folder', default = EXPORT_FOLDER, help = F"folder for the csv files: default = {EXPORT_FOLDER}")
+    arg_parser.add_argument('-r', '--force', action = "store_true", help = "parse each year even if its csv is up to date")
+    arg_parser.add_argument('-i', '--keep_indexes', action = "store_true",
+                            help = "keep the indexes during the load, e.g. to reload a few years of a large store")
+    arg_parser.add_argument('-b', '--batch', type = int, default = BATCH_SIZE,
+                            help = F"number of rows per batch of inserts: default = {BATCH_SIZE}")
+    arg_parser.add_argument('-q', '--quiet', action = "store_true", help = "NO logging")
+    arg_parser.add_argument('-c', '--levcon', metavar = "LEVEL", default = lg.getLevelName(DEFAULT_CONSOLE_LEVEL),
+                            help = "set LEVEL of console logging output")
+    arg_parser.add_argument('-f', '--levfile', metavar = "LEVEL", default = lg.getLevelName(DEFAULT_FILE_LEVEL),
+                            help = "set LEVEL of file logging output")
+    arg_parser.add_argument('--timings', metavar = "FILE", nargs = '?', const = TIMINGS_STDOUT, help = TIMINGS_HELP)
+    argp = arg_parser.parse_args(argl)
+
+    con_level = lg.getLevelName(QUIET_LOG_LEVEL) if argp.quiet else argp.levcon.strip().upper()
+    try:
+        getattr( lg, con_level )
+    except AttributeError as ae:
+        print(F"Problem with console log level: {repr(ae)}")
+        con_level = DEFAULT_CONSOLE_LEVEL
+    file_level = argp.levfile.strip().upper()
+    try:
+        getattr( lg, file_level )
+    except AttributeError as ae:
+        print(F"Problem with file log level: {repr(ae)}")
+        file_level = DEFAULT_FILE_LEVEL
+
+    tables = [ table for table in EXPORT_TYPES if table in argp.types.lower().split(',') ]
+    if not tables:
+        print(F">>> IMPROPER types '{argp.types}'! Using all of {EXPORT_TYPES}.\n")
+        tables = EXPORT_TYPES
+
+    if not RETROSHEET_START_YEAR <= argp.start_year <= RETROSHEET_END_YEAR:
+        raise ValueError(F">>> INVALID start year '{argp.start_year}'!")
+    start = argp.start_year
+
+    if argp.end_year and RETROSHEET_START_YEAR <= argp.end_year <= RETROSHEET_END_YEAR and argp.end_year >= start:
+        end = argp.end_year
+    else:
+        if argp.end_year:
+            print(F">>> INVALID end year '{argp.end_year}'! Using end year = {start}.\n")
+        end = start
+
+    if 1 <= argp.jobs <= MAX_JOBS:
+        jobs = argp.jobs
+    else:
+        print(F">>> IMPROPER jobs '{argp.jobs}'! Using {MAX_JOBS if argp.jobs > MAX_JOBS else 1}.\n")
+        jobs = MAX_JOBS if argp.jobs > MAX_JOBS else 1
+
+    if argp.batch > 0:
+        batch = argp.batch
+    else:
+        print(F">>> IMPROPER batch '{argp.batch}'! Using {BATCH_SIZE}.\n")
+        batch = BATCH_SIZE
+
+    return tables, start, end, jobs, argp.store, argp.folder, argp.force, argp.keep_indexes, batch, \
+           con_level, file_level, argp.timings
+
+
+def main_cw_bulk_load(args:list) -> int:
+    tables, start, end, jobs, store_path, folder, force, keep_indexes, batch, conlevel, filelevel, timings = process_bulk_input(args)
+    if timings:
+        timer.enable()
+
+    lg_ctrl = MhsLogger( __file__, con_level = conlevel, file_level = filelevel, folder = osp.join("logs", "bulk") )
+    lgr = lg_ctrl.get_logger()
+    lgr.info(F"Logging: console level = {repr(conlevel)}; file level = {repr(filelevel)}")
+
+    failures = BulkLoader(lgr, store_path, folder, jobs, force, keep_indexes, batch).run(tables, start, end)
+    if failures:
+        lgr.error(F"{failures} exports FAILED!")
+    if timings:
+        timer.write_report(timings)
+    return failures
+
+
+if __name__ == "__main__":
+    if '-q' not in sys.argv:
+        print(F"\n\tStart time = {get_current_time()}\n")
+    result = main_cw_bulk_load(sys.argv[1:])
+    if '-q' not in sys.argv:
+        run_time = (dt.now() - now_dt).total_seconds()
+        print(F"\tRunning time = {(run_time // 60)} minutes, {(run_time % 60):2.3} seconds")
+    exit(1 if result else 0)
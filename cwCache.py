@@ -0,0 +1,294 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# cwCache.py -- persistent cache of the per-player per-game box score lines found in Retrosheet event files
+#
+# The data processed by this software was obtained free of charge from and is copyrighted by Retrosheet.
+# Interested parties may contact Retrosheet at 20 Sunset Rd., Newark, DE 19711.
+#
+# Original C code Copyright (c) 2002-2021
+# Dr T L Turocy, Chadwick Baseball Bureau (ted.turocy@gmail.com)
+#
+# Port to Python3, additions & modifications Copyright (c) 2021 Mark Sattolo <epistemik@gmail.com>
+
+__author__       = "Mark Sattolo"
+__author_email__ = "epistemik@gmail.com"
+__created__ = "2026-10-18"
+__updated__ = "2026-10-18"
+
+import hashlib
+import json
+import os
+import sys
+import numpy as np
+from ctypes import pointer, memmove, sizeof
+sys.path.append("/home/marksa/git/Python/utils")
+from mhsUtils import lg, osp, UTF8_ENCODING
+from cwLibWrappers import MyCwlib, chadwick, read_games, box_scope
+from cwTiming import timer
+from cwConfig import CACHE_FOLDER, get_cache_name
+from pychadwick.box import CWBoxBatting, CWBoxPitching, CWBoxFielding
+
+CACHE_VERSION = 3
+BAT_SUFFIX    = ".bat.npy"
+PIT_SUFFIX    = ".pit.npy"
+FLD_SUFFIX    = ".fld.npy"
+STAMP_SUFFIX  = ".json"
+GAME_ID_TAG   = b"id,"
+HASH_BLOCK_SIZE = 1 << 20
+START_CAPACITY  = 4096
+NUM_FIELDING_POSITIONS = 9
+
+# one fixed-width integer column for each int in the Chadwick structs
+BATTING_FIELDS  = [ fld[0] for fld in CWBoxBatting._fields_ ]
+PITCHING_FIELDS = [ fld[0] for fld in CWBoxPitching._fields_ ]
+FIELDING_FIELDS = [ fld[0] for fld in CWBoxFielding._fields_ ]
+LINE_KEYS = [ ("game_id", "S12"), ("player_id", "S8"), ("team", "i1") ]
+BAT_KEY_DTYPE = np.dtype( LINE_KEYS + [("slot", "i1")] )
+PIT_KEY_DTYPE = np.dtype( LINE_KEYS + [("seq", "i1")] )
+FLD_KEY_DTYPE = np.dtype( LINE_KEYS + [("pos", "i1")] )
+BAT_LINE_DTYPE = np.dtype( BAT_KEY_DTYPE.descr + [(fld, "i2") for fld in BATTING_FIELDS] )
+PIT_LINE_DTYPE = np.dtype( PIT_KEY_DTYPE.descr + [(fld, "i2") for fld in PITCHING_FIELDS] )
+FLD_LINE_DTYPE = np.dtype( FLD_KEY_DTYPE.descr + [(fld, "i2") for fld in FIELDING_FIELDS] )
+
+# same memory layout as the Chadwick structs, so a struct can be copied straight into an array row
+BAT_STRUCT_DTYPE = np.dtype( [(fld, np.intc) for fld in BATTING_FIELDS] )
+PIT_STRUCT_DTYPE = np.dtype( [(fld, np.intc) for fld in PITCHING_FIELDS] )
+FLD_STRUCT_DTYPE = np.dtype( [(fld, np.intc) for fld in FIELDING_FIELDS] )
+for struct, struct_dtype in ( (CWBoxBatting, BAT_STRUCT_DTYPE), (CWBoxPitching, PIT_STRUCT_DTYPE),
+                              (CWBoxFielding, FLD_STRUCT_DTYPE) ):
+    if sizeof(struct) != struct_dtype.itemsize:
+        raise ImportError(F"{struct.__name__} is {sizeof(struct)} bytes but its dtype is {struct_dtype.itemsize} bytes!")
+
+
+def line_sum(lines:np.ndarray, field:str, positive:bool = False) -> int:
+    """Total of column 'field' in 'lines': if 'positive', ignore the negative 'unknown' values."""
+    column = lines[field]
+    if positive:
+        column = column[column > 0]
+    return int( column.sum() )
+
+
+class StructBuffer:
+    """The key of each line, and the raw Chadwick struct of each line copied byte for byte into a growable array."""
+    def __init__(self, key_dtype:np.dtype, struct_dtype:np.dtype, line_dtype:np.dtype, capacity:int = START_CAPACITY):
+        self.key_dtype = key_dtype
+        self.keys = []
+        self.structs = np.zeros(capacity, dtype = struct_dtype)
+        self.address = self.structs.ctypes.data
+        self.line_dtype = line_dtype
+        self.itemsize = struct_dtype.itemsize
+        self.size = 0
+
+    def append(self, keys:tuple, p_struct:pointer):
+        if self.size == len(self.structs):
+            self.structs = np.concatenate( (self.structs, np.zeros_like(self.structs)) )
+            self.address = self.structs.ctypes.data
+        self.keys.append(keys)
+        memmove(self.address + self.size * self.itemsize, p_struct, self.itemsize)
+        self.size += 1
+
+    def get_lines(self) -> np.ndarray:
+        """Convert all the rows to the compact line format in one vectorized step per column."""
+        lines = np.zeros(self.size, dtype = self.line_dtype)
+        keys = np.array(self.keys, dtype = self.key_dtype)
+        for name in self.key_dtype.names:
+            lines[name] = keys[name]
+        for name in self.structs.dtype.names:
+            lines[name] = self.structs[name][:self.size]
+        return lines
+
+# END class StructBuffer
+
+
+class BoxLineExtractor:
+    """
+    Collect the batting, pitching and fielding lines of any number of boxscores:
+        each player's CWBoxBatting, CWBoxPitching and CWBoxFielding struct is copied from its raw buffer
+        into a preallocated array, instead of reading the struct one field at a time.
+    """
+    def __init__(self, capacity:int = START_CAPACITY):
+        self.batting  = StructBuffer(BAT_KEY_DTYPE, BAT_STRUCT_DTYPE, BAT_LINE_DTYPE, capacity)
+        self.pitching = StructBuffer(PIT_KEY_DTYPE, PIT_STRUCT_DTYPE, PIT_LINE_DTYPE, capacity)
+        self.fielding = StructBuffer(FLD_KEY_DTYPE, FLD_STRUCT_DTYPE, FLD_LINE_DTYPE, capacity)
+
+    def add_box(self, p_box:pointer, game_id:str):
+        bgame_id = bytes(game_id, UTF8_ENCODING)
+        for t in range(2):
+            for slot in range(1, 10):
+                player = MyCwlib.box_get_starter(p_box, t, slot)
+                while player:
+                    contents = player.contents
+                    self.batting.append( (bgame_id, contents.player_id, t, slot), contents.batting )
+                    fielding = contents.fielding
+                    for pos in range(1, NUM_FIELDING_POSITIONS + 1):
+                        if fielding[pos]:
+                            self.fielding.append( (bgame_id, contents.player_id, t, pos), fielding[pos] )
+                    player = contents.next
+            seq = 0
+            pitcher = MyCwlib.box_get_starting_pitcher(p_box, t)
+            while pitcher:
+                seq += 1
+                contents = pitcher.contents
+                self.pitching.append( (bgame_id, contents.player_id, t, seq), contents.pitching )
+                pitcher = contents.next
+
+    def get_lines(self) -> (np.ndarray, np.ndarray, np.ndarray):
+        return self.batting.get_lines(), self.pitching.get_lines(), self.fielding.get_lines()
+
+# END class BoxLineExtractor
+
+
+def extract_box_lines(p_box:pointer, game_id:str) -> (np.ndarray, np.ndarray, np.ndarray):
+    """Copy the batting, pitching and fielding lines of every player in ONE boxscore to structured arrays."""
+    extractor = BoxLineExtractor(capacity = 64)
+    extractor.add_box(p_box, game_id)
+    return extractor.get_lines()
+
+
+def file_hash(filename:str, length:int = None) -> str:
+    """Hash of the whole file, or of ONLY its first 'length' bytes."""
+    sha = hashlib.sha1()
+    remaining = length
+    with open(filename, "rb") as fp:
+        for block in iter(lambda: fp.read( HASH_BLOCK_SIZE if remaining is None else min(HASH_BLOCK_SIZE, remaining) ), b''):
+            sha.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return sha.hexdigest()
+
+
+def starts_new_game(efile:str, offset:int) -> bool:
+    """True if the 'id' record of a game starts at byte 'offset' of 'efile'."""
+    with open(efile, "rb") as fp:
+        fp.seek(offset)
+        return fp.read( len(GAME_ID_TAG) ) == GAME_ID_TAG
+
+
+class BoxLineCache:
+    """
+    Build-once store of the batting, pitching and fielding lines in each Retrosheet event file:
+        one memory-mappable .npy file of fixed-width records per event file and line type,
+        plus a stamp of the size, mtime and hash of the source file to decide when the lines must be rebuilt.
+    The stamp is also a checkpoint of the games already extracted: if games were ONLY appended to the file since,
+    as for the current season, just the new games are parsed and their lines added to the saved lines.
+    """
+    def __init__(self, logger:lg.Logger, folder:str = CACHE_FOLDER, write:bool = True):
+        self.lgr = logger
+        self.folder = folder
+        self.write = write
+        self.hits = self.misses = 0
+
+    def get_paths(self, efile:str) -> (str, str, str, str):
+        """The paths of the lines and stamp of 'efile', keyed by its name AND its absolute path: see get_cache_name()."""
+        base = osp.join( self.folder, get_cache_name(efile) )
+        return base + BAT_SUFFIX, base + PIT_SUFFIX, base + FLD_SUFFIX, base + STAMP_SUFFIX
+
+    def is_current(self, efile:str) -> bool:
+        """Lines are current if the source file has the same size and mtime, or failing that, the same hash."""
+        *line_paths, stamp_path = self.get_paths(efile)
+        if not ( osp.exists(stamp_path) and all(osp.exists(path) for path in line_paths) ):
+            return False
+        with open(stamp_path) as fp:
+            stamp = json.load(fp)
+        if stamp.get("version") != CACHE_VERSION:
+            return False
+        fstat = os.stat(efile)
+        if fstat.st_size != stamp["size"]:
+            return False
+        if fstat.st_mtime_ns == stamp["mtime"]:
+            return True
+        # touched but maybe not changed
+        if file_hash(efile) != stamp["sha1"]:
+            return False
+        stamp["mtime"] = fstat.st_mtime_ns
+        self.write_stamp(stamp_path, stamp)
+        return True
+
+    def get_lines(self, efile:str) -> (np.ndarray, np.ndarray):
+        """Get the batting and pitching lines for an event file: from the cache if current, else from the Chadwick library."""
+        bat_lines, pit_lines, _ = self.get_all_lines(efile)
+        return bat_lines, pit_lines
+
+    def get_checkpoint(self, efile:str) -> int:
+        """
+        The size of the event file when its lines were saved, if the file has grown since ONLY by games added at the end,
+        i.e. the saved bytes are unchanged and the new bytes start with a game; else None.
+        """
+        *line_paths, stamp_path = self.get_paths(efile)
+        if not ( osp.exists(stamp_path) and all(osp.exists(path) for path in line_paths) ):
+            return None
+        with open(stamp_path) as fp:
+            stamp = json.load(fp)
+        if stamp.get("version") != CACHE_VERSION or os.stat(efile).st_size <= stamp["size"]:
+            return None
+        if not starts_new_game(efile, stamp["size"]) or file_hash(efile, stamp["size"]) != stamp["sha1"]:
+            return None
+        return stamp["size"]
+
+    def load_lines(self, efile:str) -> (np.ndarray, np.ndarray, np.ndarray):
+        *line_paths, _ = self.get_paths(efile)
+        with timer.phase("load_cached_lines"):
+            return tuple( np.load(path, mmap_mode = 'r') for path in line_paths )
+
+    def get_all_lines(self, efile:str) -> (np.ndarray, np.ndarray, np.ndarray):
+        """Get the batting, pitching and fielding lines for an event file."""
+        timer.count("event_files")
+        if self.is_current(efile):
+            self.hits += 1
+            self.lgr.debug(F"read cached lines for {efile}")
+            all_lines = self.load_lines(efile)
+        else:
+            self.misses += 1
+            checkpoint = self.get_checkpoint(efile)
+            if checkpoint is not None:
+                self.lgr.info(F"extract ONLY the games added to {efile} after byte {checkpoint}")
+                saved_lines = self.load_lines(efile)
+                with timer.phase("extract_new_lines"):
+                    new_lines = self.parse_lines(efile, checkpoint)
+                all_lines = tuple( np.concatenate( (saved, new) ) for saved, new in zip(saved_lines, new_lines) )
+            else:
+                with timer.phase("extract_lines"):
+                    all_lines = self.parse_lines(efile)
+            if self.write:
+                try:
+                    with timer.phase("save_cached_lines"):
+                        self.save(efile, all_lines)
+                except OSError as ose:
+                    self.lgr.warning(F"CANNOT cache the lines for {efile}: {repr(ose)}")
+        timer.count( "player_lines", sum(len(lines) for lines in all_lines) )
+        return all_lines
+
+    def parse_lines(self, efile:str, offset:int = 0) -> (np.ndarray, np.ndarray, np.ndarray):
+        """Extract the lines of the games in 'efile' from byte 'offset' on."""
+        self.lgr.debug(F"parse lines from {efile}")
+        extractor = BoxLineExtractor()
+        # only one game and its boxscore are in memory at any time
+        for game in read_games(efile, offset = offset):
+            game_id = game.contents.game_id.decode(encoding = UTF8_ENCODING)
+            with box_scope(game) as box:
+                extractor.add_box(box, game_id)
+        return extractor.get_lines()
+
+    def save(self, efile:str, all_lines:tuple):
+        *line_paths, stamp_path = self.get_paths(efile)
+        os.makedirs(self.folder, exist_ok = True)
+        fstat = os.stat(efile)
+        for path, lines in zip(line_paths, all_lines):
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as fp:
+                np.save(fp, lines)
+            os.replace(tmp_path, path)
+        self.write_stamp( stamp_path, {"version":CACHE_VERSION, "source":osp.abspath(efile), "size":fstat.st_size,
+                                       "mtime":fstat.st_mtime_ns, "sha1":file_hash(efile)} )
+        self.lgr.debug(F"cached {len(all_lines[0])} batting, {len(all_lines[1])} pitching "
+                       F"and {len(all_lines[2])} fielding lines for {efile}")
+
+    @staticmethod
+    def write_stamp(stamp_path:str, stamp:dict):
+        tmp_path = stamp_path + ".tmp"
+        with open(tmp_path, 'w') as fp:
+            json.dump(stamp, fp)
+        os.replace(tmp_path, stamp_path)
+
+# END class BoxLineCache
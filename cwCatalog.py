@@ -0,0 +1,237 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# cwCatalog.py -- persistent catalog of the Retrosheet data files: teams, event, roster and boxscore files
+#
+# The data processed by this software was obtained free of charge from and is copyrighted by Retrosheet.
+# Interested parties may contact Retrosheet at 20 Sunset Rd., Newark, DE 19711.
+#
+# Copyright (c) 2021 Mark Sattolo <epistemik@gmail.com>
+
+__author__       = "Mark Sattolo"
+__author_email__ = "epistemik@gmail.com"
+__created__ = "2026-10-18"
+__updated__ = "2026-10-18"
+
+import csv
+import json
+import os
+import sys
+sys.path.append("/home/marksa/git/Python/utils")
+from mhsUtils import lg, osp
+from cwConfig import CACHE_FOLDER
+from cwBoxscores import BOXSCORE_FOLDER, BOXSCORE_TYPES
+from cwPeople import RETROSHEET_FOLDER, ROSTERS_FOLDER
+from cwTiming import timer
+
+EVENTS_FOLDER      = osp.join(RETROSHEET_FOLDER, "event")
+REG_SEASON_FOLDER  = osp.join(EVENTS_FOLDER, "regular")
+POST_SEASON_FOLDER = osp.join(EVENTS_FOLDER, "post")
+
+CATALOG_FILE = "catalog.json"
+CATALOG_VERSION = 1
+TEAM_PREFIX = "TEAM"
+# keys of the catalogued folders
+REGULAR   = "regular"
+POST      = "post"
+ROSTERS   = "rosters"
+BOXSCORES = "boxscores"
+CATALOG_FOLDERS = { REGULAR:REG_SEASON_FOLDER, POST:POST_SEASON_FOLDER, ROSTERS:ROSTERS_FOLDER, BOXSCORES:BOXSCORE_FOLDER }
+
+
+def scan_folder(folder:str) -> dict:
+    """Name -> [size, mtime] for each file in 'folder'."""
+    files = {}
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_file():
+                fstat = entry.stat()
+                files[entry.name] = [fstat.st_size, fstat.st_mtime_ns]
+    return files
+
+
+def is_year_file(name:str, str_year:str) -> bool:
+    """True if 'name' is a file of the year 'str_year', e.g. 1963KC1.EVA, 1963.EBA, TEAM1963 or KC11963.ROS."""
+    return name.startswith(str_year) or osp.splitext(name)[0].endswith(str_year)
+
+
+def read_team_file(team_file:str) -> list:
+    """[team, league, city, nickname] for each team in a Retrosheet TEAMyyyy file."""
+    with open(team_file, newline = '') as team_csvfile:
+        return [ trow[:4] for trow in csv.reader(team_csvfile) if trow ]
+
+
+class RetrosheetCatalog:
+    """
+    Manifest of the Retrosheet data folders, saved as json in the cache folder:
+        the name, size and mtime of every file in the regular and post-season event, roster and boxscore folders,
+        plus the teams of each year from the TEAMyyyy files.
+    On load, a folder is scanned again ONLY if its mtime has changed, i.e. files were added, removed or replaced,
+    so the tools find their files without reading the TEAM files on every run; as a file changed in place,
+    e.g. an event file with games appended, does NOT change the mtime of its folder, the files of a year are checked
+    with a stat the first time the year is requested in a run, so ONLY the files of the years used are ever checked.
+    """
+    def __init__(self, logger:lg.Logger, store_folder:str = CACHE_FOLDER, folders:dict = None):
+        self.lgr = logger
+        self.store_path = osp.join(store_folder, CATALOG_FILE)
+        self.folders = folders if folders else CATALOG_FOLDERS
+        self.manifest = None
+        self.checked_years = set()
+
+    def load(self):
+        """Read the saved manifest then refresh any folder that has changed since it was saved."""
+        with timer.phase("catalog"):
+            self.load_manifest()
+
+    def load_manifest(self):
+        self.manifest = {"version":CATALOG_VERSION, "folders":{}, "teams":{}}
+        if osp.exists(self.store_path):
+            with open(self.store_path) as fp:
+                saved = json.load(fp)
+            if saved.get("version") == CATALOG_VERSION:
+                self.manifest = saved
+        if self.refresh():
+            self.save()
+
+    def refresh(self) -> bool:
+        """Rescan each folder with a new mtime: return True if anything changed."""
+        changed = False
+        for key, folder in self.folders.items():
+            entry = self.manifest["folders"].get(key)
+            if not osp.isdir(folder):
+                if entry:
+                    self.lgr.warning(F"CANNOT find folder {folder}!")
+                    del self.manifest["folders"][key]
+                    changed = True
+                continue
+            mtime = os.stat(folder).st_mtime_ns
+            if entry and entry["path"] == folder and entry["mtime"] == mtime:
+                continue
+            self.scan(key, folder, mtime)
+            changed = True
+        return changed
+
+    def scan(self, key:str, folder:str, mtime:int):
+        """Catalog the files of 'folder' as folder 'key' and, for the regular season folder, read the TEAM files."""
+        self.lgr.info(F"scan folder {folder}")
+        files = scan_folder(folder)
+        self.manifest["folders"][key] = {"path":folder, "mtime":mtime, "files":files}
+        if key == REGULAR:
+            self.manifest["teams"] = { name[len(TEAM_PREFIX):]:read_team_file( osp.join(folder, name) )
+                                       for name in sorted(files) if name.startswith(TEAM_PREFIX) }
+
+    def check_year(self, year:int):
+        """Update the [size, mtime] of each catalogued file of 'year' changed in place, ONCE per run: save if any was."""
+        if year in self.checked_years:
+            return
+        self.checked_years.add(year)
+        manifest = self.get_manifest()
+        str_year = str(year)
+        changed = False
+        with timer.phase("catalog_year"):
+            for key, entry in list( manifest["folders"].items() ):
+                try:
+                    if self.update_year_files(key, entry, str_year):
+                        changed = True
+                except FileNotFoundError as fnfe:
+                    self.lgr.info(F"file {fnfe.filename} was removed from folder {entry['path']}")
+                    self.scan( key, entry["path"], os.stat(entry["path"]).st_mtime_ns )
+                    changed = True
+        if changed:
+            self.save()
+
+    def update_year_files(self, key:str, entry:dict, str_year:str) -> bool:
+        """
+        Update the [size, mtime] of each file of 'str_year' in the catalogued folder 'key' changed in place:
+        return True if any was. Raise FileNotFoundError if a catalogued file is gone, so the folder is scanned again.
+        """
+        updated = []
+        for name, info in entry["files"].items():
+            if not is_year_file(name, str_year):
+                continue
+            fstat = os.stat( osp.join(entry["path"], name) )
+            if info != [fstat.st_size, fstat.st_mtime_ns]:
+                entry["files"][name] = [fstat.st_size, fstat.st_mtime_ns]
+                updated.append(name)
+        for name in updated:
+            self.lgr.info(F"file {name} of folder {entry['path']} has changed")
+            if key == REGULAR and name.startswith(TEAM_PREFIX):
+                self.manifest["teams"][ name[len(TEAM_PREFIX):] ] = read_team_file( osp.join(entry["path"], name) )
+        return bool(updated)
+
+    def save(self):
+        try:
+            os.makedirs(osp.dirname(self.store_path), exist_ok = True)
+            tmp_path = self.store_path + ".tmp"
+            with open(tmp_path, 'w') as fp:
+                json.dump(self.manifest, fp, separators = (',', ':'))
+            os.replace(tmp_path, self.store_path)
+        except OSError as ose:
+            self.lgr.warning(F"CANNOT save the catalog: {repr(ose)}")
+
+    def get_manifest(self) -> dict:
+        if self.manifest is None:
+            self.load()
+        return self.manifest
+
+    def get_files(self, key:str) -> dict:
+        folder = self.get_manifest()["folders"].get(key)
+        return folder["files"] if folder else {}
+
+    def get_path(self, key:str, name:str) -> str:
+        """Full path of file 'name' in catalogued folder 'key', or None if not there."""
+        return osp.join(self.folders[key], name) if name in self.get_files(key) else None
+
+    def get_file_info(self, key:str, name:str) -> list:
+        """[size, mtime] of file 'name' in catalogued folder 'key', or None if not there."""
+        return self.get_files(key).get(name)
+
+    def get_years(self) -> list:
+        return sorted( int(year) for year in self.get_manifest()["teams"] )
+
+    def get_teams(self, year:int) -> list:
+        """[team, league, city, nickname] for each team in 'year', or None if there is no TEAM file for 'year'."""
+        self.check_year(year)
+        return self.get_manifest()["teams"].get( str(year) )
+
+    def get_event_files(self, year:int, post:bool) -> list:
+        """Paths of the regular season event file of each team, or of all the post-season event files, for 'year'."""
+        self.check_year(year)
+        if post:
+            files = self.get_files(POST)
+            return [ osp.join(self.folders[POST], name) for name in sorted(files) if name.startswith( str(year) ) ]
+        year_events = []
+        for team in self.get_teams(year) or []:
+            name = str(year) + team[0] + osp.extsep + "EV" + team[1]
+            path = self.get_path(REGULAR, name)
+            if path is None:
+                raise FileNotFoundError(F"CANNOT find event file {osp.join(self.folders[REGULAR], name)}!")
+            year_events.append(path)
+        return year_events
+
+    def get_years_events(self, start:int, end:int, post:bool) -> dict:
+        """Event files for each year from 'start' to 'end' that has a TEAM file, by year as a str."""
+        events = {}
+        for year in range(start, end+1):
+            if self.get_teams(year) is None:
+                self.lgr.exception(F"CANNOT find team file {osp.join(self.folders[REGULAR], TEAM_PREFIX + str(year))}!")
+                continue
+            events[str(year)] = self.get_event_files(year, post)
+            self.lgr.debug(F"found {len(events[str(year)])} event files for {year}")
+        return events
+
+    def get_roster_file(self, team:str, year:int) -> str:
+        self.check_year(year)
+        name = team + str(year) + osp.extsep + "ROS"
+        path = self.get_path(ROSTERS, name)
+        if path is None:
+            raise FileNotFoundError(F"CANNOT find roster file {osp.join(self.folders[ROSTERS], name)}!")
+        return path
+
+    def get_boxscore_files(self, year:int) -> list:
+        """Paths of the boxscore files that exist for 'year'."""
+        self.check_year(year)
+        names = [ str(year) + osp.extsep + btype for btype in BOXSCORE_TYPES ]
+        return [ self.get_path(BOXSCORES, name) for name in names if name in self.get_files(BOXSCORES) ]
+
+# END class RetrosheetCatalog
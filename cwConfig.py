@@ -0,0 +1,32 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# cwConfig.py -- folders shared by the Retrosheet tools, in a module that does NOT load the Chadwick library
+#
+# The data processed by this software was obtained free of charge from and is copyrighted by Retrosheet.
+# Interested parties may contact Retrosheet at 20 Sunset Rd., Newark, DE 19711.
+#
+# Copyright (c) 2021 Mark Sattolo <epistemik@gmail.com>
+
+__author__       = "Mark Sattolo"
+__author_email__ = "epistemik@gmail.com"
+__created__ = "2026-10-18"
+__updated__ = "2026-10-18"
+
+import hashlib
+import sys
+sys.path.append("/home/marksa/git/Python/utils")
+from mhsUtils import osp, BASE_DEV_FOLDER, UTF8_ENCODING
+
+# the saved lines, indexes, catalog, person directory and guts table of the tools
+CACHE_FOLDER = osp.join(BASE_DEV_FOLDER, "Retrosheet" + osp.sep + "data" + osp.sep + "cache")
+PATH_KEY_SIZE = 12
+
+
+def get_cache_name(path:str) -> str:
+    """
+    Name in the cache folder of the data saved for the file at 'path': its name AND a hash of its absolute path,
+    as files in different folders may have the same name, e.g. 1963KC1.EVA in the Retrosheet tree and in corrected-retrosheet.
+    """
+    path_key = hashlib.sha1( osp.abspath(path).encode(UTF8_ENCODING) ).hexdigest()[:PATH_KEY_SIZE]
+    return F"{osp.basename(path)}.{path_key}"
@@ -0,0 +1,380 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# cwExport.py -- export the events, games and subs of Retrosheet event files as csv, by year, as the scripts in 'scripts'
+#
+# The data processed by this software was obtained free of charge from and is copyrighted by Retrosheet.
+# Interested parties may contact Retrosheet at 20 Sunset Rd., Newark, DE 19711.
+#
+# Original C code Copyright (c) 2002-2021
+# Dr T L Turocy, Chadwick Baseball Bureau (ted.turocy@gmail.com)
+#
+# Port to Python3, additions & modifications Copyright (c) 2021 Mark Sattolo <epistemik@gmail.com>
+
+__author__       = "Mark Sattolo"
+__author_email__ = "epistemik@gmail.com"
+__created__ = "2026-10-18"
+__updated__ = "2026-10-18"
+
+import os
+import shutil
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from ctypes import c_int, create_string_buffer
+from pychadwick.utils import CWEventFieldStruct
+sys.path.append("/home/marksa/git/Python/utils")
+from mhsUtils import dt, now_dt, get_filename, get_current_time
+from mhsLogging import MhsLogger
+from cwTools import *
+from cwLibWrappers import cwlib, free_roster, free_gameiter
+from cwCatalog import REGULAR, TEAM_PREFIX
+
+PROGRAM_DESC = "Export the events, games and subs of the Retrosheet regular season event files as csv, one file per year."
+PROGRAM_NAME = get_filename(__file__)
+EXPORT_FOLDER = osp.join(BASE_DEV_FOLDER, "Chadwick" + osp.sep + "data")
+MAX_JOBS = os.cpu_count() or 1
+
+EVENTS = "events"
+GAMES  = "games"
+SUBS   = "subs"
+EXPORT_TYPES = [EVENTS, GAMES, SUBS]
+# the field and extended field selections of scripts/cwevent.sh, cwgame.sh and cwsub.sh
+EXPORT_FIELDS = { EVENTS:("0-96", "0-62"), GAMES:("0-15,18,24-83", "0-59"), SUBS:("0-9", None) }
+EXPORT_NAMES  = { EVENTS:"events{}.csv", GAMES:"games{}.csv", SUBS:osp.join("subs", "sub{}.csv") }
+# NO library in pychadwick has the games or subs fields, so those are exported by the Chadwick tools
+EXPORT_TOOLS  = { GAMES:"cwgame", SUBS:"cwsub" }
+
+# size of the flag arrays 'fields' and 'ext_fields' and of the line buffer in the cwevent code of the Chadwick library
+NUM_EVENT_FIELDS = 97
+NUM_EXT_FIELDS   = 63
+EVENT_LINE_SIZE  = 4096
+NO_PLAY = b"NP"
+
+
+def parse_field_list(text:str, num_fields:int) -> list:
+    """Flag for each field selected by 'text', e.g. '0-15,18,24-83', as by the -f and -x options of the Chadwick tools."""
+    flags = [0] * num_fields
+    for item in text.split(','):
+        first, _, last = item.partition('-')
+        for i in range( int(first), int(last if last else first) + 1 ):
+            if not 0 <= i < num_fields:
+                raise ValueError(F"INVALID field {i} in '{text}': MAX = {num_fields - 1}")
+            flags[i] = 1
+    return flags
+
+
+def select_event_fields(fields:str, ext_fields:str = None):
+    """Set the flags of the event fields, and of the extended event fields, that the library writes for each event."""
+    for name, text, num in ( ("fields", fields, NUM_EVENT_FIELDS), ("ext_fields", ext_fields, NUM_EXT_FIELDS) ):
+        flags = (c_int * num).in_dll(cwlib, name)
+        flags[:] = parse_field_list(text, num) if text else [0] * num
+
+
+def event_headers(fields:str = EXPORT_FIELDS[EVENTS][0], ext_fields:str = EXPORT_FIELDS[EVENTS][1]) -> list:
+    """Names of the selected event fields then the selected extended fields, in the order of the csv line for each event."""
+    headers = []
+    for name, text, num in ( ("cwevent_field_data", fields, NUM_EVENT_FIELDS),
+                             ("cwevent_ext_field_data", ext_fields, NUM_EXT_FIELDS) ):
+        field_data = (CWEventFieldStruct * num).in_dll(cwlib, name)
+        flags = parse_field_list(text, num) if text else [0] * num
+        headers += [ field_data[i].header.decode(UTF8_ENCODING) for i in range(num) if flags[i] ]
+    return headers
+
+
+def get_year_inputs(catalog:RetrosheetCatalog, year:int) -> (list, list, dict):
+    """The regular season event files, as the glob 'yyyy*.EV*', the teams and the roster files, by team, of 'year'."""
+    efiles = [ osp.join(catalog.folders[REGULAR], name) for name in sorted( catalog.get_files(REGULAR) )
+               if name.startswith( str(year) ) and ".EV" in name ]
+    teams = catalog.get_teams(year) or []
+    roster_files = {}
+    for team in teams:
+        try:
+            roster_files[team[0]] = catalog.get_roster_file(team[0], year)
+        except FileNotFoundError:
+            continue
+    return efiles, teams, roster_files
+
+
+def load_rosters(teams:list, roster_files:dict, year:int) -> dict:
+    """
+    The roster of each team in 'teams', as [team, league, city, nickname] from the TEAM file,
+    filled from its file in 'roster_files' if there is one: as cwevent, a team with NO roster file has an empty roster.
+    """
+    rosters = {}
+    for team, league, city, nickname in teams:
+        rosters[team] = MyCwlib.roster_create(team, year, league + "L", city, nickname)
+        if team in roster_files:
+            roster_fptr = MyCwlib.fopen( bytes(roster_files[team], UTF8_ENCODING) )
+            MyCwlib.roster_read(rosters[team], roster_fptr)
+            MyCwlib.fclose(roster_fptr)
+    return rosters
+
+
+def game_event_lines(game_ptr, visitors, home, line_buffer = None):
+    """
+    Yield the cwevent csv line of each event of a game, except the 'NP' events, as bytes WITHOUT a newline:
+        the same lines as pychadwick Chadwick.process_game(), without splitting each one into a dict,
+        from a buffer that is overwritten by the next line.
+    """
+    if line_buffer is None:
+        line_buffer = create_string_buffer(EVENT_LINE_SIZE)
+    gameiter = MyCwlib.gameiter_create(game_ptr)
+    try:
+        while gameiter.contents.event:
+            if gameiter.contents.event.contents.event_text != NO_PLAY:
+                MyCwlib.event_process_record(gameiter, visitors, home, line_buffer)
+                yield line_buffer.value
+            MyCwlib.gameiter_next(gameiter)
+    finally:
+        free_gameiter(gameiter)
+
+
+def year_event_lines(efiles:list, teams:list, roster_files:dict, year:int):
+    """Yield the cwevent csv line of ALL the fields of each event of each game in the event files of 'year', in file and game order."""
+    select_event_fields(*EXPORT_FIELDS[EVENTS])
+    rosters = load_rosters(teams, roster_files, year)
+    line_buffer = create_string_buffer(EVENT_LINE_SIZE)
+    try:
+        for efile in efiles:
+            for game_ptr in read_games(efile):
+                # as cwevent: NO roster for a team that is not in the TEAM file
+                visitors = rosters.get( MyCwlib.game_info_lookup(game_ptr, b"visteam") )
+                home = rosters.get( MyCwlib.game_info_lookup(game_ptr, b"hometeam") )
+                yield from game_event_lines(game_ptr, visitors, home, line_buffer)
+    finally:
+        for roster in rosters.values():
+            free_roster(roster)
+
+
+def write_events(out_path:str, efiles:list, teams:list, roster_files:dict, year:int) -> int:
+    """Write the events of 'year' to 'out_path' as 'cwevent -f 0-96 -x 0-62' would: return the number of lines."""
+    num_lines = 0
+    with open(out_path, "wb") as out_fp:
+        for line in year_event_lines(efiles, teams, roster_files, year):
+            out_fp.write(line + b"\n")
+            num_lines += 1
+    return num_lines
+
+
+def write_tool_output(out_path:str, export:str, efiles:list, year:int) -> int:
+    """Write the output of the Chadwick tool for 'export' on the event files of 'year' to 'out_path': return the number of lines."""
+    fields, ext_fields = EXPORT_FIELDS[export]
+    cmd = [ EXPORT_TOOLS[export], "-f", fields ] + ( ["-x", ext_fields] if ext_fields else [] ) + [ "-y", str(year) ]
+    # the tools read the TEAM and roster files from the current folder, as in the scripts
+    with open(out_path, "wb") as out_fp:
+        result = subprocess.run( cmd + [osp.basename(efile) for efile in efiles], cwd = osp.dirname(efiles[0]),
+                                 stdout = out_fp, stderr = subprocess.PIPE )
+    if result.returncode != 0:
+        # the message carries the error output of the tool, as the stderr of a CalledProcessError is lost in a worker process
+        raise ValueError(F"{' '.join(cmd)} FAILED with exit code {result.returncode}: "
+                         F"{result.stderr.decode(UTF8_ENCODING, 'replace').strip()}")
+    with open(out_path, "rb") as out_fp:
+        return sum(1 for _ in out_fp)
+
+
+def export_year(export:str, year:int, out_path:str, efiles:list, teams:list, roster_files:dict) -> (str, int, int, float):
+    """
+    Write the csv for 'export' and 'year' to a temporary file then move it to 'out_path', so that NO partial file
+    is ever left at 'out_path': return the export, the year, the number of lines and the time in seconds.
+    """
+    start = time.perf_counter()
+    os.makedirs(osp.dirname(out_path), exist_ok = True)
+    tmp_path = out_path + ".tmp"
+    try:
+        if export == EVENTS:
+            num_lines = write_events(tmp_path, efiles, teams, roster_files, year)
+        else:
+            num_lines = write_tool_output(tmp_path, export, efiles, year)
+        os.replace(tmp_path, out_path)
+    finally:
+        if osp.exists(tmp_path):
+            os.remove(tmp_path)
+    return export, year, num_lines, time.perf_counter() - start
+
+
+class RetrosheetExporter:
+    """
+    Export the events, games and subs of each year in a range to the csv files of scripts/cwevent.sh, cwgame.sh and cwsub.sh:
+        the years run in parallel in worker processes and a year is skipped if its csv is newer than ALL of its inputs,
+        i.e. its event files, TEAM file and roster files, so an interrupted export resumes where it stopped.
+    """
+    def __init__(self, logger:lg.Logger, folder:str = EXPORT_FOLDER, jobs:int = 1, force:bool = False):
+        self.lgr = logger
+        self.folder = folder
+        self.jobs = jobs
+        self.force = force
+        self.catalog = RetrosheetCatalog(logger)
+        # [export, year, csv path] of each csv found up to date by get_tasks()
+        self.current = []
+
+    def get_out_path(self, export:str, year:int) -> str:
+        return osp.join( self.folder, EXPORT_NAMES[export].format(year) )
+
+    def is_current(self, out_path:str, inputs:list) -> bool:
+        """True if the csv at 'out_path' exists and is newer than ALL the files in 'inputs'."""
+        if self.force or not osp.exists(out_path):
+            return False
+        out_mtime = os.stat(out_path).st_mtime_ns
+        return all( os.stat(path).st_mtime_ns < out_mtime for path in inputs )
+
+    def get_tasks(self, exports:list, start:int, end:int) -> list:
+        """The arguments of export_year() for each export and year that has NO current csv."""
+        tasks = []
+        self.current = []
+        for year in range(start, end + 1):
+            efiles, teams, roster_files = get_year_inputs(self.catalog, year)
+            if not efiles or not teams:
+                self.lgr.warning(F"CANNOT find the event files and TEAM file for {year}!")
+                continue
+            team_file = osp.join( self.catalog.folders[REGULAR], TEAM_PREFIX + str(year) )
+            for export in exports:
+                out_path = self.get_out_path(export, year)
+                inputs = efiles + [team_file] + list( roster_files.values() )
+                if self.is_current(out_path, inputs):
+                    self.lgr.info(F"{out_path} is up to date.")
+                    timer.count("years_skipped")
+                    self.current.append( (export, year, out_path) )
+                    continue
+                tasks.append( (export, year, out_path, efiles, teams, roster_files) )
+        return tasks
+
+    def run(self, exports:list, start:int, end:int, on_export = None) -> int:
+        """
+        Export each year from 'start' to 'end': return the number of exports that failed.
+            If 'on_export' is given, it is called in THIS process with the export, the year and the path of each csv
+            that is up to date or has been exported, while the workers go on with the other years.
+        """
+        missing = [ export for export in exports if export in EXPORT_TOOLS and not shutil.which(EXPORT_TOOLS[export]) ]
+        # the csv files already exported by a missing tool are still current, but each csv to export with it FAILS
+        tasks = []
+        failures = 0
+        for task in self.get_tasks(exports, start, end):
+            if task[0] in missing:
+                self.lgr.error(F"CANNOT find the Chadwick tool {EXPORT_TOOLS[task[0]]} to export the {task[0]} of {task[1]}!")
+                failures += 1
+            else:
+                tasks.append(task)
+        self.lgr.warning(F"{len(tasks)} exports to run for {exports} over years {start} -> {end}.")
+        with timer.phase("export"):
+            if self.jobs > 1 and len(tasks) > 1:
+                with ProcessPoolExecutor(max_workers = self.jobs) as executor:
+                    futures = { executor.submit(export_year, *task):task for task in tasks }
+                    self.call_current(on_export)
+                    for future in as_completed(futures):
+                        failures += self.report(futures[future], future, on_export)
+            else:
+                self.call_current(on_export)
+                for task in tasks:
+                    failures += self.report(task, on_export = on_export)
+        return failures
+
+    def call_current(self, on_export):
+        if on_export:
+            for export, year, out_path in self.current:
+                on_export(export, year, out_path)
+
+    def report(self, task:tuple, future = None, on_export = None) -> int:
+        """Log the result of the export of 'task', run now if NO future, and pass it to 'on_export': return 1 if it failed, else 0."""
+        try:
+            export, year, num_lines, secs = future.result() if future else export_year(*task)
+        except (OSError, ValueError) as ex:
+            self.lgr.error(F"FAILED to export the {task[0]} of {task[1]}: {repr(ex)}")
+            return 1
+        timer.count("years_exported")
+        timer.count(F"{export}_lines", num_lines)
+        self.lgr.info(F"exported {num_lines} {export} lines of {year} to {task[2]} in {secs:.3f} seconds")
+        if on_export:
+            on_export(export, year, task[2])
+        return 0
+
+# END class RetrosheetExporter
+
+
+def process_export_input(argl:list) -> (list, int, int, int, str, bool, str, str, str):
+    """Process command line input for the export."""
+    arg_parser = ArgumentParser(description = PROGRAM_DESC, prog = "python3 " + PROGRAM_NAME)
+    # required arguments
+    required = arg_parser.add_argument_group('REQUIRED')
+    required.add_argument('-y', '--start_year', required = True, type = int, metavar = "YEAR", help = "(start) year to export <yyyy>")
+    # optional arguments
+    arg_parser.add_argument('-e', '--end_year', type = int, metavar = "YEAR", help = "end year to export <yyyy>")
+    arg_parser.add_argument('-t', '--types', default = ','.join(EXPORT_TYPES),
+                            help = F"types of csv to export, separated by commas: default = all of {EXPORT_TYPES}")
+    arg_parser.add_argument('-j', '--jobs', type = int, default = MAX_JOBS,
+                            help = F"number of worker processes to export the years: default = MAX = {MAX_JOBS}")
+    arg_parser.add_argument('-o', '--folder', default = EXPORT_FOLDER, help = F"folder for the csv files: default = {EXPORT_FOLDER}")
+    arg_parser.add_argument('-r', '--force', action = "store_true", help = "export each year even if its csv is up to date")
+    arg_parser.add_argument('-q', '--quiet', action = "store_true", help = "NO logging")
+    arg_parser.add_argument('-c', '--levcon', metavar = "LEVEL", default = lg.getLevelName(DEFAULT_CONSOLE_LEVEL),
+                            help = "set LEVEL of console logging output")
+    arg_parser.add_argument('-f', '--levfile', metavar = "LEVEL", default = lg.getLevelName(DEFAULT_FILE_LEVEL),
+                            help = "set LEVEL of file logging output")
+    arg_parser.add_argument('--timings', metavar = "FILE", nargs = '?', const = TIMINGS_STDOUT, help = TIMINGS_HELP)
+    argp = arg_parser.parse_args(argl)
+
+    con_level = lg.getLevelName(QUIET_LOG_LEVEL) if argp.quiet else argp.levcon.strip().upper()
+    try:
+        getattr( lg, con_level )
+    except AttributeError as ae:
+        print(F"Problem with console log level: {repr(ae)}")
+        con_level = DEFAULT_CONSOLE_LEVEL
+    file_level = argp.levfile.strip().upper()
+    try:
+        getattr( lg, file_level )
+    except AttributeError as ae:
+        print(F"Problem with file log level: {repr(ae)}")
+        file_level = DEFAULT_FILE_LEVEL
+
+    exports = [ export for export in EXPORT_TYPES if export in argp.types.lower().split(',') ]
+    if not exports:
+        print(F">>> IMPROPER types '{argp.types}'! Using all of {EXPORT_TYPES}.\n")
+        exports = EXPORT_TYPES
+
+    if not RETROSHEET_START_YEAR <= argp.start_year <= RETROSHEET_END_YEAR:
+        raise ValueError(F">>> INVALID start year '{argp.start_year}'!")
+    start = argp.start_year
+
+    if argp.end_year and RETROSHEET_START_YEAR <= argp.end_year <= RETROSHEET_END_YEAR and argp.end_year >= start:
+        end = argp.end_year
+    else:
+        if argp.end_year:
+            print(F">>> INVALID end year '{argp.end_year}'! Using end year = {start}.\n")
+        end = start
+
+    if 1 <= argp.jobs <= MAX_JOBS:
+        jobs = argp.jobs
+    else:
+        print(F">>> IMPROPER jobs '{argp.jobs}'! Using {MAX_JOBS if argp.jobs > MAX_JOBS else 1}.\n")
+        jobs = MAX_JOBS if argp.jobs > MAX_JOBS else 1
+
+    return exports, start, end, jobs, argp.folder, argp.force, con_level, file_level, argp.timings
+
+
+def main_cw_export(args:list) -> int:
+    exports, start, end, jobs, folder, force, conlevel, filelevel, timings = process_export_input(args)
+    if timings:
+        timer.enable()
+
+    lg_ctrl = MhsLogger( __file__, con_level = conlevel, file_level = filelevel, folder = osp.join("logs", "export") )
+    lgr = lg_ctrl.get_logger()
+    lgr.info(F"Logging: console level = {repr(conlevel)}; file level = {repr(filelevel)}")
+
+    failures = RetrosheetExporter(lgr, folder, jobs, force).run(exports, start, end)
+    if failures:
+        lgr.error(F"{failures} exports FAILED!")
+    if timings:
+        timer.write_report(timings)
+    return failures
+
+
+if __name__ == "__main__":
+    if '-q' not in sys.argv:
+        print(F"\n\tStart time = {get_current_time()}\n")
+    result = main_cw_export(sys.argv[1:])
+    if '-q' not in sys.argv:
+        run_time = (dt.now() - now_dt).total_seconds()
+        print(F"\tRunning time = {(run_time // 60)} minutes, {(run_time % 60):2.3} seconds")
+    exit(1 if result else 0)
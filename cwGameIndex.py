@@ -0,0 +1,185 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# cwGameIndex.py -- persistent indexes of the games in the Retrosheet event files: by season and by file
+#
+# The data processed by this software was obtained free of charge from and is copyrighted by Retrosheet.
+# Interested parties may contact Retrosheet at 20 Sunset Rd., Newark, DE 19711.
+#
+# Copyright (c) 2021 Mark Sattolo <epistemik@gmail.com>
+
+__author__       = "Mark Sattolo"
+__author_email__ = "epistemik@gmail.com"
+__created__ = "2026-10-18"
+__updated__ = "2026-10-18"
+
+import json
+import os
+import sys
+sys.path.append("/home/marksa/git/Python/utils")
+from mhsUtils import lg, osp, UTF8_ENCODING
+from cwConfig import CACHE_FOLDER
+from cwCatalog import RetrosheetCatalog, REGULAR, POST
+from cwBoxscores import load_game_index
+from cwLibWrappers import CWGame, POINTER, read_game_bytes
+from cwTiming import timer
+
+INDEX_VERSION = 1
+INDEX_PREFIX  = "games"
+GAME_ID_TAG   = b"id,"
+INFO_TAG      = b"info,"
+
+# fields of each game in the index
+GAME_ID = 0
+DATE    = GAME_ID+1
+NUMBER  = DATE+1
+HOME    = NUMBER+1
+VISITOR = HOME+1
+FILE    = VISITOR+1
+OFFSET  = FILE+1
+
+
+def scan_event_file(efile:str) -> list:
+    """
+    Read the id and info records of an event file as plain text, without the Chadwick library:
+        [game id, date, game number, home team, visiting team, file, byte offset of the id record] for each game.
+    """
+    games = []
+    game = None
+    offset = 0
+    with open(efile, "rb") as fp:
+        for line in fp:
+            if line.startswith(GAME_ID_TAG):
+                game_id = line[len(GAME_ID_TAG):].strip().decode(UTF8_ENCODING)
+                # e.g. KC1196304090: home team, yyyymmdd, game number
+                game = [game_id, game_id[3:11], int(game_id[11:] or 0), game_id[:3], '', efile, offset]
+                games.append(game)
+            elif game and line.startswith(INFO_TAG):
+                fields = line.strip().decode(UTF8_ENCODING).split(',')
+                if len(fields) > 2:
+                    if fields[1] == "visteam":
+                        game[VISITOR] = fields[2]
+                    elif fields[1] == "hometeam":
+                        game[HOME] = fields[2]
+                    elif fields[1] == "number" and fields[2].isdigit():
+                        game[NUMBER] = int(fields[2])
+            offset += len(line)
+    return games
+
+
+class SeasonGameIndex:
+    """
+    The id, date, game number, home and visiting teams, event file and byte offset of every game in a season,
+    saved as json in the cache folder for each season and type of event files:
+        built by scanning the text of the event files ONCE and rebuilt only when one of those files changes,
+        so the games of a team and date range can be found, then read directly, without processing a whole season.
+    """
+    def __init__(self, logger:lg.Logger, catalog:RetrosheetCatalog = None, store_folder:str = CACHE_FOLDER):
+        self.lgr = logger
+        self.catalog = catalog if catalog else RetrosheetCatalog(logger)
+        self.store_folder = store_folder
+        self.seasons = {}
+
+    def get_path(self, year:int, post:bool) -> str:
+        return osp.join(self.store_folder, F"{INDEX_PREFIX}{year}{POST if post else REGULAR}.json")
+
+    def get_stamp(self, year:int, post:bool) -> dict:
+        """The [size, mtime] of each event file for the season, from the file itself, so games appended in place are seen."""
+        stamp = {}
+        for efile in self.catalog.get_event_files(year, post):
+            fstat = os.stat(efile)
+            stamp[osp.basename(efile)] = [fstat.st_size, fstat.st_mtime_ns]
+        return stamp
+
+    def get_games(self, year:int, post:bool) -> list:
+        """All the games of the season: from memory, the saved index if current, or by scanning the event files."""
+        if (year, post) in self.seasons:
+            return self.seasons[(year, post)]
+        with timer.phase("game_index"):
+            self.seasons[(year, post)] = self.load_games(year, post)
+        return self.seasons[(year, post)]
+
+    def load_games(self, year:int, post:bool) -> list:
+        stamp = self.get_stamp(year, post)
+        index_path = self.get_path(year, post)
+        games = None
+        if osp.exists(index_path):
+            with open(index_path) as fp:
+                saved = json.load(fp)
+            if saved.get("version") == INDEX_VERSION and saved["stamp"] == stamp:
+                self.lgr.debug(F"read saved game index {index_path}")
+                games = saved["games"]
+        if games is None:
+            self.lgr.info(F"index the games of the {year} {POST if post else REGULAR} event files")
+            games = [ game for efile in self.catalog.get_event_files(year, post) for game in scan_event_file(efile) ]
+            try:
+                os.makedirs(self.store_folder, exist_ok = True)
+                tmp_path = index_path + ".tmp"
+                with open(tmp_path, 'w') as fp:
+                    json.dump( {"version":INDEX_VERSION, "stamp":stamp, "games":games}, fp, separators = (',', ':') )
+                os.replace(tmp_path, index_path)
+            except OSError as ose:
+                self.lgr.warning(F"CANNOT save the game index {index_path}: {repr(ose)}")
+        return games
+
+    def find_games(self, year:int, post:bool, team:str = None, start_date:str = None, end_date:str = None) -> list:
+        """The games of the season played by 'team' in the range of the 'yyyymmdd' dates, if given."""
+        return [ game for game in self.get_games(year, post)
+                 if (not team or team == game[HOME] or team == game[VISITOR])
+                 and (not start_date or game[DATE] >= start_date) and (not end_date or game[DATE] <= end_date) ]
+
+# END class SeasonGameIndex
+
+
+class EventFileIndex:
+    """
+    Random access to any game in the Retrosheet event files:
+        each event file is indexed ONCE into a game id -> (byte offset, length) table which is saved in the cache folder,
+        so a game is fetched by reading ONLY its own records and handing them to the Chadwick reader as an in-memory file.
+    """
+    def __init__(self, logger:lg.Logger, catalog:RetrosheetCatalog = None, index_folder:str = CACHE_FOLDER):
+        self.lgr = logger
+        self.catalog = catalog if catalog else RetrosheetCatalog(logger)
+        self.index_folder = index_folder
+        self.indexes = {}
+
+    def get_index(self, efile:str) -> dict:
+        """Get the game index for an event file: from memory, else see cwBoxscores.load_game_index()."""
+        if efile not in self.indexes:
+            self.indexes[efile] = load_game_index(self.lgr, efile, self.index_folder)
+        return self.indexes[efile]
+
+    def find_event_file(self, game_id:str, post:bool = False) -> str:
+        """The event file with game 'game_id', e.g. KC1196304090, or None if not found."""
+        efiles = self.catalog.get_event_files( int(game_id[3:7]), post )
+        if not post:
+            # a regular season game is in the event file of the home team
+            efiles = [ efile for efile in efiles if osp.basename(efile)[4:-4] == game_id[:3] ]
+        for efile in efiles:
+            if game_id in self.get_index(efile):
+                return efile
+        return None
+
+    def read_block(self, efile:str, game_id:str) -> bytes:
+        """The records of game 'game_id' in 'efile', from its 'id' record up to the next game."""
+        offset, length = self.get_index(efile)[game_id]
+        with open(efile, "rb") as fp:
+            fp.seek(offset)
+            return fp.read(length)
+
+    def fetch_game(self, game_id:str, efile:str = None, post:bool = False) -> POINTER(CWGame):
+        """
+        Read ONLY game 'game_id' from 'efile', or from the event file found for it if not given.
+        Caller is responsible for memory management of returned pointer: see cwLibWrappers.free_game().
+        """
+        if efile is None:
+            efile = self.find_event_file(game_id, post)
+        if efile is None or game_id not in self.get_index(efile):
+            raise KeyError(F"CANNOT find game {game_id} in the {POST if post else REGULAR} event files!")
+        self.lgr.debug(F"fetch game {game_id} from {efile}")
+        game = read_game_bytes( self.read_block(efile, game_id) )
+        if not game:
+            raise ValueError(F"CANNOT read game {game_id} from {efile}!")
+        return game
+
+# END class EventFileIndex
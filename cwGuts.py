@@ -0,0 +1,91 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# cwGuts.py -- the Fangraphs constants of fg_guts as a typed table indexed by season
+#
+# This data obtained from Fangraphs
+# @see https://www.fangraphs.com/guts.aspx
+#
+# Copyright (c) 2021 Mark Sattolo <epistemik@gmail.com>
+
+__author__       = "Mark Sattolo"
+__author_email__ = "epistemik@gmail.com"
+__created__ = "2026-10-18"
+__updated__ = "2026-10-18"
+
+import os
+from importlib.util import find_spec
+import numpy as np
+from cwConfig import CACHE_FOLDER, osp
+from cwTiming import timer
+
+FIRST_SEASON = 1871
+GUTS_MODULE  = "fg_guts"
+GUTS_CACHE   = osp.join(CACHE_FOLDER, GUTS_MODULE + ".npy")
+GUTS_COLUMNS = ["wOBA", "wOBAScale", "wBB", "wHBP", "w1B", "w2B", "w3B", "wHR", "runSB", "runCS", "R/PA", "R/W", "cFIP"]
+# one row per season from FIRST_SEASON, a float field per column; NaN for any season missing from fg_guts
+GUTS_DTYPE = np.dtype( [ (column, np.float64) for column in GUTS_COLUMNS ] )
+
+guts_table = None
+
+
+def build_guts_table() -> np.ndarray:
+    """Convert the list of dicts of strings in fg_guts to the table: ONLY here is the fg_guts literal evaluated."""
+    from fg_guts import guts
+    last_season = max( int(season["Season"]) for season in guts )
+    table = np.full( last_season - FIRST_SEASON + 1, np.nan, dtype = GUTS_DTYPE )
+    for season in guts:
+        table[ int(season["Season"]) - FIRST_SEASON ] = tuple( float(season["Data"][column]) for column in GUTS_COLUMNS )
+    return table
+
+
+def load_guts_table(cache_path:str = GUTS_CACHE) -> np.ndarray:
+    """The saved table if newer than fg_guts.py, else build it and try to save it; the saved file is ONLY an optimization."""
+    source_mtime = os.stat( find_spec(GUTS_MODULE).origin ).st_mtime_ns
+    if cache_path and osp.exists(cache_path) and os.stat(cache_path).st_mtime_ns >= source_mtime:
+        table = np.load(cache_path)
+        if table.dtype == GUTS_DTYPE:
+            return table
+    table = build_guts_table()
+    if cache_path:
+        try:
+            os.makedirs(osp.dirname(cache_path), exist_ok = True)
+            tmp_path = cache_path + ".tmp"
+            with open(tmp_path, "wb") as fp:
+                np.save(fp, table)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+    return table
+
+
+def get_guts_table() -> np.ndarray:
+    """The whole table, loaded on the first call."""
+    global guts_table
+    if guts_table is None:
+        with timer.phase("guts"):
+            guts_table = load_guts_table()
+    return guts_table
+
+
+def get_season_rows(years) -> np.ndarray:
+    """Row of each season in 'years': KeyError if any season is NOT in fg_guts."""
+    table = get_guts_table()
+    rows = np.asarray(years, dtype = np.int64) - FIRST_SEASON
+    missing = (rows < 0) | (rows >= len(table))
+    missing[~missing] = np.isnan( table["wOBA"][ rows[~missing] ] )
+    if missing.any():
+        raise KeyError(F"NO constants in fg_guts for season(s) {np.unique(rows[missing] + FIRST_SEASON).tolist()}!")
+    return rows
+
+
+def get_guts(year:int) -> np.void:
+    """All the constants for season 'year' as one record, e.g. get_guts(1963)["wHR"]."""
+    return get_guts_table()[ get_season_rows([year])[0] ]
+
+
+def lookup_guts(years, columns:list) -> np.ndarray:
+    """One row per season in 'years', one column per constant in 'columns'."""
+    table = get_guts_table()
+    rows = get_season_rows(years)
+    return np.column_stack( [ table[column][rows] for column in columns ] )
@@ -17,19 +17,67 @@
 __author__       = "Mark Sattolo"
 __author_email__ = "epistemik@gmail.com"
 __created__ = "2019-11-07"
-__updated__ = "2021-06-15"
+__updated__ = "2026-10-18"
 
-from ctypes import c_void_p
+import resource
+import threading
+from contextlib import contextmanager
+from ctypes import c_void_p, c_long, c_size_t
+from os import SEEK_SET
 from pychadwick.box import CWBoxPlayer, CWBoxPitcher, CWBoxscore
 from pychadwick.chadwick import Chadwick, POINTER, CWRoster, CWGame, c_int, c_char_p
+from pychadwick.gameiter import CWGameIterator
 from pychadwick.roster import CWPlayer
+from cwTiming import timer
 
 chadwick = Chadwick()
 cwlib = chadwick.libchadwick
 
 ENC_UTF8 = "utf-8"
+KB_PER_MB = 1024
+
+# cw_strtok() in the Chadwick library keeps its position in static data, so ONLY one thread at a time may read
+# games or rosters; the boxscores and everything else can be created in parallel, as ctypes releases the GIL in C calls
+read_lock = threading.Lock()
+
+
+def bind(name:str, restype, argtypes:tuple):
+    """
+    A function object for C function 'name' with its signature set ONCE, at import:
+        NOT the object cached by the library, whose signature pychadwick sets again on every call,
+        so calls from several threads cannot race on it.
+    """
+    func = cwlib[name]
+    func.restype = restype
+    func.argtypes = argtypes
+    return func
+
 
 class MyCwlib:
+    cw_game_info_lookup = bind( "cw_game_info_lookup", c_char_p, (POINTER(CWGame), c_char_p,) )
+    cw_roster_create = bind( "cw_roster_create", POINTER(CWRoster), (c_char_p, c_int, c_char_p, c_char_p, c_char_p,) )
+    cw_roster_read = bind( "cw_roster_read", c_int, (POINTER(CWRoster), c_void_p,) )
+    cw_roster_player_find = bind( "cw_roster_player_find", POINTER(CWPlayer), (POINTER(CWRoster), c_char_p,) )
+    cw_box_create = bind( "cw_box_create", POINTER(CWBoxscore), (POINTER(CWGame),) )
+    cw_box_get_starter = bind( "cw_box_get_starter", POINTER(CWBoxPlayer), (POINTER(CWBoxscore), c_int, c_int,) )
+    cw_box_get_starting_pitcher = bind( "cw_box_get_starting_pitcher", POINTER(CWBoxPitcher), (POINTER(CWBoxscore), c_int,) )
+    cw_box_cleanup = bind( "cw_box_cleanup", None, (POINTER(CWBoxscore),) )
+    cw_file_find_first_game = bind( "cw_file_find_first_game", c_int, (c_void_p,) )
+    cw_game_read = bind( "cw_game_read", POINTER(CWGame), (c_void_p,) )
+    cw_game_cleanup = bind( "cw_game_cleanup", None, (POINTER(CWGame),) )
+    cw_roster_cleanup = bind( "cw_roster_cleanup", None, (POINTER(CWRoster),) )
+    cw_gameiter_create = bind( "cw_gameiter_create", POINTER(CWGameIterator), (POINTER(CWGame),) )
+    cw_gameiter_next = bind( "cw_gameiter_next", None, (POINTER(CWGameIterator),) )
+    cw_gameiter_cleanup = bind( "cw_gameiter_cleanup", None, (POINTER(CWGameIterator),) )
+    cwevent_process_game_record = bind( "cwevent_process_game_record", None,
+                                        (POINTER(CWGameIterator), POINTER(CWRoster), POINTER(CWRoster), c_char_p,) )
+    c_fopen = bind( "fopen", c_void_p, (c_char_p, c_char_p,) )
+    c_fmemopen = bind( "fmemopen", c_void_p, (c_char_p, c_size_t, c_char_p,) )
+    c_fclose = bind( "fclose", c_int, (c_void_p,) )
+    c_feof = bind( "feof", c_int, (c_void_p,) )
+    c_fseek = bind( "fseek", c_int, (c_void_p, c_long, c_int,) )
+    c_free = bind( "free", None, (c_void_p,) )
+
     # char *cw_game_info_lookup(CWGame *game, char *label)
     @staticmethod
     def game_info_lookup(game_ptr:POINTER(CWGame), label:bytes) -> str:
@@ -38,10 +86,7 @@ class MyCwlib:
         The pointer returned is internal to the CWGame structure, so it should not be deleted, nor its contents changed.
         The list is scanned from the tail first, to return the last seen record in the case of multiple records.
         """
-        func = cwlib.cw_game_info_lookup
-        func.restype = c_char_p
-        func.argtypes = (POINTER(CWGame), c_char_p,)
-        result = func(game_ptr, label)
+        result = MyCwlib.cw_game_info_lookup(game_ptr, label)
         return result.decode(encoding = ENC_UTF8)
 
     # CWRoster *cw_roster_create(char *team_id, int year, char *league, char *city, char *nickname)
@@ -55,11 +100,7 @@ class MyCwlib:
         bleague = bytes(league, ENC_UTF8)
         bcity = bytes(city, ENC_UTF8)
         bnickname = bytes(nickname, ENC_UTF8)
-
-        func = cwlib.cw_roster_create
-        func.restype = POINTER(CWRoster)
-        func.argtypes = (c_char_p, c_int, c_char_p, c_char_p, c_char_p,)
-        return func(bteam, year, bleague, bcity, bnickname)
+        return MyCwlib.cw_roster_create(bteam, year, bleague, bcity, bnickname)
 
     # int cw_roster_read(CWRoster *roster, FILE *file)
     @staticmethod
@@ -69,10 +110,8 @@ class MyCwlib:
         Returns nonzero on success, zero on failure.
         [NB: roster files that end with newline return zero even though all the players loaded without problem.]
         """
-        func = cwlib.cw_roster_read
-        func.restype = c_int
-        func.argtypes = (POINTER(CWRoster), c_void_p,)
-        return func(roster_ptr, file_handle)
+        with read_lock:
+            return MyCwlib.cw_roster_read(roster_ptr, file_handle)
 
     # CWPlayer *cw_roster_player_find(CWRoster *roster, char *player_id)
     @staticmethod
@@ -81,36 +120,238 @@ class MyCwlib:
         Finds the record for the player with the given player_id.
         Returns null if the player_id is not on the roster.
         """
-        func = cwlib.cw_roster_player_find
-        func.restype = POINTER(CWPlayer)
-        func.argtypes = (POINTER(CWRoster), c_char_p,)
-        return func(roster_ptr, player_id)
+        return MyCwlib.cw_roster_player_find(roster_ptr, player_id)
 
     # CWBoxscore *cw_box_create(CWGame *game)
     @staticmethod
     def box_create(game_ptr:POINTER(CWGame)) -> POINTER(CWBoxscore):
         """Create a boxscore from the game 'game'."""
-        func = cwlib.cw_box_create
-        func.restype = POINTER(CWBoxscore)
-        func.argtypes = (POINTER(CWGame),)
-        return func(game_ptr)
+        return MyCwlib.cw_box_create(game_ptr)
 
     # CWBoxPlayer *cw_box_get_starter(CWBoxscore *boxscore, int team, int slot)
     @staticmethod
     def box_get_starter(box_ptr:POINTER(CWBoxscore), team:int, slot:int) -> POINTER(CWBoxPlayer):
         """Find the starter for 'team' in batting order position 'slot'."""
-        func = cwlib.cw_box_get_starter
-        func.restype = POINTER(CWBoxPlayer)
-        func.argtypes = (POINTER(CWBoxscore), c_int, c_int,)
-        return func(box_ptr, team, slot)
+        return MyCwlib.cw_box_get_starter(box_ptr, team, slot)
 
     # CWBoxPitcher *cw_box_get_starting_pitcher(CWBoxscore *boxscore, int team)
     @staticmethod
     def box_get_starting_pitcher(box_ptr:POINTER(CWBoxscore), team:int) -> POINTER(CWBoxPitcher):
         """Find the starting pitcher for 'team'."""
-        func = cwlib.cw_box_get_starting_pitcher
-        func.restype = POINTER(CWBoxPitcher)
-        func.argtypes = (POINTER(CWBoxscore), c_int,)
-        return func(box_ptr, team)
+        return MyCwlib.cw_box_get_starting_pitcher(box_ptr, team)
+
+    # void cw_box_cleanup(CWBoxscore *boxscore)
+    @staticmethod
+    def box_cleanup(box_ptr:POINTER(CWBoxscore)):
+        """Free all the memory used by the contents of 'boxscore': the CWBoxscore itself must still be freed."""
+        MyCwlib.cw_box_cleanup(box_ptr)
+
+    # void cw_roster_cleanup(CWRoster *roster)
+    @staticmethod
+    def roster_cleanup(roster_ptr:POINTER(CWRoster)):
+        """Free all the memory used by the contents of 'roster': the CWRoster itself must still be freed."""
+        MyCwlib.cw_roster_cleanup(roster_ptr)
+
+    # CWGameIterator *cw_gameiter_create(CWGame *game)
+    @staticmethod
+    def gameiter_create(game_ptr:POINTER(CWGame)) -> POINTER(CWGameIterator):
+        """
+        Create an iterator over the events of 'game', positioned at the first event.
+        Caller is responsible for memory management of returned pointer.
+        """
+        return MyCwlib.cw_gameiter_create(game_ptr)
+
+    # void cw_gameiter_next(CWGameIterator *gameiter)
+    @staticmethod
+    def gameiter_next(gameiter_ptr:POINTER(CWGameIterator)):
+        """Advance the iterator to the next event, updating the state of the game."""
+        MyCwlib.cw_gameiter_next(gameiter_ptr)
+
+    # void cw_gameiter_cleanup(CWGameIterator *gameiter)
+    @staticmethod
+    def gameiter_cleanup(gameiter_ptr:POINTER(CWGameIterator)):
+        """Free all the memory used by the contents of 'gameiter': the CWGameIterator itself must still be freed."""
+        MyCwlib.cw_gameiter_cleanup(gameiter_ptr)
+
+    # void cwevent_process_game_record(CWGameIterator *gameiter, CWRoster *visitors, CWRoster *home, char output_line[4096])
+    @staticmethod
+    def event_process_record(gameiter_ptr:POINTER(CWGameIterator), visitors:POINTER(CWRoster), home:POINTER(CWRoster),
+                             line_buffer):
+        """
+        Write the cwevent fields of the current event, as selected by the 'fields' and 'ext_fields' flags of the library,
+        as one csv line WITHOUT a newline, into 'line_buffer', which must hold at least 4096 chars.
+        Either roster may be null, as for a team with NO roster file.
+        """
+        MyCwlib.cwevent_process_game_record(gameiter_ptr, visitors, home, line_buffer)
+
+    # int cw_file_find_first_game(FILE *file)
+    @staticmethod
+    def file_find_first_game(file_handle:c_void_p) -> int:
+        """Advance the file to the first game: returns nonzero if a game was found."""
+        return MyCwlib.cw_file_find_first_game(file_handle)
+
+    # CWGame *cw_game_read(FILE *file)
+    @staticmethod
+    def game_read(file_handle:c_void_p) -> POINTER(CWGame):
+        """
+        Read the next game from 'file': returns null if no game could be read.
+        Caller is responsible for memory management of returned pointer.
+        """
+        with read_lock:
+            return MyCwlib.cw_game_read(file_handle)
+
+    # void cw_game_cleanup(CWGame *game)
+    @staticmethod
+    def game_cleanup(game_ptr:POINTER(CWGame)):
+        """Free all the memory used by the contents of 'game': the CWGame itself must still be freed."""
+        MyCwlib.cw_game_cleanup(game_ptr)
+
+    # FILE *fopen(const char *pathname, const char *mode)
+    @staticmethod
+    def fopen(path:bytes, mode:bytes = b"r") -> c_void_p:
+        """Open the file at 'path': returns null on failure."""
+        return MyCwlib.c_fopen(path, mode)
+
+    # int fclose(FILE *stream)
+    @staticmethod
+    def fclose(file_handle:c_void_p) -> int:
+        return MyCwlib.c_fclose(file_handle)
+
+    # int feof(FILE *stream)
+    @staticmethod
+    def feof(file_handle:c_void_p) -> int:
+        """Nonzero if the end of 'file' has been reached."""
+        return MyCwlib.c_feof(file_handle)
+
+    # int fseek(FILE *stream, long offset, int whence)
+    @staticmethod
+    def fseek(file_handle:c_void_p, offset:int, whence:int = SEEK_SET) -> int:
+        """Move the position of 'file' to 'offset' bytes from 'whence': returns zero on success."""
+        return MyCwlib.c_fseek(file_handle, offset, whence)
+
+    # FILE *fmemopen(void *buf, size_t size, const char *mode)
+    @staticmethod
+    def fmemopen(buffer:bytes, mode:bytes = b"r") -> c_void_p:
+        """Open 'buffer' as a FILE: the buffer must NOT be released before the FILE is closed."""
+        return MyCwlib.c_fmemopen(buffer, len(buffer), mode)
+
+    # void free(void *ptr)
+    @staticmethod
+    def free(ptr:c_void_p):
+        MyCwlib.c_free(ptr)
 
 # END class MyCwlib
+
+
+def free_box(box_ptr:POINTER(CWBoxscore)):
+    """Release a boxscore created by MyCwlib.box_create()."""
+    if box_ptr:
+        MyCwlib.box_cleanup(box_ptr)
+        MyCwlib.free(box_ptr)
+
+def free_game(game_ptr:POINTER(CWGame)):
+    """Release a game read by MyCwlib.game_read()."""
+    if game_ptr:
+        MyCwlib.game_cleanup(game_ptr)
+        MyCwlib.free(game_ptr)
+
+def free_roster(roster_ptr:POINTER(CWRoster)):
+    """Release a roster created by MyCwlib.roster_create()."""
+    if roster_ptr:
+        MyCwlib.roster_cleanup(roster_ptr)
+        MyCwlib.free(roster_ptr)
+
+def free_gameiter(gameiter_ptr:POINTER(CWGameIterator)):
+    """Release an iterator created by MyCwlib.gameiter_create()."""
+    if gameiter_ptr:
+        MyCwlib.gameiter_cleanup(gameiter_ptr)
+        MyCwlib.free(gameiter_ptr)
+
+
+@contextmanager
+def box_scope(game_ptr:POINTER(CWGame)):
+    """Create the boxscore of a game, which is freed on leaving the 'with' block."""
+    with timer.phase("box"):
+        box_ptr = MyCwlib.box_create(game_ptr)
+    try:
+        yield box_ptr
+    finally:
+        free_box(box_ptr)
+
+
+@contextmanager
+def event_file(efile:str):
+    """Open a Retrosheet event file as a C FILE, which is closed on leaving the 'with' block."""
+    file_handle = MyCwlib.fopen( bytes(efile, ENC_UTF8) )
+    if not file_handle:
+        raise FileNotFoundError(F"CANNOT open event file {efile}!")
+    timer.count("event_files_read")
+    try:
+        yield file_handle
+    finally:
+        MyCwlib.fclose(file_handle)
+
+
+def read_games(efile:str, free:bool = True, offset:int = 0):
+    """
+    Yield each game in a Retrosheet event file, or ONLY those from byte 'offset', which must be the start of an 'id' record,
+    and close the file when done.
+    If 'free', stream the games in bounded memory: each game is freed when the next one is requested,
+    or when the loop ends, so a game must NOT be used after that; else the caller owns the games and must free_game() them.
+    """
+    with event_file(efile) as file_handle:
+        if offset > 0:
+            MyCwlib.fseek(file_handle, offset)
+        else:
+            MyCwlib.file_find_first_game(file_handle)
+        while not MyCwlib.feof(file_handle):
+            with timer.phase("parse"):
+                game_ptr = MyCwlib.game_read(file_handle)
+            if not game_ptr:
+                break
+            timer.count("games_read")
+            try:
+                yield game_ptr
+            finally:
+                if free:
+                    free_game(game_ptr)
+
+
+@contextmanager
+def memory_file(buffer:bytes):
+    """Open the bytes of 'buffer' as a C FILE, which is closed on leaving the 'with' block."""
+    file_handle = MyCwlib.fmemopen(buffer)
+    if not file_handle:
+        raise OSError("CANNOT open the buffer as a file!")
+    try:
+        yield file_handle
+    finally:
+        MyCwlib.fclose(file_handle)
+
+
+def read_game_bytes(block:bytes) -> POINTER(CWGame):
+    """
+    Read a game from the bytes of its records, starting with the 'id' record, as sliced from an event file:
+        returns null if no game could be read.
+    Caller is responsible for memory management of returned pointer.
+    """
+    timer.count("games_read")
+    with timer.phase("parse"), memory_file(block) as file_handle:
+        return MyCwlib.game_read(file_handle)
+
+
+def read_game_at(file_handle:c_void_p, offset:int) -> POINTER(CWGame):
+    """
+    Read the game whose 'id' record starts at byte 'offset' of an open event file: returns null if no game could be read.
+    Caller is responsible for memory management of returned pointer.
+    """
+    if MyCwlib.fseek(file_handle, offset) != 0:
+        return None
+    timer.count("games_read")
+    with timer.phase("parse"):
+        return MyCwlib.game_read(file_handle)
+
+
+def get_peak_rss() -> float:
+    """Peak resident set size of this process, in MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / KB_PER_MB
@@ -0,0 +1,151 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# cwPeople.py -- directory of every person in the Retrosheet roster files
+#
+# The data processed by this software was obtained free of charge from and is copyrighted by Retrosheet.
+# Interested parties may contact Retrosheet at 20 Sunset Rd., Newark, DE 19711.
+#
+# Copyright (c) 2021 Mark Sattolo <epistemik@gmail.com>
+
+__author__       = "Mark Sattolo"
+__author_email__ = "epistemik@gmail.com"
+__created__ = "2026-10-18"
+__updated__ = "2026-10-18"
+
+import csv
+import json
+import os
+import re
+import sys
+sys.path.append("/home/marksa/git/Python/utils")
+from mhsUtils import lg, osp, BASE_GIT_FOLDER
+from cwConfig import CACHE_FOLDER
+from cwTiming import timer
+
+RETROSHEET_FOLDER = osp.join(BASE_GIT_FOLDER, "fork" + osp.sep + "retrosheet")
+ROSTERS_FOLDER    = osp.join(RETROSHEET_FOLDER, "rosters")
+DIRECTORY_FILE = "people.json"
+DIRECTORY_VERSION = 3
+ROSTER_EXT = osp.extsep + "ROS"
+# e.g. KC11963.ROS: team, year
+ROSTER_NAME = re.compile(r"^(\w{3})(\d{4})\.ROS$", re.IGNORECASE)
+
+# fields of each entry in the directory
+FAM_NAME = 0
+GIV_NAME = FAM_NAME+1
+BATS     = GIV_NAME+1
+THROWS   = BATS+1
+STINTS   = THROWS+1
+
+
+class PersonDirectory:
+    """
+    Every person in the Retrosheet roster files, by retro id: family name, given name, bats, throws and [year, team] stints.
+        Built ONCE by reading all the roster files and saved in the cache folder as json;
+        rebuilt only when a roster file is added, removed, replaced or edited in place.
+    """
+    def __init__(self, logger:lg.Logger, folder:str = ROSTERS_FOLDER, store_folder:str = CACHE_FOLDER):
+        self.lgr = logger
+        self.folder = folder
+        self.store_path = osp.join(store_folder, DIRECTORY_FILE)
+        self.people = None
+        self.roster_years = set()
+
+    def get_stamp(self) -> dict:
+        """The mtime of the roster folder and the [size, mtime] of each roster file, as a roster may be edited in place."""
+        files = {}
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.upper().endswith(ROSTER_EXT):
+                    fstat = entry.stat()
+                    files[entry.name] = [fstat.st_size, fstat.st_mtime_ns]
+        return {"version":DIRECTORY_VERSION, "folder":self.folder, "mtime":os.stat(self.folder).st_mtime_ns, "files":files}
+
+    def load(self):
+        """Read the saved directory if still current, else build it from the roster files."""
+        with timer.phase("people"):
+            self.load_people()
+
+    def load_people(self):
+        stamp = self.get_stamp()
+        self.roster_years = { int(match.group(2)) for match in map(ROSTER_NAME.match, stamp["files"]) if match }
+        if osp.exists(self.store_path):
+            with open(self.store_path) as fp:
+                saved = json.load(fp)
+            if saved.get("stamp") == stamp:
+                self.lgr.debug(F"read person directory {self.store_path}")
+                self.people = saved["people"]
+                return
+        self.people = self.build()
+        try:
+            os.makedirs(osp.dirname(self.store_path), exist_ok = True)
+            tmp_path = self.store_path + ".tmp"
+            with open(tmp_path, 'w') as fp:
+                json.dump( {"stamp":stamp, "people":self.people}, fp, separators = (',', ':') )
+            os.replace(tmp_path, self.store_path)
+        except OSError as ose:
+            self.lgr.warning(F"CANNOT save the person directory: {repr(ose)}")
+
+    def build(self) -> dict:
+        self.lgr.info(F"build person directory from the roster files in {self.folder}")
+        people = {}
+        roster_files = []
+        for fname in os.listdir(self.folder):
+            if not fname.upper().endswith(ROSTER_EXT):
+                continue
+            match = ROSTER_NAME.match(fname)
+            if not match:
+                self.lgr.warning(F"SKIP roster file {fname}: NOT named as TTTYYYY.ROS")
+                continue
+            roster_files.append( (int(match.group(2)), match.group(1), fname) )
+        # in (year, team) order, so the names and handedness of each person are those of the latest stint
+        for year, team, fname in sorted(roster_files):
+            with open(osp.join(self.folder, fname), newline = '') as roster_csvfile:
+                for rrow in csv.reader(roster_csvfile):
+                    if len(rrow) < 5:
+                        continue
+                    person = people.get(rrow[0])
+                    if person is None:
+                        person = people[rrow[0]] = [rrow[1], rrow[2], rrow[3], rrow[4], []]
+                    else:
+                        person[:STINTS] = rrow[1:5]
+                    person[STINTS].append([year, team])
+        for person in people.values():
+            person[STINTS].sort()
+        self.lgr.info(F"found {len(people)} people in {len(roster_files)} roster files")
+        return people
+
+    def get(self, pers_id:str) -> list:
+        """[family name, given name, bats, throws, stints] for 'pers_id', or None if not in any roster."""
+        if self.people is None:
+            self.load()
+        return self.people.get(pers_id)
+
+    def has_rosters(self, year:int) -> bool:
+        """True if there is any roster file for 'year', i.e. the stints of 'year' are known."""
+        if self.people is None:
+            self.load()
+        return year in self.roster_years
+
+    def __contains__(self, pers_id:str):
+        return self.get(pers_id) is not None
+
+    def get_full_name(self, pers_id:str) -> str:
+        """'Given Family', or None if not found."""
+        person = self.get(pers_id)
+        return F"{person[GIV_NAME]} {person[FAM_NAME]}" if person else None
+
+    def get_box_name(self, pers_id:str) -> str:
+        """'Family G' as used in a boxscore, or None if not found."""
+        person = self.get(pers_id)
+        return F"{person[FAM_NAME]} {person[GIV_NAME][:1]}" if person else None
+
+    def get_stints(self, pers_id:str, year:int = 0) -> list:
+        """All the [year, team] stints for 'pers_id', or only those in 'year' if given."""
+        person = self.get(pers_id)
+        if not person:
+            return []
+        return [ stint for stint in person[STINTS] if not year or stint[0] == year ]
+
+# END class PersonDirectory
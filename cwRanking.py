@@ -0,0 +1,53 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# cwRanking.py -- select and rank the top or bottom players by a stat, with ties, straight from the arrays of stats
+#
+# The data processed by this software was obtained free of charge from and is copyrighted by Retrosheet.
+# Interested parties may contact Retrosheet at 20 Sunset Rd., Newark, DE 19711.
+#
+# Copyright (c) 2021 Mark Sattolo <epistemik@gmail.com>
+
+__author__       = "Mark Sattolo"
+__author_email__ = "epistemik@gmail.com"
+__created__ = "2026-10-18"
+__updated__ = "2026-10-18"
+
+import numpy as np
+
+
+def select_ranked(keys:np.ndarray, limit:int, mask:np.ndarray = None) -> np.ndarray:
+    """
+    Indices of the 'limit' SMALLEST keys, plus every other index tied with the key at the cutoff, smallest first:
+        tied keys stay in index order; if 'mask' is given, only the indices where it is True are considered.
+    Uses a partial partition instead of a full sort, so the cost is O(n) to find the cutoff plus O(k log k) to order the k chosen.
+    """
+    candidates = np.flatnonzero(mask) if mask is not None else np.arange(len(keys))
+    if limit <= 0 or len(candidates) == 0:
+        return np.zeros(0, dtype = np.int64)
+    cand_keys = keys[candidates]
+    if len(candidates) > limit:
+        cutoff = cand_keys[ np.argpartition(cand_keys, limit - 1)[limit - 1] ]
+        chosen = np.flatnonzero(cand_keys <= cutoff)
+        candidates, cand_keys = candidates[chosen], cand_keys[chosen]
+    # sort by key, then by index for the ties
+    return candidates[ np.lexsort( (candidates, cand_keys) ) ]
+
+
+def select_top(values:np.ndarray, limit:int, mask:np.ndarray = None) -> np.ndarray:
+    """Indices of the 'limit' LARGEST values, plus ties at the cutoff, largest first: see select_ranked()."""
+    return select_ranked(-values, limit, mask)
+
+
+def select_bottom(values:np.ndarray, limit:int, mask:np.ndarray = None) -> np.ndarray:
+    """Indices of the 'limit' SMALLEST values, plus ties at the cutoff, smallest first: see select_ranked()."""
+    return select_ranked(values, limit, mask)
+
+
+def competition_ranks(ranked_values:np.ndarray) -> np.ndarray:
+    """Rank of each of the values in ranked order, with ties sharing the best rank and leaving gaps, i.e. 1,2,2,4."""
+    if len(ranked_values) == 0:
+        return np.zeros(0, dtype = np.int64)
+    new_value = np.concatenate( ([True], ranked_values[1:] != ranked_values[:-1]) )
+    positions = np.arange(1, len(ranked_values) + 1)
+    return np.maximum.accumulate( np.where(new_value, positions, 0) )
@@ -0,0 +1,436 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# cwStore.py -- SQLite store of the Retrosheet events, games and subs tables of sql/retrosheet_table_schema.sql
+#
+# The data processed by this software was obtained free of charge from and is copyrighted by Retrosheet.
+# Interested parties may contact Retrosheet at 20 Sunset Rd., Newark, DE 19711.
+#
+# Copyright (c) 2021 Mark Sattolo <epistemik@gmail.com>
+
+__author__       = "Mark Sattolo"
+__author_email__ = "epistemik@gmail.com"
+__created__ = "2026-10-18"
+__updated__ = "2026-10-18"
+
+import csv
+import os
+import re
+import sqlite3
+import sys
+import time
+from argparse import ArgumentParser
+from itertools import islice
+from operator import itemgetter
+sys.path.append("/home/marksa/git/Python/utils")
+from mhsUtils import dt, now_dt, get_filename, get_current_time
+from mhsLogging import MhsLogger
+from cwTools import *
+from cwCache import BAT_LINE_DTYPE
+from cwExport import EXPORT_FOLDER, EXPORT_NAMES, EVENTS, GAMES, SUBS, get_year_inputs, year_event_lines, event_headers
+
+PROGRAM_DESC = "Load the Retrosheet events, and any exported games and subs, of the specified year(s) into the SQLite store."
+PROGRAM_NAME = get_filename(__file__)
+SQL_FOLDER   = osp.join(osp.dirname(osp.abspath(__file__)), "sql")
+SCHEMA_FILE  = osp.join(SQL_FOLDER, "retrosheet_table_schema.sql")
+QUERIES_FILE = osp.join(SQL_FOLDER, "retrosheet-queries.sql")
+STORE_PATH   = osp.join(EXPORT_FOLDER, "retrosheet.db")
+STORE_TABLES = [EVENTS, GAMES, SUBS]
+YEAR_COLUMN  = "YEAR_ID"
+# rows per executemany() when loading a year
+BATCH_SIZE = 50000
+
+# the first and last rowid of the rows of each year of each table with an INTEGER PRIMARY KEY: as a year is loaded
+# in one transaction by one writer, its rows have consecutive rowids, so the partition of a year is deleted by rowid
+# with NO index on the year; the implicit rowids of a table WITHOUT such a key, e.g. subs, may be renumbered by VACUUM
+PARTITIONS = "partitions"
+PARTITIONS_COLUMNS = "TABLE_NAME TEXT NOT NULL, YEAR_ID INTEGER NOT NULL, FIRST_ROW INTEGER NOT NULL, LAST_ROW INTEGER NOT NULL, " \
+                     "ROW_CT INTEGER NOT NULL, PRIMARY KEY (TABLE_NAME, YEAR_ID)"
+
+# the indexes for the queries of the leader tools and of sql/retrosheet-queries.sql:
+#   each one covers ALL the columns its queries read, so those are answered from the index without reading the table
+STORE_INDEXES = {
+    "events_year_bat_idx" : ( EVENTS, "YEAR_ID, BAT_ID, RBI_CT, GAME_ID" ),
+    "events_pit_event_idx": ( EVENTS, "PIT_ID, EVENT_CD, GAME_ID" ),
+    "events_gameid_idx"   : ( EVENTS, "GAME_ID" ),
+    "games_gameid_idx"    : ( GAMES, "GAME_ID" ),
+    "games_inn_minutes_idx": ( GAMES, "INN_CT, MINUTES_GAME_CT" ),
+    "subs_gameid_idx"     : ( SUBS, "GAME_ID" ),
+}
+
+# the SQLite affinity of each MySQL column type of the schema
+SQLITE_TYPES = [ (re.compile(r"(tiny|small|medium|big)?int|year", re.IGNORECASE), "INTEGER"),
+                 (re.compile(r"(var)?char|text", re.IGNORECASE), "TEXT") ]
+MYSQL_ONLY = re.compile(r"\b(unsigned|AUTO_INCREMENT)\b\s*", re.IGNORECASE)
+CREATE_TABLE = re.compile(r"^CREATE TABLE (\w+) \($")
+
+
+def translate_column(line:str) -> (str, str):
+    """The name and the SQLite definition of the column defined by 'line' in a MySQL CREATE TABLE statement."""
+    name, mysql_type, *options = line.strip().rstrip(',').split(None, 2)
+    sqlite_type = next( (stype for pattern, stype in SQLITE_TYPES if pattern.match(mysql_type)), "NUMERIC" )
+    return name, " ".join( [sqlite_type] + [ MYSQL_ONLY.sub('', opt).strip() for opt in options ] ).strip()
+
+
+def read_schema(schema_file:str = SCHEMA_FILE) -> dict:
+    """The columns of each table in a MySQL schema file, as [name, SQLite definition], with the key and partition clauses dropped."""
+    tables = {}
+    columns = None
+    with open(schema_file) as sfp:
+        for line in sfp:
+            match = CREATE_TABLE.match(line)
+            if match:
+                columns = tables[match.group(1)] = []
+            elif columns is not None:
+                if line.startswith(')'):
+                    columns = None
+                elif line.strip() and not line.strip().startswith( ("KEY", "PRIMARY KEY", "--") ):
+                    columns.append( translate_column(line) )
+    return tables
+
+
+def read_queries(queries_file:str = QUERIES_FILE) -> list:
+    """[comment, sql] for each query in a file of queries separated by ';', each after its comment line(s)."""
+    queries = []
+    comment = []
+    sql = []
+    with open(queries_file) as qfp:
+        for line in qfp:
+            text = line.strip()
+            if text.startswith("--"):
+                if not text.startswith("-- ="):
+                    comment.append( text.lstrip("- ") )
+            elif text:
+                sql.append(text)
+                if text.endswith(';'):
+                    queries.append( [ comment[-1] if comment else "", " ".join(sql) ] )
+                    comment, sql = [], []
+    return queries
+
+
+# the columns of the events read for the batting lines
+YEAR_EVENT_COLUMNS = [ "GAME_ID", "BAT_HOME_ID", "OUTS_CT", "BAT_ID", "RESP_BAT_ID", "PIT_ID", "EVENT_TX", "BAT_FLD_CD", "EVENT_CD",
+                       "BAT_EVENT_FL", "AB_FL", "H_CD", "SH_FL", "SF_FL", "RBI_CT", "BAT_DEST_ID", "BAT_TEAM_ID", "FLD_TEAM_ID",
+                       "REMOVED_FOR_PH_BAT_ID" ] \
+                     + [ F"POS{pos}_FLD_ID" for pos in range(2, 10) ] \
+                     + [ col.format(base) for base in range(1, 4) for col in ( "BASE{}_RUN_ID", "RUN{}_DEST_ID", "RUN{}_SB_FL",
+                                                                                    "RUN{}_CS_FL", "REMOVED_FOR_PR_RUN{}_ID" ) ]
+
+
+def batting_line_sql() -> (str, list):
+    """
+    The query for the batting line of each player in each game of a year, as counted in the Chadwick boxscore, from the events,
+    and its batting line fields in order:
+        the charged batter of each event gets the batting counts, each runner his runs, steals and caught stealing,
+        and every player in the lineup, i.e. each batter, runner, replaced pinch hitter or runner and fielder,
+        and each pitcher in a game without a DH, the game played.
+    The fields with NO source in the events, i.e. 'gw', 'lisp', 'movedup', 'pitches' and 'strikes', are left at 0.
+    """
+    batter = { "pa":"BAT_EVENT_FL = 'T'", "ab":"AB_FL = 'T'", "r":"BAT_DEST_ID >= 4",
+               "h":"AB_FL = 'T' AND H_CD > 0", "b2":"AB_FL = 'T' AND H_CD = 2", "b3":"AB_FL = 'T' AND H_CD = 3",
+               "hr":"AB_FL = 'T' AND H_CD = 4", "hrslam":"AB_FL = 'T' AND H_CD = 4 AND RBI_CT = 4",
+               "bi":"CASE WHEN BAT_EVENT_FL = 'T' THEN RBI_CT ELSE 0 END",
+               "bi2out":"CASE WHEN BAT_EVENT_FL = 'T' AND OUTS_CT = 2 THEN RBI_CT ELSE 0 END",
+               "bb":"EVENT_CD IN (14, 15)", "ibb":"EVENT_CD = 15", "so":"AB_FL = 'T' AND EVENT_CD = 3",
+               "gdp":"AB_FL = 'T' AND H_CD = 0 AND EVENT_CD != 3 AND EVENT_TX LIKE '%/GDP%'",
+               "hp":"EVENT_CD = 16", "sh":"SH_FL = 'T'", "sf":"SF_FL = 'T'", "xi":"EVENT_CD = 17" }
+    fields = [ "g" ] + list(batter) + [ "sb", "cs" ]
+
+    def role(player:str, team:str, counts:dict, source:str = "year_events", where:str = "") -> str:
+        values = ", ".join( F"{counts.get(fld, '0')} AS {fld}" for fld in fields )
+        return F"SELECT GAME_ID, {player} AS PLAYER_ID, {team} AS TEAM, {values} FROM {source} WHERE {player} != ''{where}"
+
+    roles = [ role("RESP_BAT_ID", "BAT_HOME_ID", dict(batter, g = "1")) ]
+    roles += [ role( F"BASE{base}_RUN_ID", "BAT_HOME_ID", {"g":"1", "r":F"RUN{base}_DEST_ID >= 4",
+                     "sb":F"RUN{base}_SB_FL = 'T'", "cs":F"RUN{base}_CS_FL = 'T'"} ) for base in range(1, 4) ]
+    roles.append( role("BAT_ID", "BAT_HOME_ID", {"g":"1"}) )
+    # a pinch hitter or runner may be replaced before he has a play of his own
+    roles += [ role(removed, "BAT_HOME_ID", {"g":"1"})
+               for removed in ["REMOVED_FOR_PH_BAT_ID"] + [ F"REMOVED_FOR_PR_RUN{base}_ID" for base in range(1, 4) ] ]
+    roles += [ role( F"POS{pos}_FLD_ID", "1 - BAT_HOME_ID", {"g":"1"} ) for pos in range(2, 10) ]
+    # with a DH, the pitcher is NOT in the batting order
+    roles.append( role( "PIT_ID", "1 - BAT_HOME_ID", {"g":"1"}, "year_events LEFT JOIN dh_teams USING (GAME_ID, FLD_TEAM_ID)",
+                        " AND dh_teams.GAME_ID IS NULL" ) )
+    totals = ", ".join( F"{'MAX' if fld == 'g' else 'SUM'}({fld})" for fld in fields )
+    # the events of the year are read ONCE, into a temporary table of just the columns used by the roles
+    return F"WITH year_events AS MATERIALIZED (SELECT {', '.join(YEAR_EVENT_COLUMNS)} FROM events WHERE YEAR_ID = :year), " \
+           F"dh_teams AS (SELECT DISTINCT GAME_ID, BAT_TEAM_ID AS FLD_TEAM_ID FROM year_events WHERE BAT_FLD_CD = 10) " \
+           F"SELECT GAME_ID, PLAYER_ID, MAX(TEAM), {totals} FROM ( {' UNION ALL '.join(roles)} ) " \
+           F"GROUP BY GAME_ID, PLAYER_ID ORDER BY GAME_ID, PLAYER_ID", fields
+
+BATTING_LINE_SQL, BATTING_LINE_FIELDS = batting_line_sql()
+
+
+class RetrosheetStore:
+    """
+    The events, games and subs tables of sql/retrosheet_table_schema.sql in ONE SQLite file, with NO database server:
+        the events of each year are loaded from the Chadwick event stream, the games and subs from the csv files of cwExport,
+        and loading a year replaces ALL the rows of that year, as a partition, in one transaction, in batches of executemany().
+    """
+    def __init__(self, logger:lg.Logger, path:str = STORE_PATH, schema_file:str = SCHEMA_FILE):
+        self.lgr = logger
+        self.path = path
+        self.tables = read_schema(schema_file)
+        self.conn = None
+        self.catalog = RetrosheetCatalog(logger)
+
+    def connect(self) -> sqlite3.Connection:
+        if self.conn is None:
+            os.makedirs(osp.dirname(self.path), exist_ok = True)
+            self.conn = sqlite3.connect(self.path)
+        return self.conn
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def create(self, indexes:bool = True):
+        """Create any missing table and, unless NOT 'indexes', any missing index."""
+        conn = self.connect()
+        with conn:
+            for table in STORE_TABLES:
+                columns = ", ".join( F"{name} {definition}" for name, definition in self.tables[table] )
+                conn.execute(F"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+            conn.execute(F"CREATE TABLE IF NOT EXISTS {PARTITIONS} ({PARTITIONS_COLUMNS})")
+        if indexes:
+            self.create_indexes()
+
+    def create_indexes(self, tables:list = STORE_TABLES):
+        """Create any missing index of 'tables': each one is built in a single pass over its table."""
+        conn = self.connect()
+        with timer.phase("store_indexes"), conn:
+            for index, (table, columns) in STORE_INDEXES.items():
+                if table in tables:
+                    conn.execute(F"CREATE INDEX IF NOT EXISTS {index} ON {table} ({columns})")
+
+    def drop_indexes(self, tables:list = STORE_TABLES):
+        """Drop the indexes of 'tables', so a bulk load does NOT update them row by row."""
+        conn = self.connect()
+        with conn:
+            for index, (table, columns) in STORE_INDEXES.items():
+                if table in tables:
+                    conn.execute(F"DROP INDEX IF EXISTS {index}")
+
+    def get_data_columns(self, table:str) -> list:
+        """Names of the columns of 'table' filled from the csv fields: all but the sequence number and the year."""
+        return [ name for name, definition in self.tables[table] if not name.startswith("seq_") and name != YEAR_COLUMN ]
+
+    def get_field_order(self, table:str) -> list:
+        """
+        Index of the csv field for each data column of 'table': the field of the same name, else the field in the same position,
+        as the schema names some cwevent fields differently, e.g. RES_PIT_ID for RESP_PIT_ID.
+        """
+        columns = self.get_data_columns(table)
+        headers = event_headers() if table == EVENTS else []
+        return [ headers.index(name) if name in headers else ix for ix, name in enumerate(columns) ]
+
+    def has_stable_rowids(self, table:str) -> bool:
+        """True if the rowid of 'table' is an INTEGER PRIMARY KEY column, so is NEVER renumbered."""
+        return any( definition.upper().startswith("INTEGER") and "PRIMARY KEY" in definition.upper()
+                    for _, definition in self.tables[table] )
+
+    def get_insert_sql(self, table:str) -> str:
+        columns = self.get_data_columns(table)
+        if table != SUBS:
+            columns = [YEAR_COLUMN] + columns
+        return F"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})"
+
+    def iter_rows(self, table:str, year:int, csv_rows):
+        """The values to insert for each csv row, with the year of the row first for the events and games."""
+        pick = itemgetter( *self.get_field_order(table) )
+        if table == SUBS:
+            return map(pick, csv_rows)
+        year_value = (year,)
+        return ( year_value + pick(fields) for fields in csv_rows )
+
+    def delete_year(self, conn:sqlite3.Connection, table:str, year:int):
+        """Delete the rows of 'year' from 'table' by their rowids if the year has a partition, else by the year of each row."""
+        bounds = None
+        if self.has_stable_rowids(table):
+            bounds = conn.execute( F"SELECT FIRST_ROW, LAST_ROW FROM {PARTITIONS} WHERE TABLE_NAME = ? AND {YEAR_COLUMN} = ?",
+                                   (table, year) ).fetchone()
+        else:
+            conn.execute( F"DELETE FROM {PARTITIONS} WHERE TABLE_NAME = ? AND {YEAR_COLUMN} = ?", (table, year) )
+        if bounds:
+            conn.execute(F"DELETE FROM {table} WHERE rowid BETWEEN ? AND ?", bounds)
+        elif table == SUBS:
+            conn.execute("DELETE FROM subs WHERE SUBSTR(GAME_ID, 4, 4) = ?", (str(year),))
+        else:
+            conn.execute(F"DELETE FROM {table} WHERE {YEAR_COLUMN} = ?", (year,))
+
+    def replace_year(self, table:str, year:int, csv_rows, batch_size:int = BATCH_SIZE) -> int:
+        """
+        Replace ALL the rows of 'year' in 'table' with 'csv_rows', in one transaction, inserting 'batch_size' rows per executemany(),
+        and record the rowids of the new rows as the partition of the year if they are stable: return the number of rows.
+        """
+        conn = self.connect()
+        insert_sql = self.get_insert_sql(table)
+        rows = self.iter_rows(table, year, csv_rows)
+        num_rows = 0
+        with conn:
+            self.delete_year(conn, table, year)
+            first_row = conn.execute(F"SELECT IFNULL(MAX(rowid), 0) + 1 FROM {table}").fetchone()[0]
+            batch = list( islice(rows, batch_size) )
+            while batch:
+                conn.executemany(insert_sql, batch)
+                num_rows += len(batch)
+                timer.count("store_batches")
+                batch = list( islice(rows, batch_size) )
+            if self.has_stable_rowids(table):
+                conn.execute( F"INSERT OR REPLACE INTO {PARTITIONS} VALUES (?, ?, ?, ?, ?)",
+                              (table, year, first_row, first_row + num_rows - 1, num_rows) )
+        return num_rows
+
+    def load_year(self, year:int, export_folder:str = EXPORT_FOLDER) -> dict:
+        """Load the events of 'year' from the event files, and the games and subs from the csv of cwExport if there is one."""
+        counts = {}
+        efiles, teams, roster_files = get_year_inputs(self.catalog, year)
+        if not efiles or not teams:
+            self.lgr.warning(F"CANNOT find the event files and TEAM file for {year}!")
+            return counts
+        lines = year_event_lines(efiles, teams, roster_files, year)
+        with timer.phase("store_events"):
+            counts[EVENTS] = self.replace_year( EVENTS, year, csv.reader(line.decode(UTF8_ENCODING) for line in lines) )
+        for table in (GAMES, SUBS):
+            csv_path = osp.join( export_folder, EXPORT_NAMES[table].format(year) )
+            if not osp.exists(csv_path):
+                self.lgr.info(F"NO exported {table} for {year} at {csv_path}.")
+                continue
+            with timer.phase(F"store_{table}"), open(csv_path, newline = '', encoding = UTF8_ENCODING) as csv_fp:
+                counts[table] = self.replace_year( table, year, csv.reader(csv_fp) )
+        return counts
+
+    def analyze(self):
+        """Update the statistics of the query planner, e.g. so it can skip-scan the YEAR_ID of an index to find a BAT_ID."""
+        with timer.phase("store_analyze"):
+            self.connect().execute("ANALYZE")
+
+    def has_year(self, year:int) -> bool:
+        row = self.connect().execute(F"SELECT 1 FROM events WHERE {YEAR_COLUMN} = ? LIMIT 1", (year,)).fetchone()
+        return row is not None
+
+    def get_batting_lines(self, year:int) -> np.ndarray:
+        """The batting line of each player in each game of 'year', with the dtype of the lines of the box score cache."""
+        with timer.phase("store_lines"):
+            rows = self.connect().execute(BATTING_LINE_SQL, {"year":year}).fetchall()
+        lines = np.zeros(len(rows), dtype = BAT_LINE_DTYPE)
+        if rows:
+            columns = list( zip(*rows) )
+            lines["game_id"] = columns[0]
+            lines["player_id"] = columns[1]
+            lines["team"] = columns[2]
+            for ix, field in enumerate(BATTING_LINE_FIELDS, start = 3):
+                lines[field] = columns[ix]
+        return lines
+
+    def iter_batting_lines(self, event_files:dict, years):
+        """
+        Yield the year, the path and the batting lines of each regular season event file for 'years', as cwTools.iter_batting_lines(),
+        i.e. the lines of the games of the home team of each file.
+        """
+        for year in years:
+            str_year = str(year)
+            if str_year not in event_files:
+                continue
+            if not self.has_year(year):
+                self.lgr.warning(F"NO events of {year} in the store {self.path}!")
+            year_lines = self.get_batting_lines(year)
+            # the home team is the start of the game id
+            home_teams = year_lines["game_id"].astype("S3")
+            for efile in event_files[str_year]:
+                team = bytes( osp.basename(efile)[4:-4], UTF8_ENCODING )
+                yield str_year, efile, year_lines[home_teams == team]
+
+    def run_queries(self, queries_file:str = QUERIES_FILE) -> list:
+        """[comment, number of rows, milliseconds] for each query in 'queries_file'."""
+        results = []
+        for comment, sql in read_queries(queries_file):
+            start = time.perf_counter()
+            rows = self.connect().execute(sql).fetchall()
+            results.append( [ comment, len(rows), round( (time.perf_counter() - start) * 1000, 3 ) ] )
+        return results
+
+# END class RetrosheetStore
+
+
+def process_store_input(argl:list) -> (int, int, str, bool, bool, str, str, str):
+    """Process command line input for the store."""
+    arg_parser = ArgumentParser(description = PROGRAM_DESC, prog = "python3 " + PROGRAM_NAME)
+    # required arguments
+    required = arg_parser.add_argument_group('REQUIRED')
+    required.add_argument('-y', '--start_year', required = True, type = int, metavar = "YEAR", help = "(start) year to load <yyyy>")
+    # optional arguments
+    arg_parser.add_argument('-e', '--end_year', type = int, metavar = "YEAR", help = "end year to load <yyyy>")
+    arg_parser.add_argument('-d', '--store', default = STORE_PATH, help = F"path of the SQLite store: default = {STORE_PATH}")
+    arg_parser.add_argument('-n', '--noload', action = "store_true", help = "do NOT load any year, e.g. to just run the queries")
+    arg_parser.add_argument('-k', '--queries', action = "store_true", help = F"run and time the queries of {QUERIES_FILE}")
+    arg_parser.add_argument('-q', '--quiet', action = "store_true", help = "NO logging")
+    arg_parser.add_argument('-c', '--levcon', metavar = "LEVEL", default = lg.getLevelName(DEFAULT_CONSOLE_LEVEL),
+                            help = "set LEVEL of console logging output")
+    arg_parser.add_argument('-f', '--levfile', metavar = "LEVEL", default = lg.getLevelName(DEFAULT_FILE_LEVEL),
+                            help = "set LEVEL of file logging output")
+    arg_parser.add_argument('--timings', metavar = "FILE", nargs = '?', const = TIMINGS_STDOUT, help = TIMINGS_HELP)
+    argp = arg_parser.parse_args(argl)
+
+    con_level = lg.getLevelName(QUIET_LOG_LEVEL) if argp.quiet else argp.levcon.strip().upper()
+    try:
+        getattr( lg, con_level )
+    except AttributeError as ae:
+        print(F"Problem with console log level: {repr(ae)}")
+        con_level = DEFAULT_CONSOLE_LEVEL
+    file_level = argp.levfile.strip().upper()
+    try:
+        getattr( lg, file_level )
+    except AttributeError as ae:
+        print(F"Problem with file log level: {repr(ae)}")
+        file_level = DEFAULT_FILE_LEVEL
+
+    if not RETROSHEET_START_YEAR <= argp.start_year <= RETROSHEET_END_YEAR:
+        raise ValueError(F">>> INVALID start year '{argp.start_year}'!")
+    start = argp.start_year
+
+    if argp.end_year and RETROSHEET_START_YEAR <= argp.end_year <= RETROSHEET_END_YEAR and argp.end_year >= start:
+        end = argp.end_year
+    else:
+        if argp.end_year:
+            print(F">>> INVALID end year '{argp.end_year}'! Using end year = {start}.\n")
+        end = start
+
+    return start, end, argp.store, argp.noload, argp.queries, con_level, file_level, argp.timings
+
+
+def main_cw_store(args:list):
+    start, end, store_path, noload, queries, conlevel, filelevel, timings = process_store_input(args)
+    if timings:
+        timer.enable()
+
+    lg_ctrl = MhsLogger( __file__, con_level = conlevel, file_level = filelevel, folder = osp.join("logs", "store") )
+    lgr = lg_ctrl.get_logger()
+    lgr.info(F"Logging: console level = {repr(conlevel)}; file level = {repr(filelevel)}")
+
+    store = RetrosheetStore(lgr, store_path)
+    try:
+        store.create()
+        if not noload:
+            for year in range(start, end + 1):
+                counts = store.load_year(year)
+                lgr.warning(F"loaded {year}: {counts}")
+            store.analyze()
+        if queries:
+            for comment, num_rows, msecs in store.run_queries():
+                print(F"{msecs:10.3f} ms {num_rows:6} rows: {comment}")
+    finally:
+        store.close()
+    if timings:
+        timer.write_report(timings)
+
+
+if __name__ == "__main__":
+    if '-q' not in sys.argv:
+        print(F"\n\tStart time = {get_current_time()}\n")
+    main_cw_store(sys.argv[1:])
+    if '-q' not in sys.argv:
+        run_time = (dt.now() - now_dt).total_seconds()
+        print(F"\tRunning time = {(run_time // 60)} minutes, {(run_time % 60):2.3} seconds")
+    exit()
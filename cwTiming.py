@@ -0,0 +1,91 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# cwTiming.py -- named phase timers and counters for the Retrosheet tools, reported as json
+#
+# The data processed by this software was obtained free of charge from and is copyrighted by Retrosheet.
+# Interested parties may contact Retrosheet at 20 Sunset Rd., Newark, DE 19711.
+#
+# Copyright (c) 2021 Mark Sattolo <epistemik@gmail.com>
+
+__author__       = "Mark Sattolo"
+__author_email__ = "epistemik@gmail.com"
+__created__ = "2026-10-18"
+__updated__ = "2026-10-18"
+
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+MS_PER_SEC = 1000
+TIMINGS_STDOUT = '-'
+TIMINGS_HELP = F"write a json report of the time of each phase to FILE, or to stdout if no FILE or '{TIMINGS_STDOUT}'"
+
+# shared by every phase while timing is disabled, so a disabled phase creates nothing
+NULL_PHASE = nullcontext()
+
+
+class PhaseTimer:
+    """
+    Total time and number of calls of each named phase, plus named counters, for one run of a tool.
+        Phases may nest, so the time of a phase includes the time of any phase inside it.
+        While disabled, phase() returns a shared do-nothing context and count() returns at once.
+        Only the phases run in this process are timed, i.e. NOT those in worker processes;
+        the phases run in worker threads ARE timed, so the time of a phase is the sum over all the threads.
+    """
+    def __init__(self, enabled:bool = False):
+        self.enabled = enabled
+        self.phases = {}
+        self.counters = {}
+        self.start = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+        self.phases.clear()
+        self.counters.clear()
+        self.start = time.perf_counter()
+
+    def phase(self, name:str):
+        """Context to time a phase: 'with timer.phase("parse"): ...'."""
+        if not self.enabled:
+            return NULL_PHASE
+        return self.timed_phase(name)
+
+    @contextmanager
+    def timed_phase(self, name:str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                totals = self.phases.setdefault(name, [0.0, 0])
+                totals[0] += elapsed
+                totals[1] += 1
+
+    def count(self, name:str, num:int = 1):
+        if self.enabled:
+            with self.lock:
+                self.counters[name] = self.counters.get(name, 0) + num
+
+    def get_report(self) -> dict:
+        return { "total_ms":round( (time.perf_counter() - self.start) * MS_PER_SEC, 3 ),
+                 "phases":{ name:{"ms":round(secs * MS_PER_SEC, 3), "calls":calls}
+                            for name, (secs, calls) in self.phases.items() },
+                 "counters":dict(self.counters) }
+
+    def write_report(self, path:str = TIMINGS_STDOUT):
+        """Write the report as json to 'path', or to stdout."""
+        if path == TIMINGS_STDOUT:
+            print( json.dumps(self.get_report(), indent = 4) )
+        else:
+            with open(path, 'w') as fp:
+                json.dump(self.get_report(), fp, indent = 4)
+
+# END class PhaseTimer
+
+
+# the timer for the phases of the current run, enabled by the --timings option of each tool
+timer = PhaseTimer()
@@ -14,7 +14,7 @@
 __author__       = "Mark Sattolo"
 __author_email__ = "epistemik@gmail.com"
 __created__ = "2019-11-07"
-__updated__ = "2021-09-05"
+__updated__ = "2026-10-18"
 
 import csv
 import glob
@@ -23,7 +23,15 @@ import sys
 from abc import ABC, abstractmethod
 from argparse import ArgumentParser
 from ctypes import c_char_p, pointer
-from cwLibWrappers import MyCwlib, chadwick
+from cwLibWrappers import MyCwlib, chadwick, read_games, read_game_at, event_file, box_scope, free_game, free_roster, \
+                          get_peak_rss
+from cwConfig import CACHE_FOLDER
+from cwCache import BoxLineCache, BoxLineExtractor, np
+from cwBoxscores import BoxscoreSupplement, BOXSCORE_FOLDER
+from cwPeople import PersonDirectory, RETROSHEET_FOLDER, ROSTERS_FOLDER, FAM_NAME, GIV_NAME
+from cwCatalog import RetrosheetCatalog, EVENTS_FOLDER, REG_SEASON_FOLDER, POST_SEASON_FOLDER
+from cwAppearances import AppearanceIndex
+from cwTiming import timer, TIMINGS_STDOUT, TIMINGS_HELP
 sys.path.append("/home/marksa/git/Python/utils")
 from mhsUtils import lg, get_base_filename, osp, UTF8_ENCODING, BASE_DEV_FOLDER, BASE_GIT_FOLDER
 from mhsLogging import DEFAULT_CONSOLE_LEVEL, DEFAULT_FILE_LEVEL, QUIET_LOG_LEVEL
@@ -40,12 +48,6 @@ RETROSHEET_START_YEAR = 1871
 RETROSHEET_AVAIL_YEAR = 1974
 RETROSHEET_END_YEAR   = 2021
 
-RETROSHEET_FOLDER  = osp.join(BASE_GIT_FOLDER, "fork" + osp.sep + "retrosheet")
-ROSTERS_FOLDER     = osp.join(RETROSHEET_FOLDER, "rosters")
-EVENTS_FOLDER      = osp.join(RETROSHEET_FOLDER, "event")
-REG_SEASON_FOLDER  = osp.join(EVENTS_FOLDER, "regular")
-POST_SEASON_FOLDER = osp.join(EVENTS_FOLDER, "post")
-BOXSCORE_FOLDER    = osp.join(BASE_DEV_FOLDER, "Retrosheet" + osp.sep + "data" + osp.sep + "boxscores")
 
 def c_char_p_to_str(lpcc:c_char_p, maxlen:int = 32) -> str:
     """Obtain a python string from a C-type char array:
@@ -72,29 +74,144 @@ def get_print_strx(num:float, games:int, prec:int, lim:int = STD_SPACE_SIZE, lea
     return pnum if lead_zero else pnum.lstrip(" 0")
 
 
+# lazy pipeline from the years to the box score lines: years -> event files -> games -> lines
+# each stage is a generator, so nothing is read until it is needed, and the team and date filters are applied
+# to each game as soon as it is read, so a game that does not pass them is never boxed
+
+def game_in_dates(game_id:str, start_date:str = None, end_date:str = None) -> bool:
+    """True if the date of 'game_id', e.g. KC1196304090, is in the range of the optional 'yyyymmdd' dates."""
+    game_date = game_id[3:11]
+    return (not start_date or game_date >= start_date) and (not end_date or game_date <= end_date)
+
+def game_has_team(game_ptr, team:str) -> bool:
+    return team in ( MyCwlib.game_info_lookup(game_ptr, b'hometeam'), MyCwlib.game_info_lookup(game_ptr, b'visteam') )
+
+def iter_event_files(event_files:dict, years):
+    """Yield the year, as a str, and the path of each event file for 'years', from the event files by year."""
+    for year in years:
+        str_year = str(year)
+        for efile in event_files.get(str_year, []):
+            yield str_year, efile
+
+def iter_offset_games(efile:str, offsets:list):
+    """Yield ONLY the games of 'efile' whose 'id' records start at the byte 'offsets', e.g. from a game index."""
+    with event_file(efile) as file_handle:
+        for offset in offsets:
+            game = read_game_at(file_handle, offset)
+            if not game:
+                raise ValueError(F"CANNOT read the game at offset {offset} of {efile}!")
+            yield game
+
+def iter_file_games(efile:str, team:str = None, start_date:str = None, end_date:str = None, free:bool = True,
+                    offsets:list = None):
+    """
+    Yield the id and the game of each game in 'efile' played by 'team' and in the date range, if given:
+        every other game is freed as soon as it is read, so it is never boxed;
+        if 'offsets' are given, ONLY the games at those byte offsets are read.
+    If 'free', each game yielded is freed when the next one is requested, so at most ONE game is in memory at a time;
+    else the caller owns the games yielded and must free_game() them.
+    """
+    games = read_games(efile, free = False) if offsets is None else iter_offset_games(efile, offsets)
+    for game in games:
+        game_id = game.contents.game_id.decode(UTF8_ENCODING)
+        if not game_in_dates(game_id, start_date, end_date) or ( team and not game_has_team(game, team) ):
+            free_game(game)
+            timer.count("games_filtered")
+            continue
+        try:
+            yield game_id, game
+        finally:
+            if free:
+                free_game(game)
+
+def iter_games(event_files:dict, years, team:str = None, start_date:str = None, end_date:str = None):
+    """Yield the year, the id and the game of each game for 'years' that passes the filters: see iter_file_games()."""
+    for str_year, efile in iter_event_files(event_files, years):
+        for game_id, game in iter_file_games(efile, team, start_date, end_date):
+            yield str_year, game_id, game
+
+def select_players(lines:np.ndarray, bplayers:set) -> np.ndarray:
+    """The lines of the players in 'bplayers', as bytes: each DISTINCT player id is looked up in the set only once."""
+    players, rows = np.unique(lines["player_id"], return_inverse = True)
+    wanted = np.fromiter( (pid in bplayers for pid in players), dtype = bool, count = len(players) )
+    return lines[ wanted[rows.ravel()] ]
+
+def iter_box_lines(event_files:dict, years, box_cache:BoxLineCache, player_ids = None, team:str = None,
+                   start_date:str = None, end_date:str = None):
+    """
+    Yield the year, the path and the batting and pitching lines of each event file for 'years':
+        with no team or date filter the lines come from 'box_cache',
+        else the games are streamed and ONLY those that pass the filters are boxed;
+        if 'player_ids' are given, only the lines of those players are kept.
+    """
+    bplayers = { bytes(pid, UTF8_ENCODING) for pid in player_ids } if player_ids else None
+    for str_year, efile in iter_event_files(event_files, years):
+        if team or start_date or end_date:
+            extractor = BoxLineExtractor()
+            for game_id, game in iter_file_games(efile, team, start_date, end_date):
+                with box_scope(game) as box:
+                    extractor.add_box(box, game_id)
+            bat_lines, pit_lines, _ = extractor.get_lines()
+        else:
+            bat_lines, pit_lines = box_cache.get_lines(efile)
+        if bplayers:
+            bat_lines = select_players(bat_lines, bplayers)
+            pit_lines = select_players(pit_lines, bplayers)
+        yield str_year, efile, bat_lines, pit_lines
+
+def iter_batting_lines(event_files:dict, years, box_cache:BoxLineCache, player_ids = None, team:str = None,
+                       start_date:str = None, end_date:str = None):
+    """Yield the year, the path and the batting lines of each event file for 'years': see iter_box_lines()."""
+    for str_year, efile, bat_lines, _ in iter_box_lines(event_files, years, box_cache, player_ids, team, start_date, end_date):
+        yield str_year, efile, bat_lines
+
+def iter_pitching_lines(event_files:dict, years, box_cache:BoxLineCache, player_ids = None, team:str = None,
+                        start_date:str = None, end_date:str = None):
+    """Yield the year, the path and the pitching lines of each event file for 'years': see iter_box_lines()."""
+    for str_year, efile, _, pit_lines in iter_box_lines(event_files, years, box_cache, player_ids, team, start_date, end_date):
+        yield str_year, efile, pit_lines
+
+
 class PrintStats(ABC):
-    """Print batting or pitching stats for a specified player using Retrosheet data."""
-    def __init__(self, logger:lg.Logger):
+    """
+    Print batting or pitching stats for one or more specified players using Retrosheet data:
+        the catalog, the person directory and the cache folder may be given, e.g. those of a test tree,
+        else the default ones are used.
+    """
+    def __init__(self, logger:lg.Logger, catalog:RetrosheetCatalog = None, people:PersonDirectory = None,
+                 store_folder:str = CACHE_FOLDER):
         self.lgr = logger
         self.lgr.warning(F"Start {self.__class__.__name__}")
+        # the event files by year for each season type
         self.event_files = {}
-        self.game_ids = []
+        self.game_ids = set()
         self.num_years = 0
         self.stats = None
         self.totals = None
         self.std_space = 0
         self.hdrs = None
         self.num_files = 0
-        self.fam_name = self.giv_name = ''
+        # the stats and game ids of each player, season type and year, ALL collected in one pass over the event files
+        self.player_years = {}
+        self.box_cache = BoxLineCache(logger, store_folder)
+        self.people = people if people else PersonDirectory(logger)
+        self.catalog = catalog if catalog else RetrosheetCatalog(logger)
+        self.box_supplement = BoxscoreSupplement(logger, index_folder = store_folder, catalog = self.catalog)
+        self.appearances = AppearanceIndex(logger, self.catalog, self.people, store_folder)
 
     def get_num_files(self):
         return self.num_files
 
-    def get_giv_name(self):
-        return self.giv_name
+    def get_name(self, pers_id:str) -> str:
+        person = self.people.get(pers_id)
+        return F"{person[GIV_NAME]} {person[FAM_NAME]}" if person else pers_id
 
-    def get_fam_name(self):
-        return self.fam_name
+    def use_player_year(self, player_id:str, season:str, year:str):
+        """Point self.stats and self.game_ids at those of 'player_id' for 'season' and 'year', which start empty."""
+        player_years = self.player_years.setdefault( (player_id, season), {} )
+        if year not in player_years:
+            player_years[year] = ( dict.fromkeys(self.hdrs, 0), set() )
+        self.stats, self.game_ids = player_years[year]
 
     def sum_and_clear(self):
         for item in self.stats.keys():
@@ -114,105 +231,77 @@ class PrintStats(ABC):
         print(' ')
         self.print_hdr_uls()
 
+    def collect_all_stats(self, player_ids:list, yrstart:int, yrend:int):
+        """
+        Collect the stats of ALL the players in 'player_ids', for each season type of the event files,
+        in years <yrstart> to <yrend> with ONE pass over the event files.
+        """
+        for season, event_files in self.event_files.items():
+            for year in range(yrstart, yrend + 1):
+                self.lgr.info(F"collect {season} stats for year: {year}")
+                str_year = str(year)
+                if str_year not in event_files.keys():
+                    continue
+                for _, efile, bat_lines, pit_lines in iter_box_lines(event_files, [year], self.box_cache, player_ids):
+                    self.lgr.debug(F"found events for year/team = {get_base_filename(efile)}")
+                    with timer.phase("collect_stats"):
+                        found = set( bat_lines["player_id"].tolist() ) | set( pit_lines["player_id"].tolist() )
+                        for bplayer in sorted(found):
+                            player_id = bplayer.decode(UTF8_ENCODING)
+                            self.use_player_year(player_id, season, str_year)
+                            self.collect_stats( bat_lines[ bat_lines["player_id"] == bplayer ],
+                                                pit_lines[ pit_lines["player_id"] == bplayer ], player_id, str_year )
+
+                for player_id in player_ids:
+                    self.use_player_year(player_id, season, str_year)
+                    self.lgr.info(F"found {len(self.game_ids)} {year} games with {player_id} stats.")
+                    if year < RETROSHEET_AVAIL_YEAR and season == REG_SEASON:
+                        with timer.phase("check_boxscores"):
+                            self.check_boxscores(player_id, str_year)
+
     def print_stats(self, player_id:str, name:str, season:str, yrstart:int, yrend:int):
-        """Print regular or post-season stats for player 'player_id' in years <yrstart> to <yrend>."""
+        """Print the collected regular or post-season stats for player 'player_id' in years <yrstart> to <yrend>."""
         self.lgr.debug(F"print {season} stats for years {yrstart} to {yrend}")
         print(F"\n\t{name} {season} Stats:")
         self.print_header()
+        self.totals = dict.fromkeys(self.hdrs, 0)
+        self.num_years = 0
 
-        # get all the games in the supplied date range
         for year in range(yrstart, yrend + 1):
-            self.lgr.info(F"collect stats for year: {year}")
-            self.game_ids.clear()
             str_year = str(year)
-            if str_year not in self.event_files.keys():
+            if str_year not in self.event_files[season].keys():
                 continue
-            for efile in self.event_files[str_year]:
-                self.lgr.debug(F"found events for year/team = {get_base_filename(efile)}")
-                cwgames = chadwick.games(efile)
-                for game in cwgames:
-                    game_id = game.contents.game_id.decode(encoding = UTF8_ENCODING)
-                    game_date = game_id[3:11]
-                    self.lgr.debug(F" Found game id = {game_id}; date = {game_date}")
-
-                    box = MyCwlib.box_create(game)
-                    self.collect_stats(box, player_id, str_year, game_id)
-
-            self.lgr.info(F"found {len(self.game_ids)} {year} games with {player_id} stats.")
-
-            if year < RETROSHEET_AVAIL_YEAR and season == REG_SEASON:
-                self.check_boxscores(player_id, str_year)
-
-            self.print_stat_line(str_year)
+            self.use_player_year(player_id, season, str_year)
+            with timer.phase("print"):
+                self.print_stat_line(str_year)
             self.sum_and_clear()
 
         if self.num_years > 1:
-            self.print_hdr_uls()
-            if self.num_years > 5:
-                self.print_header()
-            self.print_stat_line(LABEL_TOTAL)
-            self.print_ave_line()
+            with timer.phase("print"):
+                self.print_hdr_uls()
+                if self.num_years > 5:
+                    self.print_header()
+                self.print_stat_line(LABEL_TOTAL)
+                self.print_ave_line()
         print('')
 
-    def get_events(self, post:bool, pers_id:str, start:int, end:int):
-        """Get the required event files for batting and pitching stats."""
-        season = POST_SEASON if post else REG_SEASON
-        self.lgr.info(F"get the {season} events for player {pers_id} in years {start}->{end}")
-        need_name = True
-        self.fam_name = pers_id
-        try:
-            for year in range(start, end+1):
-                year_events = []
-                # get the team files
-                team_file_name = osp.join(REG_SEASON_FOLDER, "TEAM" + str(year))
-                self.lgr.debug(F"team file name = {team_file_name}")
-                if not osp.exists(team_file_name):
-                    self.lgr.exception(F"CANNOT find team file {team_file_name}!")
-                    continue
-                with open(team_file_name, newline = '') as team_csvfile:
-                    team_reader = csv.reader(team_csvfile)
-                    for trow in team_reader:
-                        rteam = trow[0]
-                        self.lgr.debug(F"Found team {rteam}")
-                        # search rosters for the player's full name
-                        if need_name:
-                            roster_file = osp.join(ROSTERS_FOLDER, rteam + str(year) + osp.extsep + "ROS")
-                            self.lgr.debug(F"roster file name = {roster_file}")
-                            if not osp.exists(roster_file):
-                                raise FileNotFoundError(F"CANNOT find roster file {roster_file}!")
-                            with open(roster_file, newline = '') as roster_csvfile:
-                                ros_reader = csv.reader(roster_csvfile)
-                                for rrow in ros_reader:
-                                    if pers_id == rrow[0]:
-                                        self.fam_name = rrow[1]
-                                        self.giv_name = rrow[2]
-                                        need_name = False
-                                        break
-                        if not post:
-                            # find and store the event file paths for the requested years
-                            rfile = osp.join(REG_SEASON_FOLDER, str(year) + rteam + osp.extsep + "EV" + trow[1])
-                            if not osp.exists(rfile):
-                                raise FileNotFoundError(F"CANNOT find {season} event file {rfile}!")
-                            year_events.append(rfile)
-                            self.num_files += 1
-
-                if post:
-                    # find and store the event file paths for the requested years
-                    post_files = osp.join(POST_SEASON_FOLDER, str(year) + "*")
-                    for pfile in glob.glob(post_files):
-                        self.lgr.debug(F"{season} file name = {pfile}")
-                        if not osp.exists(pfile):
-                            raise FileNotFoundError(F"CANNOT find {season} event file {pfile}!")
-                        year_events.append(pfile)
-                        self.num_files += 1
-
-                self.event_files[str(year)] = year_events
-
-        except Exception as ex:
-            raise ex
+    def get_events(self, seasons:list, start:int, end:int, player_ids:list = None):
+        """
+        Get the required event files of each season type in 'seasons' for batting and pitching stats:
+            if 'player_ids' are given, ONLY the files in which any of those players appears.
+        """
+        self.lgr.info(F"get the {' and '.join(seasons)} events in years {start}->{end}")
+        self.event_files = {}
+        for season in seasons:
+            post = season == POST_SEASON
+            self.event_files[season] = self.catalog.get_years_events(start, end, post)
+            if player_ids:
+                self.event_files[season] = self.appearances.select_event_files(player_ids, self.event_files[season], post)
+        self.num_files = sum( len(year_events) for season_events in self.event_files.values()
+                              for year_events in season_events.values() )
 
     @abstractmethod
-    def collect_stats(self, p_box:pointer, player_id:str, year:str, game_id:str):
+    def collect_stats(self, bat_lines:np.ndarray, pit_lines:np.ndarray, player_id:str, year:str):
         pass
 
     @abstractmethod
@@ -234,20 +323,35 @@ def process_bp_args(desc:str, exe:str, id_help:str):
     arg_parser = ArgumentParser(description = desc, prog = "python3 " + exe)
     # required arguments
     required = arg_parser.add_argument_group("REQUIRED")
-    required.add_argument('-i', '--player_id', required = True, help = id_help)
+    required.add_argument('-i', '--player_id', metavar = "ID", nargs = '+', required = True,
+                          help = F"{id_help}; or a FILE of such ids, separated by spaces, commas or new lines")
     required.add_argument('-s', '--start', metavar = "YEAR", required = True, type = int,
                           help = "(start) year to find stats <yyyy>")
     # optional arguments
     arg_parser.add_argument('-e', '--end', metavar = "YEAR", type = int, help = "end year to find stats <yyyy>")
     arg_parser.add_argument('-p', '--post', action = "store_true", help = F"find {POST_SEASON} games instead of {REG_SEASON}")
+    arg_parser.add_argument('-b', '--both', action = "store_true", help = F"find {REG_SEASON} AND {POST_SEASON} games")
     arg_parser.add_argument('-q', '--quiet', action = "store_true", help = "NO logging")
     arg_parser.add_argument('-c', '--levcon', metavar = "LEVEL", default = lg.getLevelName(DEFAULT_CONSOLE_LEVEL),
                             help = "set LEVEL of console logging output")
     arg_parser.add_argument('-f', '--levfile', metavar = "LEVEL", default = lg.getLevelName(DEFAULT_FILE_LEVEL),
                             help = "set LEVEL of file logging output")
+    arg_parser.add_argument('--timings', metavar = "FILE", nargs = '?', const = TIMINGS_STDOUT, help = TIMINGS_HELP)
     return arg_parser
 
 
+def get_player_ids(args:list) -> list:
+    """The player ids in 'args', where each arg is an id or a file of ids."""
+    player_ids = []
+    for arg in args:
+        if osp.isfile(arg):
+            with open(arg) as fp:
+                player_ids.extend( re.split(r"[\s,]+", fp.read().strip()) )
+        else:
+            player_ids.append( arg.strip() )
+    return [ pid for pid in player_ids if pid ]
+
+
 def process_bp_input(argl:list, default_id:str, default_yr:int, desc:str, prog:str, id_help:str):
     """Process command line input for batting and pitching stats."""
     argp = process_bp_args(desc, prog, id_help).parse_args(argl)
@@ -265,15 +369,18 @@ def process_bp_input(argl:list, default_id:str, default_yr:int, desc:str, prog:s
         print(F"Problem with file log level: {repr(ae)}")
         file_level = DEFAULT_FILE_LEVEL
 
-    p_id = argp.player_id.lower().strip()
     # regex to match retrosheet player id format
     re_id = re.compile(r"([a-z]{2}[a-z\-]{2}[a-z][0-1][0-9]{2})")
-    re_match = re.match(re_id, p_id)
-    if re_match:
-        player_id = p_id
-    else:
-        print(F">>> IMPROPER player id '{argp.player_id}'! Using default value = {default_id}.\n")
-        player_id = default_id
+    player_ids = []
+    for p_id in get_player_ids(argp.player_id):
+        if re.match(re_id, p_id.lower()):
+            if p_id.lower() not in player_ids:
+                player_ids.append( p_id.lower() )
+        else:
+            print(F">>> IMPROPER player id '{p_id}'!\n")
+    if not player_ids:
+        print(F">>> NO proper player id! Using default value = {default_id}.\n")
+        player_ids = [default_id]
 
     if RETROSHEET_START_YEAR <= argp.start <= RETROSHEET_END_YEAR:
         start = argp.start
@@ -288,4 +395,5 @@ def process_bp_input(argl:list, default_id:str, default_yr:int, desc:str, prog:s
             print(F">>> INVALID end year '{argp.end}'! Using end year = {start}.\n")
         end = start
 
-    return player_id, start, end, argp.post, con_level, file_level
+    seasons = [REG_SEASON, POST_SEASON] if argp.both else [POST_SEASON] if argp.post else [REG_SEASON]
+    return player_ids, start, end, seasons, con_level, file_level, argp.timings
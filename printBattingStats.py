@@ -14,15 +14,15 @@
 __author__       = "Mark Sattolo"
 __author_email__ = "epistemik@gmail.com"
 __created__ = "2021-01-21"
-__updated__ = "2021-10-06"
+__updated__ = "2026-10-18"
 
 import sys
 sys.path.append("/home/marksa/git/Python/utils")
 import copy
 from mhsUtils import dt, now_dt, get_filename, get_current_time
 from mhsLogging import MhsLogger
-from cwLibWrappers import cwlib
 from cwTools import *
+from cwCache import line_sum
 
 DEFAULT_BAT_ID = "maysw101"
 DEFAULT_BAT_YR = 1954
@@ -61,105 +61,76 @@ BATTING_HDRS = list( STATS_DICT.keys() )
 
 class PrintBattingStats(PrintStats):
     """Print batting stats for a player using Retrosheet data."""
-    def __init__(self, logger:lg.Logger):
-        super().__init__(logger)
+    def __init__(self, logger:lg.Logger, catalog:RetrosheetCatalog = None, people:PersonDirectory = None,
+                 store_folder:str = CACHE_FOLDER):
+        super().__init__(logger, catalog, people, store_folder)
         self.stats = copy.copy(STATS_DICT)
         self.totals = copy.copy(STATS_DICT)
         self.std_space = BAT_STD_SPACE
         self.hdrs = BATTING_HDRS
 
-    def collect_stats(self, p_box:pointer, bat_id:str, year:str, game_id:str):
+    def collect_stats(self, bat_lines:np.ndarray, pit_lines:np.ndarray, bat_id:str, year:str):
         self.lgr.debug(F"search for '{bat_id}' in year = {year}")
-        slots = [1,1]
-        players = [MyCwlib.box_get_starter(p_box, 0, 1), MyCwlib.box_get_starter(p_box, 1, 1)]
-
-        while slots[0] <= 9 or slots[1] <= 9 :
-            for t in range(2):
-                if slots[t] <= 9:
-                    player = players[t].contents.player_id.decode(UTF8_ENCODING)
-                    if player == bat_id:
-                        self.lgr.info(F"found player '{bat_id}' in game {game_id}")
-                        self.game_ids.append(game_id)
-                        batting = players[t].contents.batting.contents
-                        self.stats[ self.hdrs[GM] ]  += batting.g
-                        self.stats[ self.hdrs[PA] ]  += batting.pa
-                        self.stats[ self.hdrs[AB] ]  += batting.ab
-                        self.stats[ self.hdrs[RUN] ] += batting.r
-                        self.stats[ self.hdrs[HIT] ] += batting.h
-                        self.stats[ self.hdrs[B2] ]  += batting.b2
-                        self.stats[ self.hdrs[B3] ]  += batting.b3
-                        self.stats[ self.hdrs[HR] ]  += batting.hr
-                        self.stats[ self.hdrs[XBH] ] += (batting.b2 + batting.b3 + batting.hr)
-                        if batting.bi > 0:
-                            self.stats[ self.hdrs[RBI] ] += batting.bi
-                        self.stats[ self.hdrs[BB] ]  += batting.bb
-                        self.stats[ self.hdrs[IBB] ] += batting.ibb
-                        self.stats[ self.hdrs[SO] ]  += batting.so
-                        self.stats[ self.hdrs[SB] ]  += batting.sb
-                        self.stats[ self.hdrs[CS] ]  += batting.cs
-                        self.stats[ self.hdrs[SH] ]  += batting.sh
-                        self.stats[ self.hdrs[SF] ]  += batting.sf
-                        self.stats[ self.hdrs[HBP] ] += batting.hp
-                        self.stats[ self.hdrs[GDP] ] += batting.gdp
-                    players[t] = players[t].contents.next
-                    if not players[t]:
-                        while slots[t] <= 9 and not players[t]:
-                            slots[t] += 1
-                            if slots[t] <= 9:
-                                players[t] = cwlib.cw_box_get_starter(p_box, t, slots[t])
+        batting = bat_lines[ bat_lines["player_id"] == bytes(bat_id, UTF8_ENCODING) ]
+        if len(batting) == 0:
+            return
+        for game_id in batting["game_id"]:
+            self.lgr.info(F"found player '{bat_id}' in game {game_id.decode(UTF8_ENCODING)}")
+            self.game_ids.add( game_id.decode(UTF8_ENCODING) )
+        self.stats[ self.hdrs[GM] ]  += line_sum(batting, "g")
+        self.stats[ self.hdrs[PA] ]  += line_sum(batting, "pa")
+        self.stats[ self.hdrs[AB] ]  += line_sum(batting, "ab")
+        self.stats[ self.hdrs[RUN] ] += line_sum(batting, "r")
+        self.stats[ self.hdrs[HIT] ] += line_sum(batting, "h")
+        self.stats[ self.hdrs[B2] ]  += line_sum(batting, "b2")
+        self.stats[ self.hdrs[B3] ]  += line_sum(batting, "b3")
+        self.stats[ self.hdrs[HR] ]  += line_sum(batting, "hr")
+        self.stats[ self.hdrs[XBH] ] += line_sum(batting, "b2") + line_sum(batting, "b3") + line_sum(batting, "hr")
+        self.stats[ self.hdrs[RBI] ] += line_sum(batting, "bi", positive = True)
+        self.stats[ self.hdrs[BB] ]  += line_sum(batting, "bb")
+        self.stats[ self.hdrs[IBB] ] += line_sum(batting, "ibb")
+        self.stats[ self.hdrs[SO] ]  += line_sum(batting, "so")
+        self.stats[ self.hdrs[SB] ]  += line_sum(batting, "sb")
+        self.stats[ self.hdrs[CS] ]  += line_sum(batting, "cs")
+        self.stats[ self.hdrs[SH] ]  += line_sum(batting, "sh")
+        self.stats[ self.hdrs[SF] ]  += line_sum(batting, "sf")
+        self.stats[ self.hdrs[HBP] ] += line_sum(batting, "hp")
+        self.stats[ self.hdrs[GDP] ] += line_sum(batting, "gdp")
 
     def check_boxscores(self, bat_id:str, year:str):
         """Check the Retrosheet boxscore files for batting stats missing from the event files."""
         self.lgr.debug(F"check boxscore files for year = {year}")
-        box_year = osp.join(BOXSCORE_FOLDER, year)
-        boxscore_files = [box_year + osp.extsep + "EBN", box_year + osp.extsep + "EBA"]
-        for bfile in boxscore_files:
-            try:
-                with open(bfile, newline = '') as box_csvfile:
-                    self.lgr.info(F"search boxscore file {bfile}")
-                    box_reader = csv.reader(box_csvfile)
-                    find_player = False
-                    for brow in box_reader:
-                        if brow[0] == "id":
-                            current_id = brow[1]
-                            if current_id in self.game_ids:
-                                self.lgr.debug(F"found duplicate game '{current_id}' in Boxscore file.")
-                                find_player = False
-                                continue
-                            else:
-                                self.lgr.info(F"found NEW game '{current_id}' in Boxscore file.")
-                                find_player = True
-                        elif find_player:
-                            if brow[1] == "bline" and brow[2] == bat_id:
-                                self.lgr.info(F"found player '{bat_id}' in NEW boxscore game {current_id}")
-                                # parse boxscore batting stat line
-                                # key: 'stat','bline',id,side,pos,seq,ab,r,h,2b,3b,hr,rbi,sh,sf,hbp,bb,ibb,k, sb,cs,gidp,int
-                                #       0      1      2  3    4   5   6  7 8 9  10 11 12  13 14 15  16 17  18 19 20  21  22
-                                self.stats[self.hdrs[GM]]  += 1
-                                self.stats[self.hdrs[PA]]  += ( int(brow[6]) + int(brow[13]) + int(brow[14]) + int(brow[15])
-                                                                + int(brow[16]) + int(brow[22]) )
-                                self.stats[self.hdrs[AB]]  += int(brow[6])
-                                self.stats[self.hdrs[RUN]] += int(brow[7])
-                                self.stats[self.hdrs[HIT]] += int(brow[8])
-                                self.stats[self.hdrs[B2]]  += int(brow[9])
-                                self.stats[self.hdrs[B3]]  += int(brow[10])
-                                self.stats[self.hdrs[HR]]  += int(brow[11])
-                                self.stats[self.hdrs[XBH]] += ( int(brow[9]) + int(brow[10]) + int(brow[11]) )
-                                if int(brow[12]) > 0:
-                                    self.stats[self.hdrs[RBI]] += int(brow[12])
-                                self.stats[self.hdrs[BB]]  += int(brow[16])
-                                if int(brow[17]) > 0:
-                                    self.stats[self.hdrs[IBB]] += int(brow[17])
-                                self.stats[self.hdrs[SO]]  += int(brow[18])
-                                self.stats[self.hdrs[SB]]  += int(brow[19])
-                                self.stats[self.hdrs[CS]]  += int(brow[20])
-                                self.stats[self.hdrs[SH]]  += int(brow[13])
-                                self.stats[self.hdrs[SF]]  += int(brow[14])
-                                self.stats[self.hdrs[HBP]] += int(brow[15])
-                                self.stats[self.hdrs[GDP]] += int(brow[21])
-                                find_player = False
-            except FileNotFoundError:
-                continue
+        for current_id, brows in self.box_supplement.get_missing_games(year, self.game_ids, bat_id):
+            self.lgr.info(F"found NEW game '{current_id}' in Boxscore file.")
+            for brow in brows:
+                if brow[1] == "bline" and brow[2] == bat_id:
+                    self.lgr.info(F"found player '{bat_id}' in NEW boxscore game {current_id}")
+                    # parse boxscore batting stat line
+                    # key: 'stat','bline',id,side,pos,seq,ab,r,h,2b,3b,hr,rbi,sh,sf,hbp,bb,ibb,k, sb,cs,gidp,int
+                    #       0      1      2  3    4   5   6  7 8 9  10 11 12  13 14 15  16 17  18 19 20  21  22
+                    self.stats[self.hdrs[GM]]  += 1
+                    self.stats[self.hdrs[PA]]  += ( int(brow[6]) + int(brow[13]) + int(brow[14]) + int(brow[15])
+                                                    + int(brow[16]) + int(brow[22]) )
+                    self.stats[self.hdrs[AB]]  += int(brow[6])
+                    self.stats[self.hdrs[RUN]] += int(brow[7])
+                    self.stats[self.hdrs[HIT]] += int(brow[8])
+                    self.stats[self.hdrs[B2]]  += int(brow[9])
+                    self.stats[self.hdrs[B3]]  += int(brow[10])
+                    self.stats[self.hdrs[HR]]  += int(brow[11])
+                    self.stats[self.hdrs[XBH]] += ( int(brow[9]) + int(brow[10]) + int(brow[11]) )
+                    if int(brow[12]) > 0:
+                        self.stats[self.hdrs[RBI]] += int(brow[12])
+                    self.stats[self.hdrs[BB]]  += int(brow[16])
+                    if int(brow[17]) > 0:
+                        self.stats[self.hdrs[IBB]] += int(brow[17])
+                    self.stats[self.hdrs[SO]]  += int(brow[18])
+                    self.stats[self.hdrs[SB]]  += int(brow[19])
+                    self.stats[self.hdrs[CS]]  += int(brow[20])
+                    self.stats[self.hdrs[SH]]  += int(brow[13])
+                    self.stats[self.hdrs[SF]]  += int(brow[14])
+                    self.stats[self.hdrs[HBP]] += int(brow[15])
+                    self.stats[self.hdrs[GDP]] += int(brow[21])
+                    break
 
     def print_stat_line(self, year:str):
         self.lgr.info(F"print stat line for year = {year}")
@@ -228,23 +199,32 @@ class PrintBattingStats(PrintStats):
 
 
 def main_batting_stats(args:list):
-    pers_id, start, end, post, conlevel, filelevel = process_bp_input( args, DEFAULT_BAT_ID, DEFAULT_BAT_YR,
-                                                                       PROGRAM_DESC, PROGRAM_NAME, ID_HELP_DESC )
+    pers_ids, start, end, seasons, conlevel, filelevel, timings = process_bp_input( args, DEFAULT_BAT_ID, DEFAULT_BAT_YR,
+                                                                                    PROGRAM_DESC, PROGRAM_NAME, ID_HELP_DESC )
+    if timings:
+        timer.enable()
 
     lg_ctrl = MhsLogger( __file__, con_level = conlevel, file_level = filelevel, folder = osp.join("logs", "batting") )
     lgr = lg_ctrl.get_logger()
     lgr.info(F"Logging: console level = {repr(conlevel)}; file level = {repr(filelevel)}")
-    lgr.warning(F" id = {pers_id}; years: {start} -> {end}")
+    lgr.warning(F" ids = {pers_ids}; years: {start} -> {end}")
 
     bat_stats = PrintBattingStats(lgr)
-    bat_stats.get_events(post, pers_id, start, end)
-
-    name = F"{bat_stats.get_giv_name()} {bat_stats.get_fam_name()}"
-    lgr.warning(F"name = {name}")
-    season = POST_SEASON if post else REG_SEASON
-    lgr.warning(F"found {bat_stats.get_num_files()} {season} event files over {len(bat_stats.event_files)} years.")
-
-    bat_stats.print_stats(pers_id, name, season, start, end)
+    bat_stats.get_events(seasons, start, end, pers_ids)
+    for season in seasons:
+        lgr.warning(F"found {sum( len(files) for files in bat_stats.event_files[season].values() )} {season} event files"
+                    F" over {len(bat_stats.event_files[season])} years.")
+
+    # ONE pass over the event files for all the players and season types
+    bat_stats.collect_all_stats(pers_ids, start, end)
+    for pers_id in pers_ids:
+        name = bat_stats.get_name(pers_id)
+        lgr.warning(F"name = {name}")
+        for season in seasons:
+            bat_stats.print_stats(pers_id, name, season, start, end)
+    lgr.info(F"peak RSS = {get_peak_rss():.1f} MB")
+    if timings:
+        timer.write_report(timings)
 
 
 if __name__ == "__main__":
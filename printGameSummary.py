@@ -14,49 +14,76 @@
 __author__       = "Mark Sattolo"
 __author_email__ = "epistemik@gmail.com"
 __created__ = "2019-11-07"
-__updated__ = "2021-10-06"
+__updated__ = "2026-10-18"
 
 import sys
 sys.path.append("/home/marksa/git/Python/utils")
 from mhsUtils import dt, now_dt, get_filename, get_current_time
 from mhsLogging import MhsLogger
 from cwTools import *
+from cwGameIndex import SeasonGameIndex, EventFileIndex, FILE, OFFSET
 
 
 class PrintGameSummary:
     """Print MLB game summaries using Retrosheet data."""
-    def __init__(self, p_team, p_post, logger:lg.Logger):
+    def __init__(self, p_team, p_post, logger:lg.Logger, p_game_id:str = None):
         self.note_count = 0
         self.lgr = logger
         self.lgr.warning(F" Start {self.__class__.__name__}")
         self.team = p_team
         self.post = p_post
+        self.game_id = p_game_id
         self.games = {}
         self.rosters = {}
         self.event_files = {}
+        self.people = PersonDirectory(logger)
+        self.catalog = RetrosheetCatalog(logger)
+        self.game_index = SeasonGameIndex(logger, self.catalog)
+        self.file_index = EventFileIndex(logger, self.catalog)
 
     def go(self, p_year, p_start, p_end):
         """Starting point to run the game summary code."""
         try:
-            self.get_rosters_and_events(p_year)
+            with timer.phase("get_rosters_and_events"):
+                self.get_rosters_and_events(p_year)
 
-            self.get_games( (p_year + p_start), (p_year + p_end) )
+            with timer.phase("get_games"):
+                if self.game_id:
+                    self.get_game(self.game_id)
+                else:
+                    self.get_games( (p_year + p_start), (p_year + p_end) )
             self.lgr.warning(F" Found {len(self.games)} {POST_SEASON if self.post else REG_SEASON} games")
 
-            self.print_summaries()
+            with timer.phase("print_summaries"):
+                self.print_summaries()
 
         except Exception as ex:
             self.lgr.exception(F"Exception: {repr(ex)}")
+        finally:
+            self.free_games()
+            self.free_rosters()
+
+    def free_games(self):
+        """Release the games kept for printing."""
+        for kgame, _, _ in self.games.values():
+            free_game(kgame)
+        self.games.clear()
+
+    def free_rosters(self):
+        """Release the rosters created for the season."""
+        for roster in self.rosters.values():
+            free_roster(roster)
+        self.rosters.clear()
 
     def print_summaries(self):
         """Sort the games and print out the information."""
         for key in sorted( self.games.keys() ):
             kgame, home_team, vis_team = self.games[key]
-            kbox = MyCwlib.box_create(kgame)
             home = self.rosters[home_team]
             visitor = self.rosters[vis_team]
 
-            self.print_summary(kgame, kbox, visitor, home)
+            with box_scope(kgame) as kbox:
+                self.print_summary(kgame, kbox, visitor, home)
 
     # void cwbox_print_text(CWGame *game, CWBoxscore *boxscore, CWRoster *visitors, CWRoster *home)
     # noinspection PyAttributeOutsideInit
@@ -219,17 +246,20 @@ class PrintGameSummary:
     def print_attendance(self):
         print(F"A -- {MyCwlib.game_info_lookup(self.game, b'attendance')}")
 
+    def get_box_name(self, player_id:bytes, side:int) -> str:
+        """Name of the player in the roster of the team of 'side' for this game, else in the person directory."""
+        p_roster = self.home_rost if side == 1 else self.vis_rost
+        bio = MyCwlib.roster_player_find(p_roster, player_id) if p_roster else None
+        if bio:
+            return c_char_p_to_str(bio.contents.last_name) + ' ' + c_char_p_to_str(bio.contents.first_name, 1)
+        return self.people.get_box_name( player_id.decode(UTF8_ENCODING) )
+
     # void cwbox_print_player(CWBoxPlayer *player, CWRoster *roster)
     def print_batter(self, p_player:pointer, side:int):
-        bio = None
         posstr = ''
-        p_roster = self.home_rost if side == 1 else self.vis_rost
         player = p_player.contents
-        if p_roster:
-            bio = MyCwlib.roster_player_find(p_roster, player.player_id)
-        if bio:
-            name = c_char_p_to_str(bio.contents.last_name) + ' ' + c_char_p_to_str(bio.contents.first_name, 1)
-        else:
+        name = self.get_box_name(player.player_id, side)
+        if not name:
             name = player.name
         self.lgr.info(F"player name = {name}")
 
@@ -283,20 +313,12 @@ class PrintGameSummary:
         Output one pitcher's pitching line. The parameter 'note_count' keeps track of how many apparatus notes
         have been emitted (for pitchers who do not record an out in an inning)
         """
-        bio = None
-        p_roster = self.home_rost
-        if side == 0:
-            p_roster = self.vis_rost
-        roster = p_roster.contents
         pitcher = p_pitcher.contents
         player_id = pitcher.player_id.decode(UTF8_ENCODING)
         self.lgr.info(F"player id = {player_id}")
         self.lgr.debug(F"type(player id) = {type(player_id)}")
-        if roster:
-            bio = MyCwlib.roster_player_find(p_roster, bytes(pitcher.player_id))
-        if bio:
-            name = c_char_p_to_str(bio.contents.last_name) + " " + c_char_p_to_str(bio.contents.first_name, 1)
-        else:
+        name = self.get_box_name( bytes(pitcher.player_id), side )
+        if not name:
             name = pitcher.name
         self.lgr.info(F"pitcher name = {name}")
 
@@ -511,65 +533,51 @@ class PrintGameSummary:
         print(F"LOB -- {self.vis_city} {lob[0]}, {self.home_city} {lob[1]}")
 
     def get_rosters_and_events(self, year):
-        # get the team files
+        # get the teams from the catalog
         season = POST_SEASON if self.post else REG_SEASON
-        team_file_name = osp.join(REG_SEASON_FOLDER, "TEAM" + year)
-        self.lgr.info(F"team file name = {team_file_name}")
-        with open(team_file_name, newline = '') as csvfile:
-            teamreader = csv.reader(csvfile)
-            for row in teamreader:
-                rteam = row[0]
-                self.lgr.debug(F"Found team {rteam}")
-                if rteam == self.team:
-                    self.lgr.info(F"\t-- league is {row[1]}L; city is {row[2]}; nickname is {row[3]}")
-
-                # create the rosters
-                self.rosters[rteam] = MyCwlib.roster_create(rteam, int(year), row[1] + "L", row[2], row[3])
-                roster_file = osp.join(ROSTERS_FOLDER, rteam + year + osp.extsep + "ROS")
-                self.lgr.debug(F"roster file name = {roster_file}")
-                if not osp.exists(roster_file):
-                    raise FileNotFoundError(F"CANNOT find roster file {roster_file}!")
-                roster_fptr = chadwick.fopen(bytes(roster_file, UTF8_ENCODING))
-                # fill the rosters
-                result = MyCwlib.roster_read(self.rosters[rteam], roster_fptr)
-                # roster files that end with newline return zero even though all the players loaded without problem
-                self.lgr.info(F"{rteam} roster read result = {'FAILURE' if result == 0 else 'success'}.")
-                chadwick.fclose(roster_fptr)
-
-                # find and store the event file paths for the regular season
-                if not self.post:
-                    rfile = osp.join(REG_SEASON_FOLDER, year + rteam + osp.extsep + "EV" + row[1])
-                    if not osp.exists(rfile):
-                        raise FileNotFoundError(F"CANNOT find {season} event file {rfile}!")
-                    self.event_files[rteam] = rfile
-
-        # find and store the event file paths for the requested post-season years
-        if self.post:
-            post_files = osp.join(POST_SEASON_FOLDER, str(year) + "*")
-            for pfile in glob.glob(post_files):
-                basename = get_base_filename(pfile)
-                self.lgr.debug(F"{season} base file name = {basename}")
-                if not osp.exists(pfile):
-                    raise FileNotFoundError(F"CANNOT find {season} event file {pfile}!")
-                self.event_files[basename] = pfile
+        teams = self.catalog.get_teams(year)
+        if teams is None:
+            raise FileNotFoundError(F"CANNOT find team file {osp.join(REG_SEASON_FOLDER, 'TEAM' + year)}!")
+        for row in teams:
+            rteam = row[0]
+            self.lgr.debug(F"Found team {rteam}")
+            if rteam == self.team:
+                self.lgr.info(F"\t-- league is {row[1]}L; city is {row[2]}; nickname is {row[3]}")
+
+            # create the rosters
+            self.rosters[rteam] = MyCwlib.roster_create(rteam, int(year), row[1] + "L", row[2], row[3])
+            roster_file = self.catalog.get_roster_file(rteam, year)
+            self.lgr.debug(F"roster file name = {roster_file}")
+            roster_fptr = MyCwlib.fopen(bytes(roster_file, UTF8_ENCODING))
+            # fill the rosters
+            result = MyCwlib.roster_read(self.rosters[rteam], roster_fptr)
+            # roster files that end with newline return zero even though all the players loaded without problem
+            self.lgr.info(F"{rteam} roster read result = {'FAILURE' if result == 0 else 'success'}.")
+            MyCwlib.fclose(roster_fptr)
+
+        # find and store the event file paths for the regular season, by team, or the post-season, by file
+        for efile in self.catalog.get_event_files(int(year), self.post):
+            key = get_base_filename(efile) if self.post else osp.basename(efile)[4:-4]
+            self.lgr.debug(F"{season} event file for {key} = {efile}")
+            self.event_files[key] = efile
+
+    def get_game(self, game_id:str):
+        """Fetch ONLY the requested game, from the index of its event file."""
+        game = self.file_index.fetch_game(game_id, post = self.post)
+        self.lgr.info(F" Found game id = {game_id}")
+        self.games[game_id[3:]] = game, MyCwlib.game_info_lookup(game, b'hometeam'), MyCwlib.game_info_lookup(game, b'visteam')
 
     def get_games(self, start_date, end_date):
-        # get all the games for the requested team in the supplied date range
-        for evteam in self.event_files:
-            self.lgr.debug(F"found event file for {('file' if self.post else 'team')} = {evteam}")
-            cwgames = chadwick.games(self.event_files[evteam])
-            for game in cwgames:
-                game_id = game.contents.game_id.decode(encoding = UTF8_ENCODING)
-                game_date = game_id[3:11]
-                if end_date >= game_date >= start_date:
-                    self.lgr.debug(F" Found game id = {game_id}; date = {game_date}")
-                    proc_game = chadwick.process_game(game)
-                    g_results = tuple(proc_game)
-                    home_team = g_results[0]["HOME_TEAM_ID"]
-                    vis_team = g_results[0]["AWAY_TEAM_ID"]
-                    if self.team == home_team or self.team == vis_team:
-                        self.lgr.info(F" Found game id = {game_id}")
-                        self.games[game_id[3:]] = game, home_team, vis_team
+        # find the games for the requested team in the supplied date range from the index of the season
+        games = self.game_index.find_games(int(start_date[:4]), self.post, self.team, start_date, end_date)
+        # then read ONLY those games, from each event file in turn, through the same team and date filters as the other tools
+        for efile in sorted( set(game[FILE] for game in games) ):
+            self.lgr.debug(F"found event file {efile}")
+            offsets = [ game[OFFSET] for game in games if game[FILE] == efile ]
+            for game_id, game in iter_file_games(efile, self.team, start_date, end_date, free = False, offsets = offsets):
+                self.lgr.info(F" Found game id = {game_id}")
+                self.games[game_id[3:]] = game, MyCwlib.game_info_lookup(game, b'hometeam'), \
+                                          MyCwlib.game_info_lookup(game, b'visteam')
 
 # END class PrintGameSummary
 
@@ -578,10 +586,12 @@ def process_args():
     arg_parser = ArgumentParser( description = "Print boxscore(s) from retrosheet data for the specified team and date range",
                                  prog = "python3 " + get_filename(__file__) )
     # required arguments
-    required = arg_parser.add_argument_group("REQUIRED")
-    required.add_argument('-t', '--team', required = True, help = "Retrosheet 3-character id for a team, e.g. TOR, LAN")
-    required.add_argument('-y', '--year', type = int, required = True, help = "year to find games to print out, e.g. 1993")
+    required = arg_parser.add_argument_group("REQUIRED unless a game id is given")
+    required.add_argument('-t', '--team', help = "Retrosheet 3-character id for a team, e.g. TOR, LAN")
+    required.add_argument('-y', '--year', type = int, help = "year to find games to print out, e.g. 1993")
     # optional arguments
+    arg_parser.add_argument('-g', '--game', metavar = "GAME_ID",
+                            help = "Retrosheet id of ONE game to print out, e.g. KC1196304090, instead of team and dates")
     arg_parser.add_argument('-s', '--start', metavar = "MMDD", help = "(start) month-day to print out games, e.g. 0701")
     arg_parser.add_argument('-e', '--end', metavar = "MMDD", help = "end month-day to print out games, e.g. 0731")
     arg_parser.add_argument('-p', '--post', action = "store_true", help = F"find {POST_SEASON} games instead of {REG_SEASON}")
@@ -590,11 +600,13 @@ def process_args():
                             help = "set LEVEL of console logging output")
     arg_parser.add_argument('-f', '--levfile', metavar = "LEVEL", default = lg.getLevelName(DEFAULT_FILE_LEVEL),
                             help = "set LEVEL of file logging output")
+    arg_parser.add_argument('--timings', metavar = "FILE", nargs = '?', const = TIMINGS_STDOUT, help = TIMINGS_HELP)
     return arg_parser
 
 
 def process_input_parameters(argl:list):
-    argp = process_args().parse_args(argl)
+    arg_parser = process_args()
+    argp = arg_parser.parse_args(argl)
 
     con_level = lg.getLevelName(QUIET_LOG_LEVEL) if argp.quiet else argp.levcon.strip().upper()
     try:
@@ -609,6 +621,17 @@ def process_input_parameters(argl:list):
         print(F"Problem with file log level: {repr(ae)}")
         file_level = DEFAULT_FILE_LEVEL
 
+    game_id = None
+    if argp.game:
+        # regex to match retrosheet game id format: home team, yyyymmdd, game number
+        re_game = re.compile(r"([A-Z][A-Z0-9]{2}[0-9]{9})")
+        if not re.fullmatch( re_game, argp.game.strip().upper() ):
+            arg_parser.error(F"IMPROPER game id '{argp.game}'!")
+        game_id = argp.game.strip().upper()
+        argp.team, argp.year, argp.start, argp.end = game_id[:3], int(game_id[3:7]), game_id[7:11], game_id[7:11]
+    elif not argp.team or not argp.year:
+        arg_parser.error("a team and a year are required unless a game id is given")
+
     if argp.team.isalnum() and len(argp.team.strip()) >= 3:
         team = argp.team.strip().upper()
     else:
@@ -631,19 +654,24 @@ def process_input_parameters(argl:list):
         start = "0901" if argp.post else "0301"
         end = "1231" if argp.post else "1031"
 
-    return team, year, start, end, argp.post, con_level, file_level
+    return team, year, start, end, game_id, argp.post, con_level, file_level, argp.timings
 
 
 def main_game_summary(args:list):
-    team, year, start, end, post, conlevel, filelevel = process_input_parameters(args)
+    team, year, start, end, game_id, post, conlevel, filelevel, timings = process_input_parameters(args)
+    if timings:
+        timer.enable()
 
     lg_ctrl = MhsLogger( __file__, con_level = conlevel, file_level = filelevel, folder = osp.join("logs", "games") )
     lgr = lg_ctrl.get_logger()
     lgr.info(F"Logging: console level = {repr(conlevel)}; file level = {repr(filelevel)}")
-    lgr.warning(F" team = {team}; year = {year}; start = {start}; end = {end}")
+    lgr.warning(F" team = {team}; year = {year}; start = {start}; end = {end}; game = {game_id}")
 
-    pgs = PrintGameSummary(team, post, lgr)
+    pgs = PrintGameSummary(team, post, lgr, game_id)
     pgs.go(year, start, end)
+    lgr.info(F"peak RSS = {get_peak_rss():.1f} MB")
+    if timings:
+        timer.write_report(timings)
 
 
 if __name__ == "__main__":
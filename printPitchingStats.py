@@ -14,7 +14,7 @@
 __author__       = "Mark Sattolo"
 __author_email__ = "epistemik@gmail.com"
 __created__ = "2021-01-25"
-__updated__ = "2021-10-06"
+__updated__ = "2026-10-18"
 
 import sys
 sys.path.append("/home/marksa/git/Python/utils")
@@ -22,6 +22,7 @@ import copy
 from mhsUtils import dt, now_dt, get_filename, get_current_time
 from mhsLogging import MhsLogger
 from cwTools import *
+from cwCache import line_sum
 
 DEFAULT_PITCH_ID = "kersc001"
 DEFAULT_PITCH_YR = 2014
@@ -67,121 +68,100 @@ PITCHING_HDRS = list( STATS_DICT.keys() )
 
 class PrintPitchingStats(PrintStats):
     """Print pitching stats for a player using Retrosheet data."""
-    def __init__(self, logger:lg.Logger):
-        super().__init__(logger)
+    def __init__(self, logger:lg.Logger, catalog:RetrosheetCatalog = None, people:PersonDirectory = None,
+                 store_folder:str = CACHE_FOLDER):
+        super().__init__(logger, catalog, people, store_folder)
         self.stats = copy.copy(STATS_DICT)
         self.totals = copy.copy(STATS_DICT)
         self.std_space = PITCH_STD_SPACE
         self.hdrs = PITCHING_HDRS
 
-    def collect_stats(self, p_box:pointer, pit_id:str, year:str, game_id:str):
+    def collect_stats(self, bat_lines:np.ndarray, pit_lines:np.ndarray, pit_id:str, year:str):
         self.lgr.debug(F"search for '{pit_id}' in year = {year}")
-        for t in range(2):
-            p_pitcher = MyCwlib.box_get_starting_pitcher(p_box, t)
-            while p_pitcher:
-                pitcher = p_pitcher.contents
-                pitcher_id = pitcher.player_id.decode(UTF8_ENCODING)
-                self.lgr.debug(F"pitcher = {pitcher_id}")
-                if pitcher_id == pit_id:
-                    self.lgr.info(F"found pitcher '{pit_id}' in game {game_id}")
-                    self.game_ids.append(game_id)
-                    pitching = pitcher.pitching.contents
-                    self.stats[self.hdrs[GM]]  += pitching.g
-                    self.stats[self.hdrs[GS]]  += pitching.gs
-                    self.stats[self.hdrs[GF]]  += pitching.gf
-                    self.stats[self.hdrs[CG]]  += pitching.cg
-                    self.stats[self.hdrs[SHO]] += pitching.sho
-                    self.stats[self.hdrs[OUT]] += pitching.outs
-                    self.stats[self.hdrs[HIT]] += pitching.h
-                    self.stats[self.hdrs[RUN]] += pitching.r
-                    self.stats[self.hdrs[ER]]  += pitching.er
-                    self.stats[self.hdrs[HR]]  += pitching.hr
-                    self.stats[self.hdrs[BB]]  += pitching.bb
-                    self.lgr.info(F"pitching.ibb = {pitching.ibb}")
-                    self.stats[self.hdrs[IBB]] += pitching.ibb
-                    self.stats[self.hdrs[SO]]  += pitching.so
-                    self.stats[self.hdrs[BF]]  += pitching.bf
-                    self.stats[self.hdrs[WIN]] += pitching.w
-                    self.stats[self.hdrs[LOS]] += pitching.l
-                    self.stats[self.hdrs[SAV]] += pitching.sv
-                    self.stats[self.hdrs[GB]]  += pitching.gb
-                    self.stats[self.hdrs[FB]]  += pitching.fb
-                    self.stats[self.hdrs[WP]]  += pitching.wp
-                    self.stats[self.hdrs[HBP]] += pitching.hb
-                    self.stats[self.hdrs[BK]]  += pitching.bk
-                    # TODO: add marker to indicate incomplete data?
-                    # estimates for missing data
-                    strk_min = pitching.so * 3
-                    ball_min = pitching.bb * 4
-                    self.stats[self.hdrs[PIT]] += max(pitching.pitches, (pitching.bf + strk_min + ball_min + pitching.h))
-                    self.stats[self.hdrs[STR]] += max(pitching.strikes, (strk_min + pitching.h))
-                p_pitcher = p_pitcher.contents.next
+        pitching = pit_lines[ pit_lines["player_id"] == bytes(pit_id, UTF8_ENCODING) ]
+        if len(pitching) == 0:
+            return
+        for game_id in pitching["game_id"]:
+            self.lgr.info(F"found pitcher '{pit_id}' in game {game_id.decode(UTF8_ENCODING)}")
+            self.game_ids.add( game_id.decode(UTF8_ENCODING) )
+        self.stats[self.hdrs[GM]]  += line_sum(pitching, "g")
+        self.stats[self.hdrs[GS]]  += line_sum(pitching, "gs")
+        self.stats[self.hdrs[GF]]  += line_sum(pitching, "gf")
+        self.stats[self.hdrs[CG]]  += line_sum(pitching, "cg")
+        self.stats[self.hdrs[SHO]] += line_sum(pitching, "sho")
+        self.stats[self.hdrs[OUT]] += line_sum(pitching, "outs")
+        self.stats[self.hdrs[HIT]] += line_sum(pitching, "h")
+        self.stats[self.hdrs[RUN]] += line_sum(pitching, "r")
+        self.stats[self.hdrs[ER]]  += line_sum(pitching, "er")
+        self.stats[self.hdrs[HR]]  += line_sum(pitching, "hr")
+        self.stats[self.hdrs[BB]]  += line_sum(pitching, "bb")
+        self.lgr.info(F"pitching.ibb = {line_sum(pitching, 'ibb')}")
+        self.stats[self.hdrs[IBB]] += line_sum(pitching, "ibb")
+        self.stats[self.hdrs[SO]]  += line_sum(pitching, "so")
+        self.stats[self.hdrs[BF]]  += line_sum(pitching, "bf")
+        self.stats[self.hdrs[WIN]] += line_sum(pitching, "w")
+        self.stats[self.hdrs[LOS]] += line_sum(pitching, "l")
+        self.stats[self.hdrs[SAV]] += line_sum(pitching, "sv")
+        self.stats[self.hdrs[GB]]  += line_sum(pitching, "gb")
+        self.stats[self.hdrs[FB]]  += line_sum(pitching, "fb")
+        self.stats[self.hdrs[WP]]  += line_sum(pitching, "wp")
+        self.stats[self.hdrs[HBP]] += line_sum(pitching, "hb")
+        self.stats[self.hdrs[BK]]  += line_sum(pitching, "bk")
+        # TODO: add marker to indicate incomplete data?
+        # estimates for missing data, game by game
+        strk_min = pitching["so"].astype(np.int32) * 3
+        ball_min = pitching["bb"].astype(np.int32) * 4
+        hits = pitching["h"].astype(np.int32)
+        self.stats[self.hdrs[PIT]] += int( np.maximum(pitching["pitches"], pitching["bf"] + strk_min + ball_min + hits).sum() )
+        self.stats[self.hdrs[STR]] += int( np.maximum(pitching["strikes"], strk_min + hits).sum() )
 
     def check_boxscores(self, pit_id:str, year:str):
         """Check the Retrosheet boxscore files for pitching stats missing from the event files."""
         self.lgr.debug(F"check boxscore files for year = {year}")
-        box_year = osp.join(BOXSCORE_FOLDER, year)
-        boxscore_files = [box_year + osp.extsep + "EBN", box_year + osp.extsep + "EBA"]
-        for bfile in boxscore_files:
-            try:
-                with open(bfile, newline = '') as box_csvfile:
-                    self.lgr.debug(F"search boxscore file {bfile}")
-                    box_reader = csv.reader(box_csvfile)
-                    find_player = False
-                    for brow in box_reader:
-                        if brow[0] == "id":
-                            current_id = brow[1]
-                            if current_id in self.game_ids:
-                                self.lgr.warning(F"found duplicate game '{current_id}' in Boxscore file.")
-                                find_player = False
-                                continue
-                            else:
-                                self.lgr.info(F"found NEW game '{current_id}' in Boxscore file.")
-                                find_player = True
-                        elif find_player:
-                            if brow[0] == "info":
-                                if brow[1] == "wp" and brow[2] == pit_id:
-                                    self.stats[self.hdrs[WIN]] += 1
-                                if brow[1] == "lp" and brow[2] == pit_id:
-                                    self.stats[self.hdrs[LOS]] += 1
-                                if brow[1] == "save" and brow[2] and brow[2] == pit_id:
-                                    self.stats[self.hdrs[SAV]] += 1
-                            if brow[1] == "pline" and brow[2] == pit_id:
-                                self.lgr.info(F"found pitcher '{pit_id}' in boxscore game {current_id}")
-                                # parse boxscore pitching stat line
-                                # key: 'stat','pline',id,side,seq,ip*3,no-out,bfp,h,2b,3b,hr,r, er,bb,ibb,k,hbp,wp,balk,sh,sf
-                                #       0      1      2  3    4   5    6      7   8 9  10 11 12 13 14 15  16 17 18 19   20 21
-                                self.stats[self.hdrs[GM]]  += 1
-                                if brow[4] == '1':
-                                    self.stats[self.hdrs[GS]] += 1
-                                self.stats[self.hdrs[OUT]] += int(brow[5])
-                                bfp = 0
-                                if int(brow[7]) > 0:
-                                    bfp = int(brow[7])
-                                    self.stats[self.hdrs[BF]] += bfp
-                                hits = 0
-                                if int(brow[8]) > 0:
-                                    hits = int(brow[8])
-                                    self.stats[self.hdrs[HIT]] += hits
-                                self.stats[self.hdrs[RUN]] += int(brow[12])
-                                self.stats[self.hdrs[ER]]  += int(brow[13])
-                                self.stats[self.hdrs[HR]]  += int(brow[11])
-                                self.stats[self.hdrs[BB]]  += int(brow[14])
-                                ibb = int(brow[15])
-                                if ibb > 0:
-                                    self.stats[self.hdrs[IBB]] += ibb
-                                    self.lgr.info(F"pitching.ibb = {ibb}")
-                                self.stats[self.hdrs[SO]]  += int(brow[16])
-                                self.stats[self.hdrs[WP]]  += int(brow[18])
-                                self.stats[self.hdrs[HBP]] += int(brow[17])
-                                self.stats[self.hdrs[BK]]  += int(brow[19])
-                                # estimates for missing data
-                                strk_min = int(brow[16]) * 3
-                                self.stats[self.hdrs[PIT]] += (bfp + strk_min + (int(brow[14]) * 4) + hits)
-                                self.stats[self.hdrs[STR]] += (strk_min + hits)
-                                find_player = False
-            except FileNotFoundError:
-                continue
+        for current_id, brows in self.box_supplement.get_missing_games(year, self.game_ids, pit_id):
+            self.lgr.info(F"found NEW game '{current_id}' in Boxscore file.")
+            for brow in brows:
+                if brow[0] == "info":
+                    if brow[1] == "wp" and brow[2] == pit_id:
+                        self.stats[self.hdrs[WIN]] += 1
+                    if brow[1] == "lp" and brow[2] == pit_id:
+                        self.stats[self.hdrs[LOS]] += 1
+                    if brow[1] == "save" and brow[2] and brow[2] == pit_id:
+                        self.stats[self.hdrs[SAV]] += 1
+                if brow[1] == "pline" and brow[2] == pit_id:
+                    self.lgr.info(F"found pitcher '{pit_id}' in boxscore game {current_id}")
+                    # parse boxscore pitching stat line
+                    # key: 'stat','pline',id,side,seq,ip*3,no-out,bfp,h,2b,3b,hr,r, er,bb,ibb,k,hbp,wp,balk,sh,sf
+                    #       0      1      2  3    4   5    6      7   8 9  10 11 12 13 14 15  16 17 18 19   20 21
+                    self.stats[self.hdrs[GM]]  += 1
+                    if brow[4] == '1':
+                        self.stats[self.hdrs[GS]] += 1
+                    self.stats[self.hdrs[OUT]] += int(brow[5])
+                    bfp = 0
+                    if int(brow[7]) > 0:
+                        bfp = int(brow[7])
+                        self.stats[self.hdrs[BF]] += bfp
+                    hits = 0
+                    if int(brow[8]) > 0:
+                        hits = int(brow[8])
+                        self.stats[self.hdrs[HIT]] += hits
+                    self.stats[self.hdrs[RUN]] += int(brow[12])
+                    self.stats[self.hdrs[ER]]  += int(brow[13])
+                    self.stats[self.hdrs[HR]]  += int(brow[11])
+                    self.stats[self.hdrs[BB]]  += int(brow[14])
+                    ibb = int(brow[15])
+                    if ibb > 0:
+                        self.stats[self.hdrs[IBB]] += ibb
+                        self.lgr.info(F"pitching.ibb = {ibb}")
+                    self.stats[self.hdrs[SO]]  += int(brow[16])
+                    self.stats[self.hdrs[WP]]  += int(brow[18])
+                    self.stats[self.hdrs[HBP]] += int(brow[17])
+                    self.stats[self.hdrs[BK]]  += int(brow[19])
+                    # estimates for missing data
+                    strk_min = int(brow[16]) * 3
+                    self.stats[self.hdrs[PIT]] += (bfp + strk_min + (int(brow[14]) * 4) + hits)
+                    self.stats[self.hdrs[STR]] += (strk_min + hits)
+                    break
 
     def print_stat_line(self, year:str):
         self.lgr.info(F"print stat line for year = {year}")
@@ -276,23 +256,32 @@ class PrintPitchingStats(PrintStats):
 
 
 def main_pitching_stats(args:list):
-    pers_id, start, end, post, conlevel, filelevel = process_bp_input( args, DEFAULT_PITCH_ID, DEFAULT_PITCH_YR,
-                                                                       PROGRAM_DESC, PROGRAM_NAME, ID_HELP_DESC )
+    pers_ids, start, end, seasons, conlevel, filelevel, timings = process_bp_input( args, DEFAULT_PITCH_ID, DEFAULT_PITCH_YR,
+                                                                                    PROGRAM_DESC, PROGRAM_NAME, ID_HELP_DESC )
+    if timings:
+        timer.enable()
 
     lg_ctrl = MhsLogger( __file__, con_level = conlevel, file_level = filelevel, folder = osp.join("logs", "pitching") )
     lgr = lg_ctrl.get_logger()
     lgr.info(F"Logging: console level = {repr(conlevel)}; file level = {repr(filelevel)}")
-    lgr.warning(F" id = {pers_id}; years: {start} -> {end}")
+    lgr.warning(F" ids = {pers_ids}; years: {start} -> {end}")
 
     pitch_stats = PrintPitchingStats(lgr)
-    pitch_stats.get_events(post, pers_id, start, end)
-
-    name = F"{pitch_stats.get_giv_name()} {pitch_stats.get_fam_name()}"
-    lgr.warning(F"name = {name}")
-    season = POST_SEASON if post else REG_SEASON
-    lgr.warning(F"found {pitch_stats.get_num_files()} {season} event files over {len(pitch_stats.event_files)} years.")
+    pitch_stats.get_events(seasons, start, end, pers_ids)
+    for season in seasons:
+        lgr.warning(F"found {sum( len(files) for files in pitch_stats.event_files[season].values() )} {season} event files"
+                    F" over {len(pitch_stats.event_files[season])} years.")
 
-    pitch_stats.print_stats(pers_id, name, season, start, end)
+    # ONE pass over the event files for all the players and season types
+    pitch_stats.collect_all_stats(pers_ids, start, end)
+    for pers_id in pers_ids:
+        name = pitch_stats.get_name(pers_id)
+        lgr.warning(F"name = {name}")
+        for season in seasons:
+            pitch_stats.print_stats(pers_id, name, season, start, end)
+    lgr.info(F"peak RSS = {get_peak_rss():.1f} MB")
+    if timings:
+        timer.write_report(timings)
 
 
 if __name__ == "__main__":